@@ -1,12 +1,43 @@
+import time
 import streamlit as st
-from smart_habit import SmartHabit
-from datetime import datetime
+from habit_cache import get_shared_tracker, get_tracker_views, get_user_tracker
+from habit_metrics import metrics
 
-# Initialize tracker
-if "tracker" not in st.session_state:
-    st.session_state.tracker = SmartHabit()
+render_started = time.perf_counter()
+
+SAVE_DELAY = 1.0  # seconds; bursts of saves are written once in the background
+TRACKER_OPTIONS = dict(incremental_score=True, statistics=True, rollups=True, sparse=True, save_delay=SAVE_DELAY)
+
+PAGE_SIZES = [25, 50, 100]
+PICKER_LIMIT = 50  # habits offered by a habit selectbox at once
+
+
+def habit_page(key):
+    # Search box and pager; returns only the habits on the selected page
+    query = st.text_input("🔍 Search habits", key=f"{key}_search")
+    total, matches = views.search(query)
+    col1, col2 = st.columns(2)
+    page_size = col1.selectbox("Habits per page", PAGE_SIZES, key=f"{key}_page_size")
+    pages = max((total + page_size - 1) // page_size, 1)
+    page = col2.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    st.caption(f"{total} habits found")
+    start = (page - 1) * page_size
+    return matches[start:start + page_size]
+
+
+def pick_habit(label, key):
+    # Searchable habit selectbox over the first PICKER_LIMIT matches; returns the habit or None
+    query = st.text_input("🔍 Search habits", key=f"{key}_search")
+    total, habits = views.search(query, 0, PICKER_LIMIT)
+    if not habits:
+        st.info("No habits match your search.")
+        return None
+    by_number = {habit['number']: habit for habit in habits}
+    number = st.selectbox(label, list(by_number), format_func=lambda n: by_number[n]['name'], key=key)
+    if total > PICKER_LIMIT:
+        st.caption(f"Showing the first {PICKER_LIMIT} of {total} matches, search to narrow them down.")
+    return by_number[number]
 
-tracker = st.session_state.tracker
 
 # ------------------ PAGE SETUP ------------------
 st.set_page_config(page_title="Smart Habit Tracker", page_icon="⭐", layout="wide")
@@ -15,20 +46,36 @@ st.write("**Build better habits every day!**")
 
 # ------------------ SIDEBAR MENU ------------------
 st.sidebar.title("📋 Menu")
+
+# Each session works on its user's own data file (?user=<id> or the box below);
+# without a user the app uses the single shared habits_data.json
+user_id = st.sidebar.text_input("👤 User", value=st.query_params.get("user", ""), key="user_id").strip()
+try:
+    # Shared tracker: loaded once per process, reloaded only when the data file changes
+    if user_id:
+        tracker = get_user_tracker(user_id, **TRACKER_OPTIONS)
+    else:
+        tracker = get_shared_tracker(**TRACKER_OPTIONS)
+except ValueError as error:
+    st.sidebar.error(f"{error}. Use letters, digits and . _ @ - (up to 64 characters).")
+    st.stop()
+# Memoized scores and habit views: reruns that changed nothing don't recompute them
+views = get_tracker_views(tracker)
+today = tracker.clock.today_key()  # computed once per render
+
 menu = st.sidebar.radio(
     "Navigate to:",
-    ["🏠 Dashboard", "➕ Add Habit", "✅ Mark Progress", "📋 My Habits", "📊 Analytics", "⚙️ Manage Habits"]
+    ["🏠 Dashboard", "➕ Add Habit", "✅ Mark Progress", "📋 My Habits", "📊 Analytics", "⚙️ Manage Habits",
+     "🩺 Diagnostics"]
 )
 
 # Quick stats in sidebar
 if tracker.habits:
-    today = datetime.now().strftime("%Y-%m-%d")
-    completed_today = sum(1 for h in tracker.habits 
-                         if h["daily_progress"].get(today, 0) >= h["target_hours"])
+    summary = views.daily_score()
     
     st.sidebar.markdown("---")
     st.sidebar.write("**Today's Summary**")
-    st.sidebar.metric("Completed", f"{completed_today}/{len(tracker.habits)}")
+    st.sidebar.metric("Completed", f"{summary['completed_habits']}/{summary['total_habits']}")
 
 # ------------------ DASHBOARD ------------------
 if menu == "🏠 Dashboard":
@@ -38,7 +85,7 @@ if menu == "🏠 Dashboard":
         st.info("🌟 Welcome! Start by adding your first habit.")
     else:
         # Score cards
-        score = tracker.calculate_daily_score()
+        score = views.daily_score()
         col1, col2, col3 = st.columns(3)
         
         with col1:
@@ -50,26 +97,23 @@ if menu == "🏠 Dashboard":
         
         st.progress(score["daily_score"] / 100)
         
-        # Today's habits
+        # Today's habits: one table for the current page only
         st.subheader("📝 Today's Habits")
-        for habit in tracker.habits:
-            today = datetime.now().strftime("%Y-%m-%d")
-            today_hours = habit["daily_progress"].get(today, 0)
-            target = habit["target_hours"]
-            
-            col1, col2, col3 = st.columns([2, 1, 1])
-            with col1:
-                st.write(f"**{habit['name']}**")
-            with col2:
-                st.write(f"{today_hours}h / {target}h")
-            with col3:
-                if today_hours >= target:
-                    st.success("✅ Done")
-                else:
-                    st.warning("🕒 In Progress")
-            
-            st.progress(min(today_hours / target, 1.0))
-            st.markdown("---")
+        rows = tracker.get_day_progress(habit_page("dashboard"), today)
+        st.dataframe(
+            [
+                {
+                    "Habit": row['name'],
+                    "Hours": f"{row['hours']}h / {row['target_hours']}h",
+                    "Status": "✅ Done" if row['completed'] else "🕒 In Progress",
+                    "Progress": row['progress']
+                }
+                for row in rows
+            ],
+            column_config={"Progress": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f%%")},
+            hide_index=True,
+            use_container_width=True
+        )
 
 # ------------------ ADD HABIT ------------------
 elif menu == "➕ Add Habit":
@@ -81,18 +125,7 @@ elif menu == "➕ Add Habit":
         
         if st.form_submit_button("Add Habit"):
             if name.strip():
-                habit = {
-                    "number": tracker.next_number,
-                    "name": name,
-                    "target_hours": target_hours,
-                    "today_hours": 0,
-                    "completed": False,
-                    "daily_progress": {},
-                    "created_date": datetime.now().strftime("%Y-%m-%d")
-                }
-                tracker.initialize_daily_tracking(habit)
-                tracker.habits.append(habit)
-                tracker.next_number += 1
+                tracker.create_habit(name, target_hours)
                 tracker.save_data()
                 st.success(f"Habit '{name}' added! 🎉")
             else:
@@ -105,30 +138,26 @@ elif menu == "✅ Mark Progress":
     if not tracker.habits:
         st.warning("No habits available. Add some habits first!")
     else:
-        habit_names = {f"{h['name']}": h['number'] for h in tracker.habits}
-        selected = st.selectbox("Select Habit", list(habit_names.keys()))
-        habit_num = habit_names[selected]
-        habit = tracker.find_habit_by_number(habit_num)
+        habit = pick_habit("Select Habit", "mark_habit")
+        if habit is not None:
+            habit_num = habit['number']
         
-        st.write(f"**Target:** {habit['target_hours']} hours")
+            st.write(f"**Target:** {habit['target_hours']} hours")
         
-        today = datetime.now().strftime("%Y-%m-%d")
-        current_hours = habit["daily_progress"].get(today, 0)
+            current_hours = habit["daily_progress"].get(today, 0)
         
-        hours = st.slider(
-            "Hours completed today", 
-            min_value=0.0, 
-            max_value=float(habit["target_hours"] * 2), 
-            value=float(current_hours),
-            step=0.5
-        )
+            hours = st.slider(
+                "Hours completed today", 
+                min_value=0.0, 
+                max_value=float(habit["target_hours"] * 2), 
+                value=float(current_hours),
+                step=0.5
+            )
         
-        if st.button("Save Progress"):
-            habit["today_hours"] = hours
-            habit["daily_progress"][today] = hours
-            habit["completed"] = hours >= habit["target_hours"]
-            tracker.save_data()
-            st.success("Progress updated! ✅")
+            if st.button("Save Progress"):
+                tracker.log_progress(habit_num, hours)
+                tracker.save_data()
+                st.success("Progress updated! ✅")
 
 # ------------------ MY HABITS ------------------
 elif menu == "📋 My Habits":
@@ -137,21 +166,22 @@ elif menu == "📋 My Habits":
     if not tracker.habits:
         st.info("No habits added yet.")
     else:
-        for habit in tracker.habits:
-            today = datetime.now().strftime("%Y-%m-%d")
-            today_hours = habit["daily_progress"].get(today, 0)
-            
-            st.subheader(f"{habit['name']}")
-            st.write(f"**Target:** {habit['target_hours']} hours/day")
-            st.write(f"**Today:** {today_hours} hours")
-            st.write(f"**Created:** {habit['created_date']}")
-            
-            if today_hours >= habit["target_hours"]:
-                st.success("Completed today! 🎉")
-            else:
-                st.info(f"Need {habit['target_hours'] - today_hours} more hours")
-            
-            st.markdown("---")
+        rows = tracker.get_day_progress(habit_page("my_habits"), today)
+        st.dataframe(
+            [
+                {
+                    "Habit": row['name'],
+                    "Target (h/day)": row['target_hours'],
+                    "Today (h)": row['hours'],
+                    "Created": row['created_date'],
+                    "Status": "Completed today! 🎉" if row['completed']
+                              else f"Need {row['target_hours'] - row['hours']} more hours"
+                }
+                for row in rows
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
 
 # ------------------ ANALYTICS ------------------
 elif menu == "📊 Analytics":
@@ -161,21 +191,40 @@ elif menu == "📊 Analytics":
         st.warning("No data available yet.")
     else:
         # Daily score
-        score = tracker.calculate_daily_score()
+        score = views.daily_score()
         st.metric("Overall Score", f"{score['daily_score']}%")
         
         # Weekly progress
         st.subheader("Weekly Progress")
-        habit_names = {f"{h['name']}": h['number'] for h in tracker.habits}
-        selected = st.selectbox("Select Habit", list(habit_names.keys()))
-        habit_num = habit_names[selected]
-        
-        weekly = tracker.get_weekly_progress(habit_num)
-        habit = tracker.find_habit_by_number(habit_num)
+        habit = pick_habit("Select Habit", "analytics_habit")
+        if habit is not None:
+            habit_num = habit['number']
+            weekly = views.weekly_progress(habit_num)
         
-        for day in weekly:
-            status = "✅" if day["completed"] else "❌"
-            st.write(f"{day['date']} - {status} {day['hours']}h / {day['target']}h")
+            for day in weekly:
+                status = "✅" if day["completed"] else "❌"
+                st.write(f"{day['date']} - {status} {day['hours']}h / {day['target']}h")
+
+            # History statistics (kept up to date by the tracker, no history scan here)
+            st.subheader("Statistics")
+            stats = views.habit_statistics(habit_num)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Current Streak", f"{stats['current_streak']} days")
+            col2.metric("Longest Streak", f"{stats['longest_streak']} days")
+            col3.metric("Lifetime Hours", f"{stats['lifetime_hours']}h")
+            col1.metric("7-Day Average", f"{stats['average_7_days']}h")
+            col2.metric("30-Day Average", f"{stats['average_30_days']}h")
+            col3.metric("Completion Rate", f"{stats['completion_rate']}%")
+
+            # Long-term progress from the week / month / year rollups
+            st.subheader("Long-term Progress")
+            period = st.radio("Group by", ["week", "month", "year"], index=1, horizontal=True)
+            rollups = views.rollups(period, habit_num)
+            if rollups:
+                st.bar_chart({"Hours": {row['period']: row['total_hours'] for row in rollups}})
+                st.bar_chart({"Completion %": {row['period']: row['average_completion'] for row in rollups}})
+            else:
+                st.info("No progress logged yet.")
 
 # ------------------ MANAGE HABITS ------------------
 elif menu == "⚙️ Manage Habits":
@@ -184,19 +233,50 @@ elif menu == "⚙️ Manage Habits":
     if not tracker.habits:
         st.warning("No habits to manage.")
     else:
-        habit_names = {f"{h['name']}": h['number'] for h in tracker.habits}
-        selected = st.selectbox("Select Habit to Delete", list(habit_names.keys()))
-        habit_num = habit_names[selected]
-        habit = tracker.find_habit_by_number(habit_num)
+        habit = pick_habit("Select Habit to Delete", "delete_habit")
+        if habit is not None:
+            habit_num = habit['number']
         
-        st.warning(f"You're about to delete: {habit['name']}")
+            st.warning(f"You're about to delete: {habit['name']}")
         
-        if st.button("Delete Habit"):
-            tracker.habits.remove(habit)
-            tracker.save_data()
-            st.success(f"Deleted '{habit['name']}'")
+            if st.button("Delete Habit"):
+                tracker.remove_habit(habit_num)
+                tracker.save_data()
+                st.success(f"Deleted '{habit['name']}'")
+                st.rerun()
+
+# ------------------ DIAGNOSTICS ------------------
+elif menu == "🩺 Diagnostics":
+    st.header("🩺 Diagnostics")
+    st.write("Timings of tracker operations and page renders in this server process.")
+    st.caption(f"View cache: {views.hits} hits, {views.misses} misses")
+
+    enabled = st.toggle("Collect timings", value=metrics.enabled)
+    if enabled and not metrics.enabled:
+        metrics.enable()
+        st.rerun()
+    elif not enabled and metrics.enabled:
+        metrics.disable()
+        st.rerun()
+
+    snapshot = metrics.snapshot()
+    if snapshot:
+        st.dataframe(
+            [
+                {"operation": name, **{key: value for key, value in stats.items() if key != 'buckets'}}
+                for name, stats in snapshot.items()
+            ],
+            use_container_width=True
+        )
+        st.download_button("Download JSON", metrics.to_json(), file_name="smarthabit_metrics.json")
+        if st.button("Reset timings"):
+            metrics.reset()
             st.rerun()
+    else:
+        st.info("No timings yet. Turn on collection and use the app.")
 
 # Footer
 st.markdown("---")
-st.write("💪 **Keep building great habits!**")
\ No newline at end of file
+st.write("💪 **Keep building great habits!**")
+
+metrics.record(f"render {menu}", time.perf_counter() - render_started)
\ No newline at end of file
@@ -0,0 +1,168 @@
+# SMART_HABIT_BENCHMARKS
+#
+# Times SmartHabit's hot paths on synthetic data and compares them with a stored baseline.
+#
+#   python bench_smart_habit.py --habits 1000 --days 365               # print timings
+#   python bench_smart_habit.py --habits 1000 --days 365 --save-baseline
+#   python bench_smart_habit.py --habits 1000 --days 365 --check       # exit 1 on regressions
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from smart_habit import SmartHabit
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+
+def generate_data(habits, days, density=0.8, seed=42, end=None):
+    # habits_data.json document with `habits` habits and up to `days` days of progress each
+    rng = random.Random(seed)
+    end = end or date.today()
+    dates = [(end - timedelta(days=offset)).isoformat() for offset in range(days)]
+    habit_list = []
+    for number in range(1, habits + 1):
+        target = rng.choice([0.5, 1.0, 1.5, 2.0, 3.0])
+        habit_list.append({
+            "number": number,
+            "name": f"Habit {number}",
+            "target_hours": target,
+            "today_hours": 0,
+            "completed": False,
+            "daily_progress": {
+                day: round(rng.uniform(0, target * 1.5), 1) for day in dates if rng.random() < density
+            },
+            "created_date": dates[-1] if dates else end.isoformat()
+        })
+    return {'habits': habit_list, 'next_number': habits + 1, 'last_updated': end.isoformat()}
+
+
+def write_dataset(path, habits, days, **options):
+    with open(path, 'w') as f:
+        json.dump(generate_data(habits, days, **options), f)
+
+
+def measure(operation, repeat):
+    # Median wall time over `repeat` runs, then one extra run under tracemalloc for peak memory
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': round(statistics.median(timings), 6), 'peak_kb': round(peak / 1024, 1)}
+
+
+def run_benchmarks(habits, days, repeat=5):
+    # Return {operation: {'seconds': ..., 'peak_kb': ...}} for one dataset size
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        data_file = os.path.join(tmp_dir, "habits.json")
+        write_dataset(data_file, habits, days)
+        tracker = SmartHabit(data_file)
+        middle = max(habits // 2, 1)
+        end = date.today()
+        start = (end - timedelta(days=days - 1)).isoformat() if days else end.isoformat()
+
+        operations = {
+            'load_data': tracker.load_data,
+            'save_data': tracker.save_data,
+            'calculate_daily_score': tracker.calculate_daily_score,
+            'get_weekly_progress': lambda: tracker.get_weekly_progress(middle),
+            'get_progress_range': lambda: tracker.get_progress_range(start, end.isoformat()),
+            'find_habit_by_number': lambda: [tracker.find_habit_by_number(n) for n in range(1, habits + 1)],
+        }
+        for name, operation in operations.items():
+            results[name] = measure(operation, repeat)
+    return results
+
+
+def size_key(habits, days):
+    return f"{habits}x{days}"
+
+
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results, habits, days, path=BASELINE_FILE):
+    baseline = load_baseline(path)
+    baseline[size_key(habits, days)] = results
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(results, baseline, tolerance=0.25, min_seconds=0.001):
+    # Operations slower than baseline * (1 + tolerance); differences below min_seconds are noise
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        allowed = baseline[name]['seconds'] * (1 + tolerance)
+        if result['seconds'] > allowed and result['seconds'] - baseline[name]['seconds'] > min_seconds:
+            regressions.append((name, baseline[name]['seconds'], result['seconds']))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print(f"{'operation':<24}{'median ms':>12}{'peak KB':>12}{'baseline ms':>14}")
+    for name, result in results.items():
+        reference = f"{baseline[name]['seconds'] * 1000:.3f}" if baseline and name in baseline else "-"
+        print(f"{name:<24}{result['seconds'] * 1000:>12.3f}{result['peak_kb']:>12.1f}{reference:>14}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SmartHabit operations on synthetic data.")
+    parser.add_argument("--habits", type=int, default=1000, help="number of habits (default 1000)")
+    parser.add_argument("--days", type=int, default=365, help="days of history per habit (default 365)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per operation (default 5)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="record these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if slower than the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown ratio (default 0.25)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.habits, args.days, args.repeat)
+    baseline = load_baseline(args.baseline).get(size_key(args.habits, args.days))
+    print(f"SmartHabit benchmarks: {args.habits} habits x {args.days} days")
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        save_baseline(results, args.habits, args.days, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.check:
+        if baseline is None:
+            print(f"No baseline for {size_key(args.habits, args.days)}; run with --save-baseline first.")
+            return 1
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+# HABIT_ANALYTICS
+
+# Derived data kept up to date by SmartHabit listeners. A listener receives:
+#   reset(habits)                                  - all habits were replaced (load, reassignment)
+#   habit_added(habit) / habit_removed(habit)      - a single habit came or went
+#   progress_changed(habit, date, old, new)        - the hours for one habit-day changed
+# Listeners that are saved with the data also have a `name`, to_dict(numbers=None) and
+# restore(habits, data), which adopts a saved copy and returns False if it doesn't fit.
+# Saved data is keyed by str(habit number), so stores can rewrite single habits;
+# to_dict(numbers) returns only the entries of those habits.
+
+import calendar
+from bisect import bisect_right, insort
+from datetime import date as Date, timedelta
+
+
+def progress_items(habit):
+    # (date, hours) pairs of a habit; lazily loaded history is streamed from the store
+    # instead of being paged into memory
+    progress = habit.get('daily_progress', {})
+    iter_days = getattr(progress, 'iter_days', None)
+    return iter_days() if iter_days is not None else progress.items()
+
+
+class DailyScoreAggregate:
+    """
+    Running totals behind calculate_daily_score: for every date, the sum of
+    capped completion ratios and the number of completed habits, plus the
+    habit count. Each update touches one date bucket, so serving today's
+    score no longer walks every habit.
+    """
+
+    def __init__(self):
+        self.reset([])
+
+    def reset(self, habits):
+        self.by_date = {}  # date -> [sum of capped completion ratios, completed habits]
+        self.total_habits = 0
+        # Habits with a zero target count as completed on every day (hours >= 0)
+        self.always_completed = 0
+        for habit in habits:
+            self.habit_added(habit)
+
+    def habit_added(self, habit):
+        self.total_habits += 1
+        if habit['target_hours'] <= 0:
+            self.always_completed += 1
+            return
+        for date, hours in progress_items(habit):
+            self._apply(habit, date, hours, 1)
+
+    def habit_removed(self, habit):
+        self.total_habits -= 1
+        if habit['target_hours'] <= 0:
+            self.always_completed -= 1
+            return
+        for date, hours in progress_items(habit):
+            self._apply(habit, date, hours, -1)
+
+    def progress_changed(self, habit, date, old_hours, new_hours):
+        if habit['target_hours'] <= 0:
+            return
+        self._apply(habit, date, old_hours, -1)
+        self._apply(habit, date, new_hours, 1)
+
+    def score(self, date):
+        # Return (sum of capped ratios, completed habits, total habits) for a date
+        ratio_sum, completed = self.by_date.get(date, (0.0, 0))
+        return ratio_sum, completed + self.always_completed, self.total_habits
+
+    def _apply(self, habit, date, hours, sign):
+        target = habit['target_hours']
+        bucket = self.by_date.setdefault(date, [0.0, 0])
+        bucket[0] += sign * min(hours / target, 1.0)
+        bucket[1] += sign * (hours >= target)
+
+
+class HabitSummary:
+    """
+    One habit's history in summary form: lifetime hours, completed days and
+    the runs of consecutive completed days (start -> end day ordinals, with
+    the starts kept sorted), so streaks update in O(log runs) per change.
+    A day counts as completed when it has hours and they reach the target.
+    """
+
+    __slots__ = ('lifetime_hours', 'completed_days', 'runs', 'starts')
+
+    def __init__(self):
+        self.lifetime_hours = 0.0
+        self.completed_days = 0
+        self.runs = {}  # first day ordinal of a streak -> last day ordinal
+        self.starts = []  # sorted run starts
+
+    @staticmethod
+    def is_completed(hours, target):
+        return hours > 0 and hours >= target
+
+    def update(self, day, old_hours, new_hours, target):
+        self.lifetime_hours += new_hours - old_hours
+        was, now = self.is_completed(old_hours, target), self.is_completed(new_hours, target)
+        if was != now:
+            ordinal = Date.fromisoformat(day).toordinal()
+            if now:
+                self._add_day(ordinal)
+            else:
+                self._remove_day(ordinal)
+
+    def run_at(self, ordinal):
+        # Start of the run containing the day, or None
+        index = bisect_right(self.starts, ordinal) - 1
+        if index >= 0 and self.runs[self.starts[index]] >= ordinal:
+            return self.starts[index]
+        return None
+
+    def current_streak(self, today):
+        # Completed days in a row up to today (or up to yesterday while today is still open)
+        for last in (today, today - 1):
+            start = self.run_at(last)
+            if start is not None:
+                return last - start + 1
+        return 0
+
+    def longest_streak(self):
+        return max((end - start + 1 for start, end in self.runs.items()), default=0)
+
+    def _add_day(self, ordinal):
+        self.completed_days += 1
+        start = self.run_at(ordinal - 1)
+        end = self.runs.get(ordinal + 1)
+        if end is not None:
+            self._drop_run(ordinal + 1)
+        if start is None:
+            self._add_run(ordinal, ordinal if end is None else end)
+        else:
+            self.runs[start] = ordinal if end is None else end
+
+    def _remove_day(self, ordinal):
+        self.completed_days -= 1
+        start = self.run_at(ordinal)
+        end = self.runs[start]
+        if start < ordinal:
+            self.runs[start] = ordinal - 1
+        else:
+            self._drop_run(start)
+        if ordinal < end:
+            self._add_run(ordinal + 1, end)
+
+    def _add_run(self, start, end):
+        self.runs[start] = end
+        insort(self.starts, start)
+
+    def _drop_run(self, start):
+        del self.runs[start]
+        del self.starts[bisect_right(self.starts, start) - 1]
+
+    def to_dict(self):
+        return {
+            'lifetime_hours': round(self.lifetime_hours, 4),
+            'completed_days': self.completed_days,
+            'runs': [[Date.fromordinal(start).isoformat(), Date.fromordinal(end).isoformat()]
+                     for start, end in sorted(self.runs.items())]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls()
+        summary.lifetime_hours = data['lifetime_hours']
+        summary.completed_days = data['completed_days']
+        for start, end in data['runs']:
+            summary.runs[Date.fromisoformat(start).toordinal()] = Date.fromisoformat(end).toordinal()
+        summary.starts = sorted(summary.runs)
+        return summary
+
+
+class HabitStatistics:
+    """
+    Per-habit HabitSummary objects kept current on every change and saved
+    with the data, so streaks and lifetime totals are read in constant time
+    instead of scanning every date in daily_progress.
+    """
+
+    name = 'statistics'
+
+    def __init__(self):
+        self.reset([])
+
+    def reset(self, habits):
+        self.by_habit = {}  # habit number -> HabitSummary
+        for habit in habits:
+            self.habit_added(habit)
+
+    def restore(self, habits, data):
+        # Adopt saved summaries when they cover exactly these habits
+        if {str(habit['number']) for habit in habits} != set(data):
+            return False
+        self.by_habit = {int(number): HabitSummary.from_dict(summary) for number, summary in data.items()}
+        return True
+
+    def to_dict(self, numbers=None):
+        numbers = self.by_habit if numbers is None else [n for n in numbers if n in self.by_habit]
+        return {str(number): self.by_habit[number].to_dict() for number in numbers}
+
+    def habit_added(self, habit):
+        summary = self.by_habit[habit['number']] = HabitSummary()
+        for date, hours in progress_items(habit):
+            summary.update(date, 0, hours, habit['target_hours'])
+
+    def habit_removed(self, habit):
+        self.by_habit.pop(habit['number'], None)
+
+    def progress_changed(self, habit, date, old_hours, new_hours):
+        self.by_habit[habit['number']].update(date, old_hours, new_hours, habit['target_hours'])
+
+    def summary(self, habit_number):
+        return self.by_habit.get(habit_number)
+
+
+# Rollup granularities and their period keys: "2025-W47", "2025-11", "2025"
+ROLLUP_PERIODS = ('week', 'month', 'year')
+
+
+def period_keys(day):
+    # (week, month, year) keys for a "YYYY-MM-DD" date
+    year, week, _ = Date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}", day[:7], day[:4]
+
+
+def period_bounds(period, key):
+    # First and last date of a period key
+    if period == 'week':
+        year, week = key.split("-W")
+        first = Date.fromisocalendar(int(year), int(week), 1)
+        return first, first + timedelta(days=6)
+    if period == 'month':
+        year, month = int(key[:4]), int(key[5:7])
+        return Date(year, month, 1), Date(year, month, calendar.monthrange(year, month)[1])
+    return Date(int(key), 1, 1), Date(int(key), 12, 31)
+
+
+class RollupTables:
+    """
+    Per-habit totals by week, month and year: hours, completed days and the
+    sum of capped completion ratios for every period. A progress change
+    touches one bucket per granularity, so long-horizon reports cost
+    O(periods) instead of O(days x habits). Completed days follow
+    HabitSummary.is_completed.
+    """
+
+    name = 'rollups'
+
+    def __init__(self):
+        self.reset([])
+
+    def reset(self, habits):
+        # period -> habit number -> period key -> [hours, completed days, ratio sum]
+        self.tables = {period: {} for period in ROLLUP_PERIODS}
+        for habit in habits:
+            self.habit_added(habit)
+
+    def restore(self, habits, data):
+        # Adopt saved tables when they cover exactly these habits, each with every granularity
+        if {str(habit['number']) for habit in habits} != set(data) or any(
+            not isinstance(tables, dict) or set(tables) != set(ROLLUP_PERIODS) for tables in data.values()
+        ):
+            return False
+        self.tables = {
+            period: {int(number): tables[period] for number, tables in data.items()} for period in ROLLUP_PERIODS
+        }
+        return True
+
+    def to_dict(self, numbers=None):
+        # {habit number: {period: {period key: bucket}}}
+        weekly = self.tables['week']
+        numbers = weekly if numbers is None else [n for n in numbers if n in weekly]
+        return {
+            str(number): {
+                period: {
+                    key: [round(bucket[0], 4), bucket[1], round(bucket[2], 6)]
+                    for key, bucket in self.tables[period][number].items()
+                }
+                for period in ROLLUP_PERIODS
+            }
+            for number in numbers
+        }
+
+    def habit_added(self, habit):
+        for table in self.tables.values():
+            table[habit['number']] = {}
+        for date, hours in progress_items(habit):
+            self._apply(habit, date, hours, 1)
+
+    def habit_removed(self, habit):
+        for table in self.tables.values():
+            table.pop(habit['number'], None)
+
+    def progress_changed(self, habit, date, old_hours, new_hours):
+        self._apply(habit, date, old_hours, -1)
+        self._apply(habit, date, new_hours, 1)
+
+    def buckets(self, period, habit_number):
+        # {period key: [hours, completed days, ratio sum]} for one habit
+        return self.tables[period].get(habit_number, {})
+
+    def _apply(self, habit, date, hours, sign):
+        if not hours:
+            return
+        target = habit['target_hours']
+        completed = sign * HabitSummary.is_completed(hours, target)
+        ratio = sign * (min(hours / target, 1.0) if target > 0 else 0)
+        for period, key in zip(ROLLUP_PERIODS, period_keys(date)):
+            buckets = self.tables[period][habit['number']]
+            bucket = buckets.setdefault(key, [0.0, 0, 0.0])
+            bucket[0] += sign * hours
+            bucket[1] += completed
+            bucket[2] += ratio
+            if abs(bucket[0]) < 1e-9 and not bucket[1]:
+                # Back to nothing logged in this period
+                del buckets[key]
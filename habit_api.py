@@ -0,0 +1,577 @@
+# HABIT_API
+#
+# HTTP/JSON API over one in-memory SmartHabit per process, on asyncio and the standard library.
+#
+#   python habit_api.py serve --port 8765 --data-file habits_data.json
+#   python habit_api.py loadtest --requests 5000 --concurrency 50   # in-process server on a temp file
+#   python habit_api.py loadtest --port 8765 --write-ratio 0.1      # against a running server
+#
+#   GET    /habits?q=read&offset=0&limit=25&date=2025-11-20   habits with their hours on a day
+#   POST   /habits                  {"name": "Reading", "target_hours": 1.5}
+#   GET    /habits/1                one habit with its statistics
+#   DELETE /habits/1
+#   POST   /habits/1/progress       {"hours": 0.75, "date": "2025-11-20"}   (date defaults to today)
+#   GET    /habits/1/weekly
+#   GET    /score
+#   GET    /progress?start=2025-11-01&end=2025-11-30&habit=1&habit=2&days=1
+#
+# Mutations go through one writer task: it applies every queued mutation in a batch and saves
+# once per batch, and a response is sent only after its change is saved (a failed save is
+# retried, and the response waits for it). Reads run off the event loop in worker threads and
+# don't queue behind pending writes, but they hold the tracker lock: one read runs at a time and
+# a save in progress delays them. The server saves to the append-only journal by default, so a
+# save holds the lock only for a short append. Errors come back as {"error": "..."} with a 4xx/5xx status.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+from habit_cli import quietly
+from habit_metrics import metrics
+from smart_habit import SmartHabit
+
+MAX_BODY = 1 << 20  # bytes
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"
+}
+
+
+class ApiError(Exception):
+    """
+    A request that can not be served; turned into an error response with `status`.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_day(value, field="date"):
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ApiError(400, f"invalid {field} {value!r} (expected YYYY-MM-DD)") from None
+
+
+def parse_int(value, field):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"invalid {field} {value!r}") from None
+
+
+def parse_hours(value, field, maximum=24):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= maximum:
+        raise ApiError(400, f"{field} must be a number between 0 and {maximum}")
+    return float(value)
+
+
+def parse_body(body):
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        raise ApiError(400, "request body is not valid JSON") from None
+    if not isinstance(payload, dict):
+        raise ApiError(400, "request body must be a JSON object")
+    return payload
+
+
+class HabitApi:
+    """
+    Routes API requests to a shared tracker: reads run concurrently in
+    worker threads, mutations are applied and saved in batches by a single
+    writer task.
+    """
+
+    def __init__(self, tracker, retry_delay=1.0):
+        self.tracker = tracker
+        self.retry_delay = retry_delay  # seconds between attempts when saving fails
+        self.batches = 0  # saved write batches
+        self.last_save_error = None
+        self._writes = None  # asyncio.Queue of (mutation, future), created by start()
+        self._writer = None
+        # (path pattern, {method: handler}); int marks a habit number segment
+        self.routes = [
+            (("habits",), {"GET": self.list_habits, "POST": self.add_habit}),
+            (("habits", int), {"GET": self.get_habit, "DELETE": self.delete_habit}),
+            (("habits", int, "progress"), {"POST": self.log_progress}),
+            (("habits", int, "weekly"), {"GET": self.weekly_progress}),
+            (("score",), {"GET": self.daily_score}),
+            (("progress",), {"GET": self.progress_range}),
+        ]
+
+    async def start(self, host="127.0.0.1", port=8765):
+        # Start the writer task and listen; returns the asyncio server
+        self._writes = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_loop())
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    async def stop(self):
+        # Finish queued writes, then stop the writer task
+        if self._writer is not None:
+            await self._writes.join()
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+    # --- Reads and writes ---
+
+    async def read(self, query):
+        # Run a read in a worker thread (the tracker lock keeps it consistent with writes)
+        def locked():
+            with self.tracker.lock:
+                return query()
+        return await asyncio.get_running_loop().run_in_executor(None, locked)
+
+    async def write(self, mutation):
+        # Queue a mutation for the writer task; returns its result once it is saved
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((mutation, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        unsaved = []  # (future, result) of applied mutations whose save failed, answered once saved
+        try:
+            while True:
+                if unsaved:
+                    # Retry the save after a pause, or together with the next batch
+                    try:
+                        batch = [await asyncio.wait_for(self._writes.get(), self.retry_delay)]
+                    except asyncio.TimeoutError:
+                        batch = []
+                else:
+                    batch = [await self._writes.get()]
+                while not self._writes.empty():
+                    batch.append(self._writes.get_nowait())
+
+                try:
+                    results, saved = await loop.run_in_executor(
+                        None, self._apply_batch, [mutation for mutation, _ in batch], bool(unsaved)
+                    )
+                except Exception as error:
+                    # Unknown what was applied or saved: fail every waiting request instead of guessing
+                    failure = ApiError(500, f"could not apply changes: {error}")
+                    for future, _ in unsaved + [(future, None) for _, future in batch]:
+                        if not future.done():
+                            future.set_exception(failure)
+                    unsaved = []
+                    for _ in batch:
+                        self._writes.task_done()
+                    continue
+                for (_, future), (ok, value) in zip(batch, results):
+                    if ok:
+                        unsaved.append((future, value))
+                    elif not future.done():
+                        future.set_exception(value)
+                if saved:
+                    for future, value in unsaved:
+                        if not future.done():
+                            future.set_result(value)
+                    unsaved = []
+                for _ in batch:
+                    self._writes.task_done()
+        finally:
+            for future, _ in unsaved:
+                if not future.done():
+                    future.set_exception(ApiError(500, "the server stopped before the change could be saved"))
+
+    def _apply_batch(self, mutations, retry):
+        # Apply mutations in order and save once; returns ([(ok, result or error)], saved).
+        # A failed save leaves the changes applied and pending in the tracker: they are
+        # saved (and answered) by the next successful save instead of being reported as failed
+        with self.tracker.lock:
+            results = []
+            for mutation in mutations:
+                try:
+                    results.append((True, mutation()))
+                except Exception as error:
+                    results.append((False, error))
+        if not retry and not any(ok for ok, _ in results):
+            return results, True
+        try:
+            quietly(self.tracker.save_data)
+        except Exception as error:
+            self.last_save_error = error
+            print(f"Saving failed, retrying in {self.retry_delay}s: {error}", file=sys.stderr)
+            return results, False
+        self.last_save_error = None
+        self.batches += 1
+        return results, True
+
+    # --- Handlers: each returns (status, payload) ---
+
+    def _habit(self, number):
+        habit = self.tracker.find_habit_by_number(number)
+        if habit is None:
+            raise ApiError(404, f"no habit number {number}")
+        return habit
+
+    async def list_habits(self, query, body):
+        day = parse_day(query['date'][0]) if 'date' in query else None
+        offset = parse_int(query.get('offset', ["0"])[0], "offset")
+        limit = parse_int(query['limit'][0], "limit") if 'limit' in query else None
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ApiError(400, "offset and limit can not be negative")
+
+        def list_page():
+            total, habits = self.tracker.search_habits(query.get('q', [""])[0], offset, limit)
+            return {'total': total, 'habits': self.tracker.get_day_progress(habits, day)}
+        return 200, await self.read(list_page)
+
+    async def add_habit(self, query, body):
+        payload = parse_body(body)
+        name = payload.get('name')
+        if not isinstance(name, str) or not name.strip() or name.strip().isdigit():
+            raise ApiError(400, "name must be text (not empty, not only digits)")
+        name = name.strip()
+        target = parse_hours(payload.get('target_hours'), "target_hours")
+
+        def create():
+            if self.tracker.habit_exists(name):
+                raise ApiError(409, f"habit {name!r} already exists")
+            habit = self.tracker.create_habit(name, target)
+            return self.tracker.get_day_progress([habit])[0]
+        return 201, await self.write(create)
+
+    async def get_habit(self, number, query, body):
+        def habit_details():
+            row = self.tracker.get_day_progress([self._habit(number)])[0]
+            row['statistics'] = self.tracker.get_habit_statistics(number)
+            return row
+        return 200, await self.read(habit_details)
+
+    async def delete_habit(self, number, query, body):
+        def delete():
+            habit = self._habit(number)
+            self.tracker.remove_habit(number)
+            return {'number': number, 'name': habit['name']}
+        return 200, await self.write(delete)
+
+    async def log_progress(self, number, query, body):
+        payload = parse_body(body)
+        hours = parse_hours(payload.get('hours'), "hours")
+        day = parse_day(payload['date']) if payload.get('date') is not None else None
+
+        def log():
+            habit = self._habit(number)
+            logged_day = day or self.tracker.clock.today_key()
+            self.tracker.log_progress(number, hours, logged_day)
+            return self.tracker.get_day_progress([habit], logged_day)[0] | {'date': logged_day}
+        return 200, await self.write(log)
+
+    async def weekly_progress(self, number, query, body):
+        def weekly():
+            self._habit(number)
+            return {'number': number, 'days': self.tracker.get_weekly_progress(number)}
+        return 200, await self.read(weekly)
+
+    async def daily_score(self, query, body):
+        def score():
+            result = self.tracker.calculate_daily_score(include_habit_scores=False)
+            result.pop('habit_scores')
+            return result
+        return 200, await self.read(score)
+
+    async def progress_range(self, query, body):
+        if 'start' not in query or 'end' not in query:
+            raise ApiError(400, "start and end are required")
+        start, end = parse_day(query['start'][0], "start"), parse_day(query['end'][0], "end")
+        if start > end:
+            raise ApiError(400, "start is after end")
+        numbers = [parse_int(value, "habit") for value in query['habit']] if 'habit' in query else None
+        include_days = query.get('days', ["0"])[0].lower() in ("1", "true", "yes")
+        progress = await self.read(lambda: self.tracker.get_progress_range(start, end, numbers, include_days))
+        return 200, {'start': start, 'end': end, 'habits': list(progress.values())}
+
+    # --- HTTP ---
+
+    async def handle(self, method, target, body):
+        # Route one request; returns (status, payload)
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        started = time.perf_counter()
+        route = "unknown"
+        try:
+            for pattern, methods in self.routes:
+                args = self._match(pattern, parts)
+                if args is None:
+                    continue
+                route = "/" + "/".join("{number}" if part is int else part for part in pattern)
+                handler = methods.get(method)
+                if handler is None:
+                    raise ApiError(405, f"{method} is not allowed on {route}")
+                return await handler(*args, parse_qs(url.query), body)
+            raise ApiError(404, f"no route for {url.path}")
+        except ApiError as error:
+            return error.status, {'error': str(error)}
+        except Exception as error:
+            return 500, {'error': f"{type(error).__name__}: {error}"}
+        finally:
+            metrics.record(f"api {method} {route}", time.perf_counter() - started)
+
+    @staticmethod
+    def _match(pattern, parts):
+        # Habit numbers of the path if it fits the pattern, else None
+        if len(pattern) != len(parts):
+            return None
+        args = []
+        for expected, part in zip(pattern, parts):
+            if expected is int:
+                if not part.isdigit():
+                    return None
+                args.append(int(part))
+            elif expected != part:
+                return None
+        return args
+
+    async def _serve_connection(self, reader, writer):
+        # HTTP/1.1 with keep-alive: one request at a time per connection
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "malformed request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == "HTTP/1.1" and headers.get('connection', "").lower() != "close"
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY:
+                    await self._respond(writer, 413 if length > MAX_BODY else 400, {'error': "bad Content-Length"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.handle(method.upper(), target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+class ApiClient:
+    """
+    Minimal keep-alive JSON client for one connection (load test and tests).
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+    async def request(self, method, path, payload=None):
+        # Send one request; returns (status, decoded JSON body)
+        body = b"" if payload is None else json.dumps(payload).encode()
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n"
+        if body:
+            head += "Content-Type: application/json\r\n"
+        self.writer.write((head + "\r\n").encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+
+async def load_test(host, port, requests=2000, concurrency=20, write_ratio=0.1, habits=20, seed=1):
+    """
+    Fire `requests` requests over `concurrency` keep-alive connections, a
+    `write_ratio` share of them progress logs and the rest score, habit
+    page and weekly reads. Returns throughput and latency percentiles.
+    """
+    setup = await ApiClient(host, port).connect()
+    _, listing = await setup.request("GET", "/habits")
+    numbers = [habit['number'] for habit in listing['habits']]
+    while len(numbers) < habits:
+        status, habit = await setup.request(
+            "POST", "/habits", {'name': f"Load test {len(numbers) + 1} {seed}", 'target_hours': 1.0}
+        )
+        if status != 201:
+            raise RuntimeError(f"could not create load test habits: {habit.get('error')}")
+        numbers.append(habit['number'])
+    await setup.close()
+
+    rng = random.Random(seed)
+    plan = []
+    for _ in range(requests):
+        number = rng.choice(numbers)
+        if rng.random() < write_ratio:
+            plan.append(("POST", f"/habits/{number}/progress", {'hours': round(rng.uniform(0, 2), 2)}))
+        else:
+            plan.append(rng.choice([
+                ("GET", "/score", None), ("GET", "/habits?limit=25", None), ("GET", f"/habits/{number}/weekly", None)
+            ]))
+
+    latencies, errors = [], 0
+    queue = iter(plan)
+
+    async def worker():
+        nonlocal errors
+        client = await ApiClient(host, port).connect()
+        try:
+            for method, path, payload in queue:
+                started = time.perf_counter()
+                status, _ = await client.request(method, path, payload)
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += status >= 400
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(fraction):
+        return round(latencies[min(int(fraction * len(latencies)), len(latencies) - 1)], 3) if latencies else 0.0
+
+    return {
+        'requests': len(latencies), 'errors': errors, 'concurrency': concurrency, 'write_ratio': write_ratio,
+        'seconds': round(seconds, 3), 'requests_per_sec': round(len(latencies) / seconds, 1) if seconds else 0.0,
+        'p50_ms': percentile(0.5), 'p95_ms': percentile(0.95), 'p99_ms': percentile(0.99),
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0
+    }
+
+
+def open_tracker(args):
+    return quietly(
+        SmartHabit, args.data_file, journal=args.journal, sparse=True, incremental_score=True, statistics=True
+    )
+
+
+async def serve(args):
+    api = HabitApi(open_tracker(args))
+    server = await api.start(args.host, args.port)
+    print(f"SmartHabit API listening on http://{args.host}:{server.sockets[0].getsockname()[1]}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await api.stop()
+
+
+async def run_load_test(args):
+    if args.port is not None:
+        return await load_test(args.host, args.port, args.requests, args.concurrency, args.write_ratio, args.habits)
+    # No server given: run one in-process on a throwaway data file
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        args.data_file = os.path.join(tmp_dir, "habits.json")
+        api = HabitApi(open_tracker(args))
+        server = await api.start(args.host, 0)
+        try:
+            port = server.sockets[0].getsockname()[1]
+            result = await load_test(args.host, port, args.requests, args.concurrency, args.write_ratio, args.habits)
+            result['write_batches'] = api.batches
+            return result
+        finally:
+            server.close()
+            await server.wait_closed()
+            await api.stop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="SmartHabit HTTP/JSON API.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    server = commands.add_parser("serve", help="run the API server")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8765)
+
+    tester = commands.add_parser("loadtest", help="measure throughput and latency")
+    tester.add_argument("--host", default="127.0.0.1")
+    tester.add_argument("--port", type=int, help="server to test (default: an in-process server on a temp file)")
+    tester.add_argument("--requests", type=int, default=2000)
+    tester.add_argument("--concurrency", type=int, default=20)
+    tester.add_argument("--write-ratio", type=float, default=0.1, help="share of requests that log progress")
+    tester.add_argument("--habits", type=int, default=20, help="habits to create if there are fewer")
+    tester.add_argument("--json", action="store_true", help="print the result as JSON")
+
+    for command in (server, tester):
+        command.add_argument("--data-file", default="habits_data.json")
+        command.add_argument(
+            "--no-journal", dest="journal", action="store_false",
+            help="save full snapshots instead of appending to the journal (reads wait for each save)"
+        )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    result = asyncio.run(run_load_test(args))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['requests']} requests ({result['errors']} errors) in {result['seconds']}s: "
+              f"{result['requests_per_sec']} req/s")
+        print(f"latency ms: p50 {result['p50_ms']}  p95 {result['p95_ms']}  p99 {result['p99_ms']}  max {result['max_ms']}")
+    return 1 if result['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# HABIT_CACHE
+
+import os
+import threading
+from collections import OrderedDict
+
+from habit_views import HabitViews
+from habit_store import user_data_file
+from smart_habit import USERS_DIR, SmartHabit
+
+# Most trackers kept loaded; the least recently used one is closed and dropped beyond that
+MAX_TRACKERS = 256
+
+# Process-wide trackers shared by every Streamlit session, keyed on data file and options
+_trackers = OrderedDict()  # key -> _Entry
+_keys = {}  # id(tracker) -> key, to find a shared tracker's entry
+# Guards the two maps only; loading and refreshing a tracker hold just its entry's lock
+_lock = threading.Lock()
+
+
+class _Entry:
+    """
+    A shared tracker and its memoized views. The tracker is loaded under
+    the entry's own lock, so one user's load never waits for another's.
+    """
+
+    __slots__ = ('tracker', 'views', 'lock')
+
+    def __init__(self):
+        self.tracker = None  # until loaded
+        self.views = None
+        self.lock = threading.Lock()
+
+
+def get_shared_tracker(data_file="habits_data.json", **options):
+    """
+    Return the tracker for data_file, loading it once per process. Later
+    calls only stat the store and reload (or replay new journal records)
+    when another process has written to it.
+    """
+    key = (os.path.abspath(data_file), tuple(sorted(options.items())))
+    evicted = None
+    with _lock:
+        entry = _trackers.get(key)
+        if entry is None:
+            entry = _trackers[key] = _Entry()
+            if len(_trackers) > MAX_TRACKERS:
+                _, evicted = _trackers.popitem(last=False)
+        else:
+            _trackers.move_to_end(key)
+    if evicted is not None:
+        _close_entry(evicted)
+
+    with entry.lock:
+        if entry.tracker is not None:
+            entry.tracker.refresh()
+            return entry.tracker
+        try:
+            tracker = SmartHabit(data_file, **options)
+        except Exception:
+            with _lock:
+                if _trackers.get(key) is entry:
+                    del _trackers[key]
+            raise
+        entry.tracker = tracker
+        with _lock:
+            _keys[id(tracker)] = key
+        return tracker
+
+
+def _close_entry(entry):
+    # Write an evicted tracker's pending saves and stop its background saver; sessions
+    # still holding the tracker keep working (their saves are then written synchronously)
+    with entry.lock:
+        tracker, entry.tracker, entry.views = entry.tracker, None, None
+    if tracker is not None:
+        with _lock:
+            _keys.pop(id(tracker), None)
+        tracker.close()
+
+
+def get_user_tracker(user_id, users_dir=USERS_DIR, **options):
+    # The shared tracker of one user's shard (only that user's file is loaded)
+    return get_shared_tracker(user_data_file(users_dir, user_id), **options)
+
+
+def get_tracker_views(tracker, **options):
+    # The HabitViews of a shared tracker, shared by every session using it
+    # (a tracker that is not, or no longer, shared gets views of its own)
+    with _lock:
+        entry = _trackers.get(_keys.get(id(tracker)))
+        if entry is None or entry.tracker is not tracker:
+            return HabitViews(tracker, **options)
+        if entry.views is None:
+            entry.views = HabitViews(tracker, **options)
+        return entry.views
+
+
+def clear_shared_trackers():
+    # Close and forget all cached trackers and views (the next call loads from disk again)
+    with _lock:
+        entries = list(_trackers.values())
+        _trackers.clear()
+        _keys.clear()
+    for entry in entries:
+        _close_entry(entry)
@@ -0,0 +1,314 @@
+# HABIT_CLI
+#
+# Command-line entry point for scripted use of SmartHabit: each command runs and exits.
+#
+#   python habit_cli.py add Reading 1.5
+#   python habit_cli.py log 1 0.75 --date 2025-11-20
+#   python habit_cli.py delete 1
+#   python habit_cli.py --json score
+#   python habit_cli.py weekly 1
+#   python habit_cli.py import progress.csv            # CSV with habit,date,hours columns
+#   python habit_cli.py import progress.jsonl --strict # one {"habit": ..., "date": ..., "hours": ...} per line
+#   cat rows.csv | python habit_cli.py import - --format csv
+#   python habit_cli.py export history.csv --start 2025-01-01 --end 2025-12-31
+#   python habit_cli.py export - --format jsonl --habit 1 --habit 3
+#   python habit_cli.py --sparse compact               # strip stored 0-hour days, write a fresh snapshot
+#   python habit_cli.py --user alice score             # alice's own data file under habit_users/
+#
+# `--batch` reads one command per line from stdin and runs them all in one process,
+# saving once at the end:
+#
+#   printf 'log 1 1.0\nlog 2 0.5\nscore\n' | python habit_cli.py --batch --json
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import shlex
+import sys
+from datetime import date
+
+from habit_metrics import metrics
+from smart_habit import USERS_DIR, SmartHabit
+
+
+class CommandError(Exception):
+    """
+    A command that cannot be carried out (unknown habit, bad value...).
+    """
+
+
+def quietly(operation, *args, **kwargs):
+    # Run a tracker call without its status prints mixing into the command output
+    with contextlib.redirect_stdout(io.StringIO()):
+        return operation(*args, **kwargs)
+
+
+def day_key(value):
+    # argparse type for "YYYY-MM-DD" dates
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r} (expected YYYY-MM-DD)") from None
+
+
+def read_rows(stream, format):
+    # Yield import rows from a CSV (with a header line) or JSONL stream; JSONL lines are
+    # parsed by import_progress so a malformed line is rejected as a row of its own
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield line
+
+
+def guess_format(path):
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.json', '.ndjson') else 'csv'
+
+
+def get_habit(tracker, number):
+    habit = tracker.find_habit_by_number(number)
+    if habit is None:
+        raise CommandError(f"no habit number {number}")
+    return habit
+
+
+# --- Commands: each returns (exit status, JSON result, text output) ---
+
+def add_command(tracker, args):
+    name = args.name.strip()
+    if not name or name.isdigit():
+        raise CommandError("habit name can not be empty or a number")
+    if tracker.habit_exists(name):
+        raise CommandError(f"habit {name!r} already exists")
+    habit = tracker.create_habit(name, args.target)
+    result = {'number': habit['number'], 'name': habit['name'], 'target_hours': habit['target_hours']}
+    return 0, result, f"Habit '{name}' added with number {habit['number']}"
+
+
+def log_command(tracker, args):
+    habit = get_habit(tracker, args.number)
+    day = args.date or tracker.clock.today_key()
+    tracker.log_progress(args.number, args.hours, day)
+    completed = args.hours >= habit['target_hours']
+    result = {'number': args.number, 'date': day, 'hours': args.hours, 'completed': completed}
+    status = "completed" if completed else "not completed"
+    return 0, result, f"Logged {args.hours}h for {habit['name']} on {day} ({status})"
+
+
+def delete_command(tracker, args):
+    habit = get_habit(tracker, args.number)
+    tracker.remove_habit(args.number)
+    return 0, {'number': args.number, 'name': habit['name']}, f"Habit '{habit['name']}' deleted"
+
+
+def score_command(tracker, args):
+    score = tracker.calculate_daily_score(include_habit_scores=False)
+    score.pop('habit_scores')
+    text = (f"Score for {score['date']}: {score['daily_score']}% "
+            f"({score['completed_habits']}/{score['total_habits']} habits completed)")
+    return 0, score, text
+
+
+def weekly_command(tracker, args):
+    habit = get_habit(tracker, args.number)
+    days = tracker.get_weekly_progress(args.number)
+    lines = [f"Weekly progress for {habit['name']}:"]
+    for day in days:
+        status = "done" if day['completed'] else "    "
+        lines.append(f"  {day['date']}  {status}  {day['hours']}h / {day['target']}h "
+                     f"({round(day['completion_percentage'], 1)}%)")
+    return 0, {'number': args.number, 'name': habit['name'], 'days': days}, "\n".join(lines)
+
+
+def import_command(tracker, args):
+    format = args.format or ('csv' if args.file == '-' else guess_format(args.file))
+    if args.file == '-':
+        if args.batch:
+            raise CommandError("import - can not read rows from stdin in batch mode")
+        result = quietly(tracker.import_progress, read_rows(sys.stdin, format), strict=args.strict)
+    else:
+        with open(args.file, 'r', newline='') as f:
+            result = quietly(tracker.import_progress, read_rows(f, format), strict=args.strict)
+
+    lines = [f"Row {row_number} skipped: {reason}" for row_number, reason in result['rejected']]
+    lines.append(f"Imported {result['imported']} rows in {result['seconds']:.3f}s "
+                 f"({result['rows_per_sec']:.0f} rows/sec)")
+    return (1 if result['rejected'] else 0), result, "\n".join(lines)
+
+
+def export_command(tracker, args):
+    format = args.format or ('csv' if args.file == '-' else guess_format(args.file))
+    if args.file == '-':
+        # The rows are the output: no summary (even with --json) to corrupt the stream
+        tracker.export_progress(sys.stdout, format, args.start, args.end, args.habit)
+        return 0, None, None
+    with open(args.file, 'w', newline='') as f:
+        count = tracker.export_progress(f, format, args.start, args.end, args.habit)
+    return 0, {'exported': count, 'file': args.file}, f"Exported {count} rows to {args.file}"
+
+
+def compact_command(tracker, args):
+    size_before = file_size(tracker.data_file)
+    removed = quietly(tracker.strip_zero_progress)
+    size_after = file_size(tracker.data_file)
+    result = {'removed': removed, 'bytes_before': size_before, 'bytes_after': size_after}
+    return 0, result, f"Removed {removed} zero-hour days ({size_before} -> {size_after} bytes)"
+
+
+def file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def add_commands(parser):
+    commands = parser.add_subparsers(dest="command")
+
+    add = commands.add_parser("add", help="add a habit")
+    add.add_argument("name")
+    add.add_argument("target", type=float, help="target hours per day")
+    add.set_defaults(handler=add_command, mutates=True)
+
+    log = commands.add_parser("log", help="set the hours for a habit on a day")
+    log.add_argument("number", type=int)
+    log.add_argument("hours", type=float)
+    log.add_argument("--date", type=day_key, help="day to log (default today)")
+    log.set_defaults(handler=log_command, mutates=True)
+
+    delete = commands.add_parser("delete", help="delete a habit")
+    delete.add_argument("number", type=int)
+    delete.set_defaults(handler=delete_command, mutates=True)
+
+    score = commands.add_parser("score", help="today's score over all habits")
+    score.set_defaults(handler=score_command, mutates=False)
+
+    weekly = commands.add_parser("weekly", help="the last 7 days of a habit")
+    weekly.add_argument("number", type=int)
+    weekly.set_defaults(handler=weekly_command, mutates=False)
+
+    importer = commands.add_parser("import", help="bulk-log progress rows from CSV or JSONL")
+    importer.add_argument("file", help="rows file, or - for stdin")
+    importer.add_argument("--format", choices=("csv", "jsonl"), help="input format (default: from the file extension)")
+    importer.add_argument("--strict", action="store_true", help="import nothing if any row is invalid")
+    importer.set_defaults(handler=import_command, mutates=False)  # saves by itself
+
+    exporter = commands.add_parser("export", help="write every recorded day as CSV or JSONL rows")
+    exporter.add_argument("file", help="output file, or - for stdout")
+    exporter.add_argument("--format", choices=("csv", "jsonl"), help="output format (default: from the file extension)")
+    exporter.add_argument("--start", type=day_key, help="first day to export (YYYY-MM-DD)")
+    exporter.add_argument("--end", type=day_key, help="last day to export (YYYY-MM-DD)")
+    exporter.add_argument("--habit", type=int, action="append", help="habit number to export (repeatable)")
+    exporter.set_defaults(handler=export_command, mutates=False)
+
+    compact = commands.add_parser("compact", help="strip stored 0-hour days and write a fresh snapshot")
+    compact.set_defaults(handler=compact_command, mutates=False)  # writes the snapshot itself
+
+
+class BatchLineParser(argparse.ArgumentParser):
+    """
+    Parser for one --batch line: raises instead of exiting the process.
+    """
+
+    def error(self, message):
+        raise CommandError(message)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="SmartHabit command-line interface.")
+    parser.add_argument("--data-file", default="habits_data.json", help="habits data file (default habits_data.json)")
+    parser.add_argument("--user", help="work on this user's data file under --users-dir instead of --data-file")
+    parser.add_argument("--users-dir", default=USERS_DIR, help=f"root of the per-user data files (default {USERS_DIR})")
+    parser.add_argument("--journal", action="store_true", help="save changes to the append-only journal")
+    parser.add_argument("--sparse", action="store_true", help="don't store days without hours (logging 0 removes the day)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON (one line per command)")
+    parser.add_argument("--batch", action="store_true", help="read commands from stdin, one per line")
+    parser.add_argument("--metrics", action="store_true", help="print operation timings to stderr when done")
+    add_commands(parser)
+    return parser
+
+
+def build_line_parser():
+    parser = BatchLineParser(prog="batch line", add_help=False)
+    add_commands(parser)
+    return parser
+
+
+def run_command(tracker, args):
+    # Run one parsed command; errors become a failed result instead of an exception
+    try:
+        return args.handler(tracker, args)
+    except (CommandError, OSError, ValueError) as error:
+        return 1, {'error': str(error)}, f"Error: {error}"
+
+
+def emit(args, result, text):
+    if result is None:
+        return
+    if args.json:
+        print(json.dumps(result))
+    elif text is not None:
+        print(text, file=sys.stderr if 'error' in result else sys.stdout)
+
+
+def run_batch(tracker, options, lines):
+    # Run every command line against one tracker and save once; returns 1 if any failed
+    parser = build_line_parser()
+    failed = changed = False
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        try:
+            args = parser.parse_args(shlex.split(line))
+            if args.command is None:
+                raise CommandError("missing command")
+        except (CommandError, ValueError) as error:
+            status, result, text = 1, {'error': str(error)}, f"Error: {error}"
+        else:
+            args.batch = True
+            status, result, text = run_command(tracker, args)
+            changed = changed or (args.mutates and status == 0)
+        failed = failed or status != 0
+        emit(options, result, text)
+    if changed:
+        quietly(tracker.save_data)
+    return 1 if failed else 0
+
+
+def main(argv=None, stdin=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.batch and args.command is None:
+        parser.error("a command is required (or --batch)")
+    if args.metrics:
+        metrics.enable()
+    try:
+        return run(args, stdin)
+    finally:
+        if args.metrics:
+            print(metrics.report(), file=sys.stderr)
+            metrics.disable()
+
+
+def run(args, stdin=None):
+    try:
+        tracker = quietly(
+            SmartHabit, args.data_file, journal=args.journal, sparse=args.sparse,
+            user_id=args.user, users_dir=args.users_dir
+        )
+    except ValueError as error:
+        emit(args, {'error': str(error)}, f"Error: {error}")
+        return 1
+    if args.batch:
+        return run_batch(tracker, args, stdin or sys.stdin)
+
+    status, result, text = run_command(tracker, args)
+    if args.mutates and status == 0:
+        quietly(tracker.save_data)
+    emit(args, result, text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# HABIT_CLOCK
+
+from datetime import date, datetime, timedelta
+
+
+class SystemClock:
+    """
+    Today's date and "YYYY-MM-DD" keys from the system time. The date is
+    read from `now` on every call (cheap), while keys for "N days ago" are
+    memoized until the date changes, so loops over habits and weekly/range
+    windows don't pay a strftime per lookup.
+    """
+
+    def __init__(self, now=None):
+        self._now = now or datetime.now  # callable returning the current datetime
+        self._today = None
+        self._keys = {}  # days ago -> date key, for the current day
+
+    def today(self):
+        today = self._now().date()
+        if today != self._today:
+            self._today = today
+            self._keys = {}
+        return today
+
+    def today_key(self):
+        return self.key(0)
+
+    def key(self, days_ago=0):
+        # Date key for `days_ago` days before today
+        today = self.today()
+        key = self._keys.get(days_ago)
+        if key is None:
+            key = self._keys[days_ago] = (today - timedelta(days=days_ago)).isoformat()
+        return key
+
+
+class FixedClock(SystemClock):
+    """
+    A clock stuck on a given day, for tests and replays: FixedClock("2025-11-21"),
+    then set() or advance() to travel in time.
+    """
+
+    def __init__(self, day):
+        super().__init__()
+        self.set(day)
+
+    def set(self, day):
+        self._today = date.fromisoformat(day) if isinstance(day, str) else day
+        self._keys = {}
+
+    def advance(self, days=1):
+        self.set(self._today + timedelta(days=days))
+
+    def today(self):
+        return self._today
@@ -0,0 +1,160 @@
+# HABIT_MATRIX
+
+from datetime import date, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only the matrix representation needs it
+    np = None
+
+
+class ProgressMatrix:
+    """
+    Columnar copy of every habit's daily_progress: a habits x days float32
+    matrix of hours, one column per calendar day starting at `start`, plus a
+    target_hours vector. Analytics over all habits become single array
+    operations instead of per-habit dict lookups. A boolean `recorded`
+    matrix remembers which days were stored, so to_habits() gives back the
+    same JSON document (hours come back rounded to 4 decimals).
+    """
+
+    def __init__(self, habits, start=None, end=None, today=None):
+        if np is None:
+            raise ImportError("ProgressMatrix requires numpy (pip install numpy)")
+
+        self.numbers = [habit['number'] for habit in habits]
+        self.names = [habit['name'] for habit in habits]
+        self.created_dates = [habit.get('created_date') for habit in habits]
+        self.row_index = {number: row for row, number in enumerate(self.numbers)}
+        self.target_hours = np.array([habit['target_hours'] for habit in habits], dtype=np.float32)
+
+        # Column range: every stored day unless narrowed explicitly
+        ordinals = [
+            date.fromisoformat(day).toordinal()
+            for habit in habits for day in habit.get('daily_progress', {})
+        ]
+        # (with no history at all the range starts on `today`, the tracker's clock when given)
+        self.today = today or date.today().strftime("%Y-%m-%d")
+        first = date.fromisoformat(start).toordinal() if start else min(
+            ordinals, default=date.fromisoformat(self.today).toordinal()
+        )
+        last = date.fromisoformat(end).toordinal() if end else max(ordinals, default=first)
+        self.start = date.fromordinal(first)
+        self.days = max(last - first + 1, 0)
+
+        self.hours = np.zeros((len(habits), self.days), dtype=np.float32)
+        self.recorded = np.zeros((len(habits), self.days), dtype=bool)
+        for row, habit in enumerate(habits):
+            for day, hours in habit.get('daily_progress', {}).items():
+                column = date.fromisoformat(day).toordinal() - first
+                if 0 <= column < self.days:
+                    self.hours[row, column] = hours
+                    self.recorded[row, column] = True
+
+    # --- Date <-> column ---
+
+    def column(self, day):
+        # Column for a "YYYY-MM-DD" key, or None outside the matrix
+        column = date.fromisoformat(day).toordinal() - self.start.toordinal()
+        return column if 0 <= column < self.days else None
+
+    def date_key(self, column):
+        return (self.start + timedelta(days=int(column))).strftime("%Y-%m-%d")
+
+    def window(self, start, end):
+        # Hours for start..end inclusive (habits x days); days outside the matrix are zero
+        first = date.fromisoformat(start).toordinal() - self.start.toordinal()
+        last = date.fromisoformat(end).toordinal() - self.start.toordinal()
+        hours = np.zeros((len(self.numbers), max(last - first + 1, 0)), dtype=np.float32)
+        lo, hi = max(first, 0), min(last, self.days - 1)
+        if lo <= hi:
+            hours[:, lo - first:hi - first + 1] = self.hours[:, lo:hi + 1]
+        return hours
+
+    # --- Vectorized analytics ---
+
+    def completion_ratios(self, hours):
+        # Capped completion ratio per cell; habits with a zero target score 0
+        targets = self.target_hours[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.minimum(hours / targets, 1.0)
+        return np.where(targets > 0, ratios, 0.0)
+
+    def completed(self, hours):
+        return hours >= self.target_hours[:, None]
+
+    def daily_scores(self, start, end):
+        # Per-day score (%), completed count and completion rate (%) for start..end
+        hours = self.window(start, end)
+        total = len(self.numbers)
+        if not total:
+            zeros = np.zeros(hours.shape[1], dtype=np.float32)
+            return {'daily_score': zeros, 'completed_habits': zeros.astype(np.int64), 'completion_percentage': zeros}
+        completed = self.completed(hours).sum(axis=0)
+        return {
+            'daily_score': self.completion_ratios(hours).mean(axis=0) * 100,
+            'completed_habits': completed,
+            'completion_percentage': completed / total * 100
+        }
+
+    def daily_score(self, day):
+        # Same figures as SmartHabit.calculate_daily_score for one day
+        scores = self.daily_scores(day, day)
+        return {
+            'date': day,
+            'daily_score': round(float(scores['daily_score'][0]), 1) if self.numbers else 0,
+            'completed_habits': int(scores['completed_habits'][0]),
+            'total_habits': len(self.numbers),
+            'completion_percentage': round(float(scores['completion_percentage'][0]), 1) if self.numbers else 0
+        }
+
+    def habit_summaries(self, start, end):
+        # Per-habit totals, completed days and daily averages over start..end
+        hours = self.window(start, end)
+        days = hours.shape[1]
+        total_hours = hours.sum(axis=1)
+        return {
+            'numbers': self.numbers,
+            'total_hours': total_hours,
+            'completed_days': self.completed(hours).sum(axis=1),
+            'average_hours': total_hours / days if days else total_hours,
+            'average_completion': self.completion_ratios(hours).mean(axis=1) * 100 if days else total_hours
+        }
+
+    def weekly_summaries(self, end, weeks):
+        # Total hours and completed days per habit for each of the `weeks` weeks ending on `end`
+        # (arrays shaped habits x weeks, oldest week first)
+        last = date.fromisoformat(end)
+        first = (last - timedelta(days=weeks * 7 - 1)).strftime("%Y-%m-%d")
+        hours = self.window(first, end).reshape(len(self.numbers), weeks, 7)
+        return {
+            'numbers': self.numbers,
+            'total_hours': hours.sum(axis=2),
+            'completed_days': (hours >= self.target_hours[:, None, None]).sum(axis=2)
+        }
+
+    # --- Round trip with the JSON document ---
+
+    def to_habits(self, today=None):
+        # Rebuild the habits list in the habits_data.json schema (today_hours as of `today`,
+        # by default the day the matrix was built for)
+        today = today or self.today
+        today_column = self.column(today)
+        habits = []
+        for row, number in enumerate(self.numbers):
+            columns = np.flatnonzero(self.recorded[row])
+            daily_progress = {
+                self.date_key(column): round(float(self.hours[row, column]), 4) for column in columns
+            }
+            target = round(float(self.target_hours[row]), 4)
+            today_hours = daily_progress.get(today, 0) if today_column is not None else 0
+            habits.append({
+                "number": number,
+                "name": self.names[row],
+                "target_hours": target,
+                "today_hours": today_hours,
+                "completed": today_hours >= target,
+                "daily_progress": daily_progress,
+                "created_date": self.created_dates[row]
+            })
+        return habits
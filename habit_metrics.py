@@ -0,0 +1,186 @@
+# HABIT_METRICS
+
+# Opt-in timing for SmartHabit operations. Nothing is measured until enable() is called
+# (or SMARTHABIT_METRICS=1 is set): the timing wrappers are installed on SmartHabit only
+# then, so disabled metrics add no cost to the tracker's methods.
+#
+#   import habit_metrics
+#   habit_metrics.enable()
+#   ...
+#   print(habit_metrics.metrics.report())
+
+import functools
+import json
+import os
+import threading
+import time
+
+from smart_habit import SmartHabit
+
+# Histogram bucket upper bounds in milliseconds; slower calls land in a final overflow bucket
+BUCKETS_MS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+# SmartHabit methods timed when enabled. With a background saver, save_data only schedules
+# the write: the disk write itself is timed as _write_data (and flush when forced)
+OPERATIONS = (
+    'load_data', 'save_data', '_write_data', 'flush', 'refresh', 'calculate_daily_score',
+    'get_weekly_progress', 'get_progress_range', 'find_habit_by_number', 'habit_exists', 'import_progress',
+)
+
+
+class Histogram:
+    """
+    Call count, total/min/max time and a fixed-bucket latency histogram for one operation.
+    """
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds):
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = max(self.max, ms)
+        for index, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction):
+        # Upper bound (ms) of the bucket holding the given fraction of calls
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets[:-1]):
+            seen += count
+            if seen >= wanted:
+                return min(BUCKETS_MS[index], self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / self.count, 4) if self.count else 0.0,
+            'min_ms': round(self.min or 0.0, 4),
+            'max_ms': round(self.max, 4),
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'buckets': dict(zip([f"<={bound}ms" for bound in BUCKETS_MS] + ["slower"], self.buckets))
+        }
+
+
+class Metrics:
+    """
+    Process-wide latency histograms keyed by operation name. record() and
+    timer() do nothing while disabled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._originals = {}  # method name -> undecorated SmartHabit method
+
+    def enable(self):
+        # Start measuring and time SmartHabit's OPERATIONS
+        with self._lock:
+            for name in OPERATIONS:
+                if name not in self._originals:
+                    method = getattr(SmartHabit, name)
+                    self._originals[name] = method
+                    setattr(SmartHabit, name, self._timed(name, method))
+            self.enabled = True
+
+    def disable(self):
+        # Stop measuring and put the original methods back (collected figures are kept)
+        with self._lock:
+            for name, method in self._originals.items():
+                setattr(SmartHabit, name, method)
+            self._originals = {}
+            self.enabled = False
+
+    def _timed(self, name, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+        return timed
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def timer(self, name):
+        # Context manager timing a block (e.g. a page render) under `name`
+        return _Timer(self, name)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def snapshot(self):
+        # {name: histogram dict}, sorted by name
+        with self._lock:
+            return {name: self.histograms[name].to_dict() for name in sorted(self.histograms)}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def report(self):
+        # Plain-text table of every operation
+        lines = [f"{'operation':<28}{'calls':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}{'total ms':>12}"]
+        for name, stats in self.snapshot().items():
+            lines.append(
+                f"{name:<28}{stats['count']:>8}{stats['mean_ms']:>10.3f}{stats['p95_ms']:>10.3f}"
+                f"{stats['max_ms']:>10.3f}{stats['total_ms']:>12.3f}"
+            )
+        return "\n".join(lines)
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.name, time.perf_counter() - self.started)
+
+
+metrics = Metrics()
+
+
+def enable():
+    metrics.enable()
+
+
+def disable():
+    metrics.disable()
+
+
+if os.environ.get("SMARTHABIT_METRICS", "").lower() in ("1", "true", "yes"):
+    enable()
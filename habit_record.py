@@ -0,0 +1,169 @@
+# HABIT_RECORD
+
+import math
+from array import array
+from collections.abc import MutableMapping
+from datetime import date
+
+NOT_RECORDED = float('nan')
+
+
+class DayProgress(MutableMapping):
+    """
+    daily_progress stored as a dense array('f') of hours, one slot per day
+    from a base day ordinal (normally the habit's created_date). Unrecorded
+    days hold NaN, so the "YYYY-MM-DD" -> hours mapping seen by the rest of
+    the code (and written to JSON) is exactly the one that was loaded.
+    Hours are float32 and come back rounded to 4 decimals.
+    """
+
+    __slots__ = ('base', 'hours', 'count')
+
+    def __init__(self, progress=None, base=None):
+        self.base = base  # ordinal of hours[0]; None until the first day is stored
+        self.hours = array('f')
+        self.count = 0  # number of recorded days
+        if progress:
+            if self.base is None:
+                self.base = min(date.fromisoformat(day).toordinal() for day in progress)
+            for day, value in progress.items():
+                self[day] = value
+
+    def _index(self, day):
+        return date.fromisoformat(day).toordinal() - self.base if self.base is not None else -1
+
+    def _value(self, index):
+        if 0 <= index < len(self.hours):
+            value = self.hours[index]
+            if not math.isnan(value):
+                return round(value, 4)
+        return None
+
+    def __getitem__(self, day):
+        value = self._value(self._index(day))
+        if value is None:
+            raise KeyError(day)
+        return value
+
+    def get(self, day, default=None):
+        value = self._value(self._index(day))
+        return default if value is None else value
+
+    def __contains__(self, day):
+        return self._value(self._index(day)) is not None
+
+    def __setitem__(self, day, hours):
+        ordinal = date.fromisoformat(day).toordinal()
+        if self.base is None:
+            self.base = ordinal
+        if ordinal < self.base:
+            # Back-filled before the first stored day: shift the array
+            self.hours = array('f', [NOT_RECORDED]) * (self.base - ordinal) + self.hours
+            self.base = ordinal
+        index = ordinal - self.base
+        if index >= len(self.hours):
+            self.hours.extend([NOT_RECORDED] * (index + 1 - len(self.hours)))
+        if math.isnan(self.hours[index]):
+            self.count += 1
+        self.hours[index] = hours
+
+    def __delitem__(self, day):
+        index = self._index(day)
+        if self._value(index) is None:
+            raise KeyError(day)
+        self.hours[index] = NOT_RECORDED
+        self.count -= 1
+
+    def __iter__(self):
+        for index, value in enumerate(self.hours):
+            if not math.isnan(value):
+                yield date.fromordinal(self.base + index).isoformat()
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"DayProgress({dict(self)!r})"
+
+
+class Habit:
+    """
+    Compact habit record: attributes in __slots__ instead of a per-habit dict,
+    and daily_progress as DayProgress. Supports the dict-style access used
+    throughout SmartHabit and the apps (habit['name'], habit.get(...),
+    'created_date' in habit), and converts to and from the JSON schema.
+    """
+
+    __slots__ = ('number', 'name', 'target_hours', 'today_hours', 'completed', 'daily_progress', 'created_date')
+
+    def __init__(self, number, name, target_hours, daily_progress=None, created_date=None,
+                 today_hours=0, completed=False):
+        self.number = number
+        self.name = name
+        self.target_hours = target_hours
+        self.today_hours = today_hours
+        self.completed = completed
+        base = date.fromisoformat(created_date).toordinal() if created_date else None
+        self.daily_progress = (
+            daily_progress if isinstance(daily_progress, DayProgress) else DayProgress(daily_progress, base)
+        )
+        if created_date is not None:
+            self.created_date = created_date
+
+    @classmethod
+    def from_dict(cls, habit):
+        # Build a record from a habits_data.json habit dict
+        return cls(
+            habit['number'], habit['name'], habit['target_hours'],
+            daily_progress=habit.get('daily_progress'),
+            created_date=habit.get('created_date'),
+            today_hours=habit.get('today_hours', 0),
+            completed=habit.get('completed', False)
+        )
+
+    def to_dict(self):
+        # The habits_data.json representation
+        return {key: dict(value) if key == 'daily_progress' else value for key, value in self.items()}
+
+    # --- dict-style access ---
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key == 'daily_progress' and not isinstance(value, DayProgress):
+            value = DayProgress(value)
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def __eq__(self, other):
+        if isinstance(other, Habit):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Habit({self.number!r}, {self.name!r}, target_hours={self.target_hours!r})"
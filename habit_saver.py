@@ -0,0 +1,110 @@
+# HABIT_SAVER
+
+# Debounced background saving: save requests only mark the data dirty, and a writer thread
+# performs one write once no new request has arrived for `delay` seconds (and at most
+# `max_delay` seconds after the first one), so a burst of progress updates costs one write.
+
+import atexit
+import threading
+import time
+import weakref
+
+# Savers not closed yet, flushed at interpreter exit (held weakly so a dropped saver can be collected)
+_open_savers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_savers():
+    for saver in list(_open_savers):
+        saver.close()
+
+
+class BackgroundSaver:
+    """
+    Coalesces save requests into one call of `write` on a daemon thread.
+    flush() writes pending changes right away; close() flushes and stops
+    the thread, and runs automatically at interpreter exit.
+    """
+
+    def __init__(self, write, delay=1.0, max_delay=None):
+        self.write = write
+        self.delay = delay
+        self.max_delay = max_delay if max_delay is not None else delay * 10
+        self.writes = 0
+        self.last_error = None
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # one write at a time (thread or flush)
+        self._dirty_since = None  # time.monotonic() of the first unsaved request
+        self._due = None  # when the pending write runs
+        self._closed = False
+        self._thread = None
+        _open_savers.add(self)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def dirty(self):
+        return self._dirty_since is not None
+
+    def mark_dirty(self):
+        # Request a save; a burst of requests is written once
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("saver is closed")
+            now = time.monotonic()
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._due = min(now + self.delay, self._dirty_since + self.max_delay)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="habit-saver", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def flush(self):
+        # Write pending changes now, in the calling thread; returns True if anything was written
+        with self._write_lock:
+            with self._condition:
+                if self._dirty_since is None:
+                    return False
+                self._dirty_since = self._due = None
+            self._write()
+            return True
+
+    def close(self):
+        # Flush and stop the writer thread (idempotent)
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        _open_savers.discard(self)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and (self._due is None or time.monotonic() < self._due):
+                    self._condition.wait(None if self._due is None else self._due - time.monotonic())
+                if self._closed:
+                    return
+            self.flush()
+
+    def _write(self):
+        try:
+            self.write()
+            self.writes += 1
+            self.last_error = None
+        except Exception as error:
+            # Keep the changes pending and try again after another delay
+            self.last_error = error
+            print(f"Background save failed: {error}")
+            with self._condition:
+                if self._dirty_since is None:
+                    self._dirty_since = time.monotonic()
+                    self._due = self._dirty_since + self.delay
+            if threading.current_thread() is not self._thread:
+                raise
@@ -0,0 +1,706 @@
+# HABIT_STORE
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import shutil
+import sqlite3
+from collections.abc import MutableMapping
+from datetime import date, datetime, timedelta
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+# Storage interface used by SmartHabit
+class HabitStore:
+    """
+    A store loads the habits document once and then persists changes.
+    SmartHabit reports every mutation through record() as an add / log /
+    delete record, and calls save() whenever the caller asks to persist.
+    Derived data (statistics and the like) is handed to save() as a
+    callable derived(numbers=None) returning {name: {habit number: data}}
+    (only those habits when numbers are given), called only when the store
+    writes it; it comes back from load() under 'derived'.
+    Stores with `pages_history` answer history queries from an index, so
+    SmartHabit keeps only recently used history in memory by default.
+    """
+
+    pages_history = False
+
+    def load(self, today=None):
+        # Return {'habits': [...], 'next_number': n, 'derived': {...}} or None when there is no data yet;
+        # stores that derive 'today_hours' do so for `today` (the caller's clock), defaulting to now
+        raise NotImplementedError
+
+    def load_metadata(self, today=None):
+        # Like load(), but habits come without 'daily_progress'; fetch it with load_progress().
+        # This fallback parses the whole document and keeps its history in memory, so it saves
+        # nothing: SmartHabit loads lazily only from stores with `pages_history`
+        data = self.load(today)
+        self._history = {}
+        if data is not None:
+            for habit in data.get('habits', []):
+                self._history[habit['number']] = habit.pop('daily_progress', {})
+        return data
+
+    def load_progress(self, habit_number, start=None, end=None):
+        # {date: hours} for one habit, limited to start..end (inclusive) when given
+        return filter_progress(self._history.get(habit_number, {}), start, end)
+
+    def iter_progress(self, habit_number, start=None, end=None):
+        # (date, hours) pairs for one habit in date order, limited to start..end when given
+        return iter(sorted(self.load_progress(habit_number, start, end).items()))
+
+    def progress_on(self, date):
+        # {habit_number: hours} for a single day, across all habits
+        return {number: days[date] for number, days in self._history.items() if date in days}
+
+    def progress_between(self, start, end, habit_numbers=None):
+        # {habit_number: {date: hours}} for start <= date <= end, optionally for some habits only
+        numbers = self._history if habit_numbers is None else habit_numbers
+        result = {}
+        for number in numbers:
+            days = self.load_progress(number, start, end)
+            if days:
+                result[number] = days
+        return result
+
+    def journal_records(self):
+        # Mutation records written since the last snapshot (or the last call), replayed on top of load()
+        return []
+
+    def detect_change(self):
+        # What another writer changed since we last loaded or saved:
+        # None, 'journal' (new journal records only) or 'snapshot' (reload everything)
+        return None
+
+    def record(self, record):
+        # Note a mutation record (add / log / delete)
+        pass
+
+    def save(self, habits, next_number, derived=None):
+        # Persist everything changed since the last save
+        raise NotImplementedError
+
+    def snapshot(self, habits, next_number, derived=None):
+        # Persist the complete document
+        self.save(habits, next_number, derived)
+
+    def lock(self):
+        # Inter-process lock held while checking for other writers and saving
+        return FileLock(self.data_file + ".lock")
+
+    def close(self):
+        pass
+
+
+class JsonHabitStore(HabitStore):
+    """
+    The habits_data.json document. Snapshots are written atomically and the
+    previous `backups` generations are kept as data_file.1, data_file.2, ...
+    In journal mode save() only appends the pending mutation records to
+    data_file.journal, and the journal is folded into a snapshot after
+    `compact_every` records.
+    """
+
+    def __init__(self, data_file="habits_data.json", journal=False, compact_every=200, backups=3):
+        self.data_file = data_file
+        self.journal = journal
+        self.journal_file = data_file + ".journal"
+        self.compact_every = compact_every
+        self.backups = backups
+        self._pending = []  # mutation records not yet written to the journal
+        self._journal_entries = 0
+        self._loaded_path = None  # snapshot generation the data came from
+        # Change detection for shared trackers: the data file's stat signature when we last
+        # read or wrote it, and how many journal bytes we have applied
+        self._snapshot_signature = None
+        self._journal_offset = 0
+
+    def load(self, today=None):
+        #Load data from JSON file, falling back to the newest valid backup generation
+        self._pending = []
+        self._journal_entries = 0
+        self._journal_offset = 0
+        self._snapshot_signature = self._stat(self.data_file)
+        found = False
+        for path in self.snapshot_generations():
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if not isinstance(data, dict) or not isinstance(data.get('habits', []), list):
+                    raise ValueError("unexpected document layout")
+            except FileNotFoundError:
+                continue
+            except ValueError:
+                print(f"Data file {path} is corrupted, trying an older copy.")
+                found = True
+                continue
+            if path == self.data_file:
+                print("Data loaded successfully!")
+            else:
+                print(f"Recovered data from backup {path}.")
+            self._loaded_path = path
+            return data
+
+        print("No valid data file found, starting fresh." if found else "No data file found, starting fresh.")
+        return None
+
+    def journal_records(self):
+        #Yield journal records not applied yet (all of them right after load())
+        if not self.journal:
+            return
+        try:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(self._journal_offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return
+
+        for line in chunk.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                # A torn final line (crash mid-append, or an append still in progress):
+                # leave it unread, everything before it is valid
+                print("Ignoring incomplete journal record.")
+                break
+            self._journal_offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print("Skipping unreadable journal record.")
+                continue
+            self._journal_entries += 1
+            yield record
+
+    def detect_change(self):
+        #Compare the files with what we last read or wrote
+        if self._stat(self.data_file) != self._snapshot_signature:
+            return 'snapshot'
+        if self.journal:
+            journal = self._stat(self.journal_file)
+            size = journal[1] if journal else 0
+            if size < self._journal_offset:
+                # Truncated by another writer's compaction
+                return 'snapshot'
+            if size > self._journal_offset:
+                return 'journal'
+        return None
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def record(self, record):
+        if self.journal:
+            self._pending.append(record)
+
+    def save(self, habits, next_number, derived=None):
+        #Append pending records to the journal, or write a full snapshot without a journal
+        if not self.journal:
+            self.write_snapshot(habits, next_number, derived)
+            return
+        # Derived data is only written with snapshots; replaying the journal on load brings it up to date
+        self.append_journal()
+        if self._journal_entries >= self.compact_every:
+            self.snapshot(habits, next_number, derived)
+
+    def snapshot(self, habits, next_number, derived=None):
+        #Fold the journal into a fresh snapshot and truncate the journal
+        self._pending = []
+        self.write_snapshot(habits, next_number, derived)
+        if self.journal:
+            # Records are idempotent, so a crash before truncation only replays them again
+            with open(self.journal_file, 'w'):
+                pass
+        self._journal_entries = 0
+        self._journal_offset = 0
+
+    def append_journal(self):
+        #Append pending mutation records, one compact JSON object per line
+        if not self._pending:
+            return
+        lines = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in self._pending)
+        data = lines.encode("utf-8")
+        journal = self._stat(self.journal_file)
+        size = journal[1] if journal else 0
+        if size != self._journal_offset and self._ends_torn(size):
+            # Terminate a torn record so ours starts on a fresh line
+            data = b"\n" + data
+        with open(self.journal_file, 'ab') as f:
+            f.write(data)
+        if size == self._journal_offset:
+            # Nobody else appended since our last read, so our own records count as applied
+            self._journal_offset = size + len(data)
+        self._journal_entries += len(self._pending)
+        self._pending = []
+
+    def _ends_torn(self, size):
+        if size == 0:
+            return False
+        with open(self.journal_file, 'rb') as f:
+            f.seek(size - 1)
+            return f.read(1) != b"\n"
+
+    def snapshot_generations(self):
+        #Snapshot paths from newest to oldest: data_file, data_file.1, data_file.2, ...
+        return [self.data_file] + [f"{self.data_file}.{i}" for i in range(1, self.backups + 1)]
+
+    def write_snapshot(self, habits, next_number, derived=None):
+        #Atomically write the full habits document: temp file, fsync, rotate backups, rename
+        data = {
+            'habits': habits,
+            'next_number': next_number,
+            'last_updated': datetime.now().isoformat()
+        }
+        derived = derived() if derived else None
+        if derived:
+            data['derived'] = derived
+        temp_file = self.data_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            # default=dict materializes lazily loaded progress (LazyProgress)
+            json.dump(data, f, indent=2, default=dict)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.rotate_backups()
+        # rename is atomic, so readers see either the old or the new snapshot, never a partial one
+        os.replace(temp_file, self.data_file)
+        self._fsync_directory()
+        self._loaded_path = self.data_file
+        self._snapshot_signature = self._stat(self.data_file)
+
+    def rotate_backups(self):
+        #Shift data_file.N-1 -> data_file.N ... and keep the current snapshot as data_file.1
+        if self.backups < 1 or not os.path.exists(self.data_file):
+            return
+        generations = self.snapshot_generations()
+        for i in range(len(generations) - 1, 1, -1):
+            if os.path.exists(generations[i - 1]):
+                os.replace(generations[i - 1], generations[i])
+        # Hard link so data_file stays in place until the new snapshot replaces it
+        if os.path.exists(generations[1]):
+            os.remove(generations[1])
+        try:
+            os.link(self.data_file, generations[1])
+        except OSError:
+            shutil.copyfile(self.data_file, generations[1])
+
+    def _fsync_directory(self):
+        # Persist the rename itself (POSIX only)
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(self.data_file)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class SqliteHabitStore(HabitStore):
+    """
+    SQLite backend: a `habits` table and a `progress` table keyed on
+    (habit_number, date), so logging one day is a single-row UPSERT and
+    per-day / per-range queries use the index. Only changes reported through
+    record() are persisted by save(); use snapshot() to write everything.
+    """
+
+    pages_history = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS habits (
+            number INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            target_hours REAL NOT NULL,
+            created_date TEXT
+        );
+        CREATE TABLE IF NOT EXISTS progress (
+            habit_number INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            hours REAL NOT NULL,
+            PRIMARY KEY (habit_number, date)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS progress_by_date ON progress (date);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        DROP TABLE IF EXISTS derived;
+        CREATE TABLE IF NOT EXISTS habit_derived (
+            habit_number INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (habit_number, name)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, data_file="habits_data.db"):
+        self.data_file = data_file
+        # Streamlit reruns scripts on different threads
+        self.conn = sqlite3.connect(data_file, check_same_thread=False)
+        self.conn.executescript(self.SCHEMA)
+        self._pending = []
+        # PRAGMA data_version changes only when another connection commits
+        self._data_version = None
+
+    def load(self, today=None):
+        #Load habits with their progress
+        self._pending = []
+        self._data_version = self._current_data_version()
+        next_number = self.conn.execute("SELECT value FROM meta WHERE key = 'next_number'").fetchone()
+        rows = self.conn.execute(
+            "SELECT number, name, target_hours, created_date FROM habits ORDER BY number"
+        ).fetchall()
+        if next_number is None and not rows:
+            print("No data file found, starting fresh.")
+            return None
+
+        progress = {}
+        for number, date, hours in self.conn.execute("SELECT habit_number, date, hours FROM progress"):
+            progress.setdefault(number, {})[date] = hours
+
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        habits = []
+        for number, name, target_hours, created_date in rows:
+            daily_progress = progress.get(number, {})
+            today_hours = daily_progress.get(today, 0)
+            habits.append({
+                "number": number,
+                "name": name,
+                "target_hours": target_hours,
+                "today_hours": today_hours,
+                "completed": today_hours >= target_hours,
+                "daily_progress": daily_progress,
+                "created_date": created_date
+            })
+        print("Data loaded successfully!")
+        return {
+            'habits': habits,
+            'next_number': int(next_number[0]) if next_number else max(h['number'] for h in habits) + 1,
+            'derived': self._load_derived()
+        }
+
+    def load_metadata(self, today=None):
+        #Load habits without their history; today's hours come from the date index
+        self._pending = []
+        self._data_version = self._current_data_version()
+        next_number = self.conn.execute("SELECT value FROM meta WHERE key = 'next_number'").fetchone()
+        rows = self.conn.execute(
+            "SELECT number, name, target_hours, created_date FROM habits ORDER BY number"
+        ).fetchall()
+        if next_number is None and not rows:
+            print("No data file found, starting fresh.")
+            return None
+
+        today_progress = self.progress_on(today or datetime.now().strftime("%Y-%m-%d"))
+        habits = []
+        for number, name, target_hours, created_date in rows:
+            today_hours = today_progress.get(number, 0)
+            habits.append({
+                "number": number,
+                "name": name,
+                "target_hours": target_hours,
+                "today_hours": today_hours,
+                "completed": today_hours >= target_hours,
+                "created_date": created_date
+            })
+        print("Data loaded successfully!")
+        return {
+            'habits': habits,
+            'next_number': int(next_number[0]) if next_number else max(h['number'] for h in habits) + 1,
+            'derived': self._load_derived()
+        }
+
+    def load_progress(self, habit_number, start=None, end=None):
+        #Read one habit's history through the (habit_number, date) index
+        return dict(self.iter_progress(habit_number, start, end))
+
+    def iter_progress(self, habit_number, start=None, end=None):
+        #Stream one habit's history from the cursor, in (habit_number, date) index order
+        query = "SELECT date, hours FROM progress WHERE habit_number = ?"
+        params = [habit_number]
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND date <= ?"
+            params.append(end)
+        return self.conn.execute(query + " ORDER BY date", params)
+
+    def detect_change(self):
+        return 'snapshot' if self._current_data_version() != self._data_version else None
+
+    def _current_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def record(self, record):
+        self._pending.append(record)
+
+    def save(self, habits, next_number, derived=None):
+        #Apply pending mutation records in one transaction
+        pending, self._pending = self._pending, []
+        touched = {record['habit']['number'] if record['op'] == 'add' else record['number'] for record in pending}
+        with self.conn:
+            for record in pending:
+                self._apply(record)
+            self._set_next_number(next_number)
+            self._save_derived(derived, touched)
+
+    def snapshot(self, habits, next_number, derived=None):
+        #Replace the stored document with the given habits
+        self._pending = []
+        with self.conn:
+            self.conn.execute("DELETE FROM progress")
+            self.conn.execute("DELETE FROM habits")
+            self.conn.executemany(
+                "INSERT INTO habits (number, name, target_hours, created_date) VALUES (?, ?, ?, ?)",
+                [(h['number'], h['name'], h['target_hours'], h.get('created_date')) for h in habits]
+            )
+            self.conn.executemany(
+                "INSERT INTO progress (habit_number, date, hours) VALUES (?, ?, ?)",
+                [(h['number'], day, hours) for h in habits for day, hours in h.get('daily_progress', {}).items() if hours]
+            )
+            self._set_next_number(next_number)
+            self._save_derived(derived)
+
+    def progress_between(self, start, end, habit_numbers=None):
+        #Return {habit_number: {date: hours}} for start <= date <= end
+        query = "SELECT habit_number, date, hours FROM progress WHERE date BETWEEN ? AND ?"
+        params = [start, end]
+        if habit_numbers is not None:
+            habit_numbers = list(habit_numbers)
+            query += f" AND habit_number IN ({','.join('?' * len(habit_numbers))})"
+            params += habit_numbers
+        result = {}
+        for number, date, hours in self.conn.execute(query, params):
+            result.setdefault(number, {})[date] = hours
+        return result
+
+    def progress_on(self, date):
+        #Return {habit_number: hours} for a single day
+        return dict(self.conn.execute("SELECT habit_number, hours FROM progress WHERE date = ?", (date,)))
+
+    def close(self):
+        self.conn.close()
+
+    def _apply(self, record):
+        op = record.get('op')
+        if op == 'add':
+            habit = record['habit']
+            self.conn.execute(
+                "INSERT OR REPLACE INTO habits (number, name, target_hours, created_date) VALUES (?, ?, ?, ?)",
+                (habit['number'], habit['name'], habit['target_hours'], habit.get('created_date'))
+            )
+        elif op == 'log' and not record['hours']:
+            # A missing row reads as 0 hours, so zeros are not stored
+            self.conn.execute(
+                "DELETE FROM progress WHERE habit_number = ? AND date = ?", (record['number'], record['date'])
+            )
+        elif op == 'log':
+            self.conn.execute(
+                "INSERT INTO progress (habit_number, date, hours) VALUES (?, ?, ?) "
+                "ON CONFLICT (habit_number, date) DO UPDATE SET hours = excluded.hours",
+                (record['number'], record['date'], record['hours'])
+            )
+        elif op == 'delete':
+            self.conn.execute("DELETE FROM progress WHERE habit_number = ?", (record['number'],))
+            self.conn.execute("DELETE FROM habits WHERE number = ?", (record['number'],))
+
+    def _load_derived(self):
+        derived = {}
+        for number, name, data in self.conn.execute("SELECT habit_number, name, data FROM habit_derived"):
+            derived.setdefault(name, {})[str(number)] = json.loads(data)
+        return derived
+
+    def _save_derived(self, derived, numbers=None):
+        # Replace derived rows in the same transaction as the data, so none outlive a change:
+        # all of them, or only the rows of the habits in `numbers` (those changed by this save)
+        if numbers is None:
+            self.conn.execute("DELETE FROM habit_derived")
+        elif not numbers:
+            return
+        else:
+            self.conn.executemany("DELETE FROM habit_derived WHERE habit_number = ?", [(n,) for n in numbers])
+        rows = [
+            (int(number), name, json.dumps(data, separators=(",", ":")))
+            for name, by_habit in (derived(numbers) if derived else {}).items()
+            for number, data in by_habit.items()
+        ]
+        self.conn.executemany("INSERT OR REPLACE INTO habit_derived (habit_number, name, data) VALUES (?, ?, ?)", rows)
+
+    def _set_next_number(self, next_number):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('next_number', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (str(next_number),)
+        )
+
+
+# Per-user data files: <root>/<2 hex digits of the id's hash>/<user id><extension>
+USER_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.@-]{0,63}")
+
+
+def user_data_file(root, user_id, extension=".json"):
+    """
+    Data file of one user's shard. Users are spread over 256 subdirectories
+    so no directory grows with the user count; each user's load and save
+    touch only their own file.
+    """
+    if not isinstance(user_id, str) or not USER_ID_PATTERN.fullmatch(user_id):
+        raise ValueError(f"invalid user id {user_id!r}")
+    shard = hashlib.sha1(user_id.encode()).hexdigest()[:2]
+    directory = os.path.join(root, shard)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, user_id + extension)
+
+
+def iter_user_ids(root, extension=".json"):
+    # User ids with a data file under root, shard by shard
+    if not os.path.isdir(root):
+        return
+    for shard in sorted(os.listdir(root)):
+        directory = os.path.join(root, shard)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(extension) and USER_ID_PATTERN.fullmatch(name[:-len(extension)]):
+                yield name[:-len(extension)]
+
+
+class FileLock:
+    """
+    Advisory exclusive lock on a sidecar file (flock on POSIX, msvcrt on
+    Windows). Cooperating SmartHabit processes take it around save_data;
+    where neither is available it only serializes nothing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+def filter_progress(progress, start=None, end=None):
+    # Keep the days of a {date: hours} dict that fall within start..end (inclusive)
+    if start is None and end is None:
+        return dict(progress)
+    return {
+        day: hours for day, hours in progress.items()
+        if (start is None or day >= start) and (end is None or day <= end)
+    }
+
+
+class LazyProgress(MutableMapping):
+    """
+    A habit's daily_progress that is fetched from the store on first use.
+    Days from `window_start` onwards are loaded first; touching an older day,
+    or iterating over all days, pages in the rest of the history once.
+    """
+
+    def __init__(self, store, habit_number, window_start):
+        self._store = store
+        self._habit_number = habit_number
+        self._window_start = window_start
+        self._days = None  # None until the recent window is loaded
+        self._complete = False
+
+    @property
+    def complete(self):
+        return self._complete
+
+    @property
+    def loaded(self):
+        # False until the recent window has been read from the store
+        return self._days is not None
+
+    def _recent(self):
+        if self._days is None:
+            self._days = self._store.load_progress(self._habit_number, start=self._window_start)
+        return self._days
+
+    def _all(self):
+        if not self._complete:
+            recent = self._recent()
+            cutoff = (date.fromisoformat(self._window_start) - timedelta(days=1)).isoformat()
+            days = self._store.load_progress(self._habit_number, end=cutoff)
+            # Changes already made in memory win over what is stored
+            days.update(recent)
+            self._days = days
+            self._complete = True
+        return self._days
+
+    def iter_days(self, start=None, end=None):
+        # (day, hours) in date order for start..end, streaming older history from the store
+        # without paging it in; days changed in memory win over stored ones
+        if self._days is None:
+            # Nothing read or written yet: the store has every day
+            return self._store.iter_progress(self._habit_number, start, end)
+        if self._complete:
+            return iter(sorted(filter_progress(self._days, start, end).items()))
+        recent = sorted(filter_progress(self._recent(), start, end).items())
+        cutoff = (date.fromisoformat(self._window_start) - timedelta(days=1)).isoformat()
+        changed = {day for day, _ in recent}
+        stored = (
+            (day, hours) for day, hours in self._store.iter_progress(self._habit_number, start, min(end or cutoff, cutoff))
+            if day not in changed
+        )
+        return heapq.merge(stored, recent)
+
+    def _days_for(self, day):
+        return self._recent() if self._complete or day >= self._window_start else self._all()
+
+    def __getitem__(self, day):
+        return self._days_for(day)[day]
+
+    def __contains__(self, day):
+        return day in self._days_for(day)
+
+    def __setitem__(self, day, hours):
+        # Writes never need the old history: it is merged underneath on page-in
+        self._recent()[day] = hours
+
+    def __delitem__(self, day):
+        del self._all()[day]
+
+    def __iter__(self):
+        return iter(self._all())
+
+    def __len__(self):
+        return len(self._all())
+
+    def __repr__(self):
+        state = "complete" if self._complete else ("recent" if self._days is not None else "not loaded")
+        return f"LazyProgress(habit={self._habit_number}, {state})"
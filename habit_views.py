@@ -0,0 +1,92 @@
+# HABIT_VIEWS
+
+# Memoized view models for the Streamlit pages. Every result is stamped with the tracker's
+# data_version and today's date: a rerun that changed nothing (switching pages, moving a
+# widget) is served from the cache, and the first read after any mutation, reload or
+# date change recomputes. Cached values are shared between sessions, so treat them as
+# read-only.
+
+import threading
+from collections import OrderedDict
+
+
+class HabitViews:
+    """
+    Cached score, search and per-habit views of one tracker. Per-habit views
+    (weekly progress, statistics, rollups) are kept for at most `max_habits`
+    habits and search results for at most `max_searches` searches, evicting
+    the least recently used first.
+    """
+
+    def __init__(self, tracker, max_habits=64, max_searches=32):
+        self.tracker = tracker
+        self.max_habits = max_habits
+        self.max_searches = max_searches
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._stamp = None  # (data_version, today) the cached values belong to
+        self._views = {}  # view key -> value
+        self._habit_views = OrderedDict()  # habit number -> {view key: value}, least recent first
+        self._searches = OrderedDict()  # (query, offset, limit) -> search result, least recent first
+
+    def daily_score(self):
+        # calculate_daily_score() without the per-habit scores
+        return self._get(None, ('score',), lambda: self.tracker.calculate_daily_score(include_habit_scores=False))
+
+    def search(self, query="", offset=0, limit=None):
+        return self._get('search', (query, offset, limit), lambda: self.tracker.search_habits(query, offset, limit))
+
+    def weekly_progress(self, habit_number):
+        return self._get(habit_number, ('weekly',), lambda: self.tracker.get_weekly_progress(habit_number))
+
+    def habit_statistics(self, habit_number):
+        return self._get(habit_number, ('statistics',), lambda: self.tracker.get_habit_statistics(habit_number))
+
+    def rollups(self, period, habit_number):
+        # Rollup rows of one habit
+        return self._get(
+            habit_number, ('rollups', period), lambda: self.tracker.get_rollups(period, [habit_number])[habit_number]
+        )
+
+    def clear(self):
+        with self._lock:
+            self._stamp = None
+            self._views = {}
+            self._habit_views = OrderedDict()
+            self._searches = OrderedDict()
+
+    def _get(self, habit_number, key, compute):
+        # habit_number None: tracker-wide views, 'search': the search LRU, else that habit's views
+        # Hold the tracker lock so no mutation lands between reading the stamp and computing
+        with self.tracker.lock, self._lock:
+            stamp = (self.tracker.data_version, self.tracker.clock.today_key())
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self._views = {}
+                self._habit_views = OrderedDict()
+                self._searches = OrderedDict()
+
+            if habit_number is None:
+                views = self._views
+            elif habit_number == 'search':
+                views = self._searches
+                if key in views:
+                    views.move_to_end(key)
+                elif len(views) >= self.max_searches:
+                    views.popitem(last=False)
+            else:
+                views = self._habit_views.get(habit_number)
+                if views is None:
+                    views = self._habit_views[habit_number] = {}
+                    if len(self._habit_views) > self.max_habits:
+                        self._habit_views.popitem(last=False)
+                else:
+                    self._habit_views.move_to_end(habit_number)
+
+            if key in views:
+                self.hits += 1
+                return views[key]
+            self.misses += 1
+            value = views[key] = compute()
+            return value
@@ -1,74 +1,420 @@
 # SMART_HABIT_PROGRAM
 
+import csv
 import json
-from datetime import datetime, timedelta
+import threading
+import time
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from habit_analytics import (
+    ROLLUP_PERIODS, DailyScoreAggregate, HabitStatistics, HabitSummary, RollupTables, period_bounds, progress_items
+)
+from habit_clock import SystemClock
+from habit_matrix import ProgressMatrix
+from habit_record import Habit
+from habit_saver import BackgroundSaver
+from habit_store import JsonHabitStore, LazyProgress, filter_progress, user_data_file
+
+# Root directory of the per-user data files (see habit_store.user_data_file)
+USERS_DIR = "habit_users"
+
+# Columns of iter_progress_rows() / export_progress()
+EXPORT_FIELDS = ('number', 'name', 'date', 'hours', 'target_hours', 'completed')
+
+class HabitList(Sequence):
+    """
+    Read-only view of the tracker's habit list: indexing, slicing, len()
+    and iteration work as on a list, but there is no way to append, remove
+    or reorder, which would desynchronize the tracker's lookup indexes.
+    Compares equal to lists and tuples with the same habits.
+    """
+
+    __slots__ = ('_habits',)
+
+    def __init__(self, habits):
+        self._habits = habits
+
+    def __getitem__(self, index):
+        return self._habits[index]
+
+    def __len__(self):
+        return len(self._habits)
+
+    def __iter__(self):
+        return iter(self._habits)
+
+    def __eq__(self, other):
+        if isinstance(other, (HabitList, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"HabitList({self._habits!r})"
+
 
 # Create Class 
 class SmartHabit:
-    def __init__(self):
-        self.habits = []  # create an empty list to store habits
+    def __init__(self, data_file="habits_data.json", journal=False, compact_every=200, backups=3, store=None,
+                 incremental_score=False, verify_score=False, lazy=None, resident_days=30, clock=None,
+                 compact_records=False, statistics=False, rollups=False, sparse=False, save_delay=None,
+                 user_id=None, users_dir=USERS_DIR):
+        # Source of "today"; datetime.now is looked up on each read so patching smart_habit.datetime still works
+        self.clock = clock or SystemClock(lambda: datetime.now())
+        # Serializes mutations, saves and reloads across threads (Streamlit reruns run concurrently)
+        self.lock = threading.RLock()
+        # Mutation records since the last save, re-applied if another writer saved first
+        self._unsaved = []
+        # Derived data (see habit_analytics) notified of every habit and progress change
+        self._listeners = []
+        # Bumped on every change to the in-memory data (mutations and reloads)
+        self.data_version = 0
+        # Running per-date totals serving calculate_daily_score; verify_score cross-checks them
+        self.score_aggregate = None
+        self.verify_score = verify_score
+        if incremental_score:
+            self.score_aggregate = DailyScoreAggregate()
+            self._listeners.append(self.score_aggregate)
+        # Per-habit streaks and lifetime totals, saved with the data and restored on load
+        self.statistics = None
+        if statistics:
+            self.statistics = HabitStatistics()
+            self._listeners.append(self.statistics)
+        # Week / month / year totals per habit, saved with the data like the statistics
+        self.rollups = None
+        if rollups:
+            self.rollups = RollupTables()
+            self._listeners.append(self.rollups)
+        # Lazy mode: habit metadata is loaded eagerly, each habit's daily_progress on first use
+        # (the last `resident_days` days first, older days only when touched). Only stores that
+        # index their history (`pages_history`, i.e. SQLite) support it, and there it is on by
+        # default: range and day queries then go to the store. The JSON store has to parse the
+        # whole document on load anyway, so lazy=True is ignored for it (it would save nothing)
+        if lazy is None:
+            lazy = store is not None and store.pages_history and not compact_records
+        self.lazy = lazy
+        self.resident_days = resident_days
+        # Compact records: habits held as habit_record.Habit (slots + day-ordinal progress array)
+        if lazy and compact_records:
+            raise ValueError("lazy and compact_records cannot be combined")
+        self.compact_records = compact_records
+        # Sparse progress: days without hours are simply absent (no today: 0 entries, logging 0 removes the day)
+        self.sparse = sparse
+        self.habits = []  # create an empty list to store habits (also resets the lookup indexes)
         self.next_number = 1  # habit counter
-        self.data_file = "habits_data.json"
+        # Tenancy: with a user id the tracker works on that user's own data file under users_dir
+        self.user_id = user_id
+        if user_id is not None:
+            if store is not None:
+                raise ValueError("user_id selects the data file; pass a per-user store instead")
+            data_file = user_data_file(users_dir, user_id)
+        # Storage backend: habits_data.json by default, or any HabitStore (e.g. SqliteHabitStore)
+        self.store = store or JsonHabitStore(data_file, journal=journal, compact_every=compact_every, backups=backups)
+        self.data_file = self.store.data_file
+        self.lazy = self.lazy and self.store.pages_history
+        # Debounced saving: save_data() only schedules a background write `save_delay` seconds later
+        # (_write_data is looked up per write, so wrappers installed later, e.g. metrics, see it)
+        self.saver = BackgroundSaver(lambda: self._write_data(), save_delay) if save_delay is not None else None
         self.load_data()
+
+    @property
+    def habits(self):
+        # Habits in insertion order, as a read-only HabitList view; change habits through
+        # create_habit/remove_habit or assign a new list
+        if self._habit_list is None:
+            self._all_habits()
+        return self._habit_view
+
+    def _all_habits(self):
+        # The list behind the habits view: appended to on add, rebuilt from the number index after deletes
+        if self._habit_list is None:
+            self._habit_list = list(self._by_number.values())
+            self._habit_view = HabitList(self._habit_list)
+        return self._habit_list
+
+    @habits.setter
+    def habits(self, habits):
+        self._replace_habits(habits)
+
+    def _replace_habits(self, habits, derived=None):
+        # Replace all habits, rebuild the number and name indexes and reset the listeners,
+        # letting saved listeners adopt their copy from `derived` when it still fits
+        self._by_number = {}  # habit number -> habit
+        self._name_counts = {}  # normalized habit name -> number of habits using it
+        self._habit_list = None
+        for habit in habits:
+            self._index_habit(habit)
+        self.data_version += 1
+        derived = derived or {}
+        # Set when a saved listener was rebuilt instead of restored: the next save then writes
+        # its data for every habit, not just for the habits changed since the last save
+        self._derived_stale = False
+        for listener in self._listeners:
+            name = getattr(listener, 'name', None)
+            if name in derived and listener.restore(self.habits, derived[name]):
+                continue
+            listener.reset(self.habits)
+            self._derived_stale = self._derived_stale or hasattr(listener, 'to_dict')
+
+    def _derived_data(self, numbers=None):
+        # {name: {habit number: data}} for the listeners saved with the data, limited to the
+        # habits in `numbers` when given. Stores call this only when they write derived data
+        if self._derived_stale:
+            numbers = None
+        return {
+            listener.name: listener.to_dict(numbers) for listener in self._listeners if hasattr(listener, 'to_dict')
+        }
+
+    def add_listener(self, listener):
+        # Register derived data to be kept in sync with the habits
+        listener.reset(self.habits)
+        self._listeners.append(listener)
+        self._derived_stale = self._derived_stale or hasattr(listener, 'to_dict')
+
+    def refresh_derived(self):
+        # Rebuild all derived data, e.g. after editing habit dicts directly
+        self._notify('reset', self.habits)
+        self._derived_stale = True
+
+    def _notify(self, event, *args):
+        self.data_version += 1
+        for listener in self._listeners:
+            getattr(listener, event)(*args)
+
+    def _index_habit(self, habit):
+        # Add a habit to the indexes (and to the materialized list, if any)
+        self._by_number[habit['number']] = habit
+        normalized = self._normalize_name(habit['name'])
+        self._name_counts[normalized] = self._name_counts.get(normalized, 0) + 1
+        if self._habit_list is not None:
+            self._habit_list.append(habit)
+
+    def _unindex_habit(self, habit):
+        # Drop a habit from the indexes; the list is rebuilt on next access
+        del self._by_number[habit['number']]
+        normalized = self._normalize_name(habit['name'])
+        self._name_counts[normalized] -= 1
+        if not self._name_counts[normalized]:
+            del self._name_counts[normalized]
+        self._habit_list = None
+
+    @staticmethod
+    def _normalize_name(name):
+        return name.strip().lower()
         
     def load_data(self):
-        #Load data from JSON file
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.habits = data.get('habits', [])
+        #Load data from the store
+        with self.lock:
+            today = self.clock.today_key()
+            data = self.store.load_metadata(today) if self.lazy else self.store.load(today)
+            if data is not None:
+                if self.lazy:
+                    window_start = self.clock.key(self.resident_days - 1)
+                    for habit in data.get('habits', []):
+                        habit['daily_progress'] = LazyProgress(self.store, habit['number'], window_start)
+                habits = data.get('habits', [])
+                if self.compact_records:
+                    habits = [Habit.from_dict(habit) for habit in habits]
+                self._replace_habits(habits, data.get('derived'))
                 self.next_number = data.get('next_number', 1)
-                
-                # Add missing fields for backward compatibility
-                for habit in self.habits:
-                    if 'created_date' not in habit:
-                        habit['created_date'] = datetime.now().strftime("%Y-%m-%d")
-                    if 'daily_progress' not in habit:
-                        habit['daily_progress'] = {}
-                    # Initialize today's tracking for all habits
-                    self.initialize_daily_tracking(habit)
-                print("Data loaded successfully!")
-                        
-        except FileNotFoundError:
-            print("No data file found, starting fresh.")
-            self.habits = []
-            self.next_number = 1
+            else:
+                self.habits = []
+                self.next_number = 1
+            self._unsaved = []
+
+            # Apply mutations logged since the last snapshot
+            for record in self.store.journal_records():
+                self.apply_record(record)
+
+            # Add missing fields for backward compatibility
+            for habit in self.habits:
+                if 'created_date' not in habit:
+                    habit['created_date'] = today
+                if 'daily_progress' not in habit:
+                    habit['daily_progress'] = {}
+                # Initialize today's tracking for all habits
+                self.initialize_daily_tracking(habit, today)
     
+    def refresh(self):
+        #Pick up changes written by other trackers; returns True when the data changed
+        with self.lock:
+            change = self.store.detect_change()
+            if change is None:
+                return False
+            if self._unsaved:
+                # Changes still waiting for the background saver: keep them on top of the new data
+                self._merge_external_changes()
+            elif change == 'journal':
+                # Only new journal records: apply them on top of what we have
+                for record in self.store.journal_records():
+                    self.apply_record(record)
+            else:
+                self.load_data()
+            return True
+
     def save_data(self):
-        #Save data to JSON file
-        data = {
-            'habits': self.habits,
-            'next_number': self.next_number,
-            'last_updated': datetime.now().isoformat()
-        }
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        #Persist changes through the store (or schedule the write when saving in the background)
+        if self.saver is not None and not self.saver.closed:
+            self.saver.mark_dirty()
+            return
+        self._write_data()
         print("Data saved successfully!")
+
+    def flush(self):
+        #Write changes waiting for the background saver now; returns True if anything was written
+        return self.saver.flush() if self.saver is not None else False
+
+    def close(self):
+        #Flush pending changes and stop the background saver
+        if self.saver is not None:
+            self.saver.close()
+
+    def _write_data(self):
+        # Write through the store, holding the inter-process lock
+        with self.lock, self.store.lock():
+            # Optimistic check: if another writer saved since we loaded, merge before writing
+            if self.store.detect_change() is not None:
+                self._merge_external_changes()
+            self.store.save(self._all_habits(), self.next_number, self._derived_data)
+            self._unsaved = []
+            self._derived_stale = False
+
+    def _merge_external_changes(self):
+        # Reload what other writers saved and re-apply our unsaved mutations on top of it
+        local = self._unsaved
+        self.load_data()
+        renumbered = {}
+        for record in local:
+            record = dict(record)
+            if record['op'] == 'add':
+                habit = dict(record['habit'])
+                if habit['number'] < self.next_number:
+                    # The number was handed out by the other writer meanwhile
+                    renumbered[habit['number']] = self.next_number
+                    habit['number'] = self.next_number
+                record['habit'] = habit
+            else:
+                record['number'] = renumbered.get(record['number'], record['number'])
+            self.apply_record(record)
+            self._record(record)
+        if renumbered:
+            print("Habit numbers changed while merging: " +
+                  ", ".join(f"{old} -> {new}" for old, new in renumbered.items()))
+
+    def compact(self):
+        #Write a full snapshot (folds the journal in journal mode)
+        with self.lock, self.store.lock():
+            # Merge what other writers appended first: truncating the journal would drop it
+            if self.store.detect_change() is not None:
+                self._merge_external_changes()
+            self.store.snapshot(self._all_habits(), self.next_number, self._derived_data)
+            self._unsaved = []
+            self._derived_stale = False
+
+    def strip_zero_progress(self):
+        #Drop stored 0-hour days from every habit and write a fresh snapshot; returns how many were removed
+        with self.lock, self.store.lock():
+            if self.store.detect_change() is not None:
+                self._merge_external_changes()
+            removed = 0
+            for habit in self.habits:
+                progress = habit.get('daily_progress', {})
+                zeros = [day for day, hours in progress.items() if hours == 0]
+                for day in zeros:
+                    del progress[day]
+                removed += len(zeros)
+            # A missing day counts as 0 hours, so derived data is unchanged
+            self.data_version += 1
+            self.store.snapshot(self._all_habits(), self.next_number, self._derived_data)
+            self._unsaved = []
+            self._derived_stale = False
+        return removed
+
+    def apply_record(self, record):
+        #Apply a single journal record (add / log / delete) to the in-memory habits
+        op = record.get('op')
+        if op == 'add':
+            habit = dict(record['habit'])
+            if self.find_habit_by_number(habit['number']) is None:
+                habit.setdefault('today_hours', 0)
+                habit.setdefault('completed', False)
+                habit.setdefault('daily_progress', {})
+                if self.compact_records:
+                    habit = Habit.from_dict(habit)
+                self._index_habit(habit)
+                self._notify('habit_added', habit)
+            self.next_number = max(self.next_number, habit['number'] + 1)
+        elif op == 'log':
+            habit = self.find_habit_by_number(record['number'])
+            if habit is not None:
+                self._set_hours(habit, record['date'], record['hours'])
+        elif op == 'delete':
+            habit = self.find_habit_by_number(record['number'])
+            if habit is not None:
+                self._unindex_habit(habit)
+                self._notify('habit_removed', habit)
+
+    def _record(self, record):
+        # Report a mutation to the store
+        self._unsaved.append(record)
+        self.store.record(record)
     
-    def initialize_daily_tracking(self, habit):
+    def initialize_daily_tracking(self, habit, today=None):
         #Initialize daily tracking for habit
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = today or self.clock.today_key()
         
         if 'daily_progress' not in habit:
             habit['daily_progress'] = {}
         
-        # Initialize today with 0 hours if not exists
-        if today not in habit['daily_progress']:
+        # Initialize today with 0 hours if not exists (sparse mode leaves missing days implicit,
+        # and so does lazy mode: checking would page in every habit's recent history on load)
+        if not (self.sparse or self.lazy) and today not in habit['daily_progress']:
             habit['daily_progress'][today] = 0
     
-    def calculate_daily_score(self):
-        #Calculate today's total score for all habits using lambda functions
-        today = datetime.now().strftime("%Y-%m-%d")
-        
+    def calculate_daily_score(self, include_habit_scores=True):
+        #Calculate today's total score for all habits (served from the running aggregate when enabled)
+        with self.lock:
+            today = self.clock.today_key()
+            habit_scores = None
+
+            if self.score_aggregate is not None:
+                ratio_sum, completed_habits, total_habits = self.score_aggregate.score(today)
+                daily_score = ratio_sum / total_habits * 100 if total_habits else 0
+                if self.verify_score:
+                    self.verify_daily_score(today)
+            else:
+                habit_scores, completed_habits = self._score_habits(today)
+                total_habits = len(habit_scores)
+                # Calculate averages using lambda
+                daily_score = (lambda scores: sum(scores) / len(scores))(habit_scores) if habit_scores else 0
+
+            if include_habit_scores and habit_scores is None:
+                habit_scores, _ = self._score_habits(today)
+            
+            return {
+                'date': today,
+                'daily_score': round(daily_score, 1),
+                'completed_habits': completed_habits,
+                'total_habits': total_habits,
+                'completion_percentage': round((completed_habits / total_habits * 100) if total_habits else 0, 1),
+                'habit_scores': habit_scores
+            }
+
+    def _score_habits(self, today):
+        # Per-habit scores and completed count for a day using lambda functions
+
+        hours_today = self._hours_on(self.habits, today)
+
         # Lambda function to calculate completion ratio for a single habit
         calculate_habit_score = lambda habit: (
-            min(habit['daily_progress'].get(today, 0) / habit['target_hours'], 1.0) * 100 
+            min(hours_today[habit['number']] / habit['target_hours'], 1.0) * 100 
             if habit['target_hours'] > 0 else 0
         )
         
         # Lambda function to check if habit is completed today
         is_habit_completed = lambda habit: (
-            habit['daily_progress'].get(today, 0) >= habit['target_hours']
+            hours_today[habit['number']] >= habit['target_hours']
         )
         
         # Calculate scores using map and lambda
@@ -76,56 +422,285 @@ class SmartHabit:
         
         # Count completed habits using filter and lambda
         completed_habits = len(list(filter(is_habit_completed, self.habits)))
-        
-        # Calculate averages using lambda and reduce
-        if self.habits:
-            daily_score = (lambda scores: sum(scores) / len(scores))(habit_scores)
-        else:
-            daily_score = 0
-            
-        return {
-            'date': today,
-            'daily_score': round(daily_score, 1),
-            'completed_habits': completed_habits,
-            'total_habits': len(self.habits),
-            'completion_percentage': round((completed_habits / len(self.habits) * 100) if self.habits else 0, 1),
-            'habit_scores': habit_scores
-        }
+        return habit_scores, completed_habits
+
+    def _hours_on(self, habits, day):
+        # {habit number: hours on day}; lazily loaded habits not yet in memory are served
+        # by one batched (date-indexed) read from the store
+        stored = None
+        hours = {}
+        for habit in habits:
+            progress = habit.get('daily_progress', {})
+            if isinstance(progress, LazyProgress) and not progress.loaded:
+                if stored is None:
+                    stored = self.store.progress_on(day)
+                hours[habit['number']] = stored.get(habit['number'], 0)
+            else:
+                hours[habit['number']] = progress.get(day, 0)
+        return hours
+
+    def _progress_in_range(self, habits, start, end):
+        # {habit number: mapping of the habit's days}, covering at least start..end; lazy history
+        # outside memory is queried from the store (one batched read for unloaded habits)
+        result = {}
+        unloaded = []
+        for habit in habits:
+            progress = habit.get('daily_progress', {})
+            if not isinstance(progress, LazyProgress) or progress.complete:
+                result[habit['number']] = progress
+            elif not progress.loaded:
+                unloaded.append(habit['number'])
+            else:
+                # Recent days in memory (with unsaved changes) merged over the stored range
+                result[habit['number']] = dict(progress.iter_days(start, end))
+        if unloaded:
+            stored = self.store.progress_between(start, end, unloaded)
+            for number in unloaded:
+                result[number] = stored.get(number, {})
+        return result
+
+    def verify_daily_score(self, date=None):
+        #Cross-check the running aggregate against a full recompute
+        date = date or self.clock.today_key()
+        habit_scores, completed_habits = self._score_habits(date)
+        ratio_sum, aggregate_completed, aggregate_total = self.score_aggregate.score(date)
+        if (aggregate_total != len(habit_scores) or aggregate_completed != completed_habits
+                or abs(ratio_sum * 100 - sum(habit_scores)) > 1e-6):
+            raise AssertionError(
+                f"Daily score aggregate out of sync for {date}: "
+                f"aggregate ({ratio_sum * 100:.6f}, {aggregate_completed}/{aggregate_total}) != "
+                f"recomputed ({sum(habit_scores):.6f}, {completed_habits}/{len(habit_scores)})"
+            )
     
+    def progress_matrix(self, start=None, end=None):
+        #Columnar habits x days copy of all progress for vectorized analytics (needs numpy)
+        return ProgressMatrix(self.habits, start, end, today=self.clock.today_key())
+
+    def get_progress_range(self, start, end, habit_numbers=None, include_days=False):
+        #Progress for many habits over start..end ("YYYY-MM-DD", inclusive) in a single pass
+        with self.lock:
+            dates = self._date_keys(start, end)
+            if habit_numbers is None:
+                habits = self.habits
+            else:
+                habits = [habit for habit in map(self.find_habit_by_number, habit_numbers) if habit is not None]
+
+            progress_by_habit = self._progress_in_range(habits, start, end) if self.lazy else None
+            result = {}
+            for habit in habits:
+                if progress_by_habit is None:
+                    progress = habit.get('daily_progress', {})
+                else:
+                    progress = progress_by_habit[habit['number']]
+                target = habit['target_hours']
+                total_hours = 0
+                completed_days = 0
+                percentage_sum = 0
+                days = [] if include_days else None
+                for day in dates:
+                    hours = progress.get(day, 0)
+                    completed = hours >= target
+                    percentage = min((hours / target * 100) if target > 0 else 0, 100)
+                    total_hours += hours
+                    completed_days += completed
+                    percentage_sum += percentage
+                    if include_days:
+                        days.append({
+                            'date': day,
+                            'hours': hours,
+                            'target': target,
+                            'completed': completed,
+                            'completion_percentage': percentage
+                        })
+
+                summary = {
+                    'name': habit['name'],
+                    'target': target,
+                    'total_hours': total_hours,
+                    'completed_days': completed_days,
+                    'average_hours': total_hours / len(dates) if dates else 0,
+                    'average_completion': percentage_sum / len(dates) if dates else 0
+                }
+                if include_days:
+                    summary['days'] = days
+                result[habit['number']] = summary
+            return result
+
+    def _date_keys(self, start, end):
+        # "YYYY-MM-DD" keys for every day from start to end (inclusive), computed once per range
+        first = date.fromisoformat(start)
+        count = (date.fromisoformat(end) - first).days + 1
+        if end == self.clock.today_key():
+            # Windows ending today reuse the clock's memoized keys
+            return [self.clock.key(days_ago) for days_ago in range(count - 1, -1, -1)]
+        return [(first + timedelta(days=offset)).isoformat() for offset in range(count)]
+
     def get_weekly_progress(self, habit_number):
-        #Get weekly progress for a specific habit using lambda functions
-        habit = self.find_habit_by_number(habit_number)
-        if not habit:
+        #Get weekly progress for a specific habit, ordered from today back to 6 days ago
+        progress = self.get_progress_range(
+            self.clock.key(6), self.clock.today_key(), [habit_number], include_days=True
+        )
+        if habit_number not in progress:
             return None
-        
-        # Ensure daily_progress exists
-        if 'daily_progress' not in habit:
-            habit['daily_progress'] = {}
-        
-        # Lambda function to calculate daily progress data
-        calculate_daily_data = lambda days_ago: (
-            lambda date: {
-                'date': date,
-                'hours': habit['daily_progress'].get(date, 0),
-                'target': habit['target_hours'],
-                'completed': habit['daily_progress'].get(date, 0) >= habit['target_hours'],
-                'completion_percentage': min(
-                    (habit['daily_progress'].get(date, 0) / habit['target_hours'] * 100) 
-                    if habit['target_hours'] > 0 else 0, 
-                    100
-                )
+        return progress[habit_number]['days'][::-1]
+
+    def get_habit_statistics(self, habit_number):
+        #Streaks, lifetime totals and rolling averages for one habit (None for an unknown habit)
+        with self.lock:
+            habit = self.find_habit_by_number(habit_number)
+            if habit is None:
+                return None
+            progress = habit.get('daily_progress', {})
+            if self.statistics is not None:
+                summary = self.statistics.summary(habit_number)
+            else:
+                # No running statistics: summarize this habit's history now
+                summary = HabitSummary()
+                for day, hours in progress_items(habit):
+                    summary.update(day, 0, hours, habit['target_hours'])
+
+            today = self.clock.today()
+            created = habit.get('created_date')
+            first_day = today.toordinal() if not created else date.fromisoformat(created).toordinal()
+            if summary.starts:
+                # Back-filled history can start before the habit was created
+                first_day = min(first_day, summary.starts[0])
+            tracked_days = today.toordinal() - first_day + 1
+            # Rolling windows end today; the clock memoizes their date keys
+            last_30 = [progress.get(self.clock.key(days_ago), 0) for days_ago in range(30)]
+            return {
+                'number': habit_number,
+                'name': habit['name'],
+                'current_streak': summary.current_streak(today.toordinal()),
+                'longest_streak': summary.longest_streak(),
+                'lifetime_hours': round(summary.lifetime_hours, 4),
+                'completed_days': summary.completed_days,
+                'completion_rate': round(min(summary.completed_days / max(tracked_days, 1), 1.0) * 100, 1),
+                'average_7_days': round(sum(last_30[:7]) / 7, 2),
+                'average_30_days': round(sum(last_30) / 30, 2)
             }
-        )((datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d"))
-        
-        # Generate weekly data using map and lambda
-        weekly_data = list(map(calculate_daily_data, range(7)))
-        
-        return weekly_data
-    
+
+    def get_statistics(self):
+        #get_habit_statistics() for every habit, keyed by habit number
+        with self.lock:
+            return {habit['number']: self.get_habit_statistics(habit['number']) for habit in self.habits}
+
+    def get_rollups(self, period, habit_numbers=None, start=None, end=None):
+        #Per-period totals for habits: {number: [{'period', 'total_hours', 'completed_days',
+        #'average_hours', 'average_completion'}, ...]} oldest first; start/end are period keys
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Unknown rollup period: {period}")
+        with self.lock:
+            if habit_numbers is None:
+                habits = self.habits
+            else:
+                habits = [habit for habit in map(self.find_habit_by_number, habit_numbers) if habit is not None]
+            rollups = self.rollups
+            if rollups is None:
+                # No running tables: total these habits' history now
+                rollups = RollupTables()
+                rollups.reset(habits)
+
+            today = self.clock.today()
+            result = {}
+            for habit in habits:
+                rows = []
+                for key, (hours, completed, ratio_sum) in sorted(rollups.buckets(period, habit['number']).items()):
+                    if (start is not None and key < start) or (end is not None and key > end):
+                        continue
+                    # Averages are over the period's days so far
+                    first, last = period_bounds(period, key)
+                    days = max((min(last, today) - first).days + 1, 1)
+                    rows.append({
+                        'period': key,
+                        'total_hours': round(hours, 4),
+                        'completed_days': completed,
+                        'average_hours': round(hours / days, 2),
+                        'average_completion': round(ratio_sum / days * 100, 1)
+                    })
+                result[habit['number']] = rows
+            return result
+
+    def iter_progress_rows(self, start=None, end=None, habit_numbers=None):
+        #Yield one row per recorded day (habit by habit, in date order), optionally limited
+        #to start..end and some habits; only one habit's days are held at a time
+        with self.lock:
+            if habit_numbers is None:
+                habits = list(self.habits)
+            else:
+                habits = [habit for habit in map(self.find_habit_by_number, habit_numbers) if habit is not None]
+
+        for habit in habits:
+            progress = habit.get('daily_progress', {})
+            with self.lock:
+                if isinstance(progress, LazyProgress):
+                    # Older history streams from the store instead of being paged in
+                    days = progress.iter_days(start, end)
+                else:
+                    days = sorted(filter_progress(progress, start, end).items())
+            target = habit['target_hours']
+            for day, hours in days:
+                yield {
+                    'number': habit['number'],
+                    'name': habit['name'],
+                    'date': day,
+                    'hours': hours,
+                    'target_hours': target,
+                    'completed': hours >= target
+                }
+
+    def export_progress(self, stream, format='csv', start=None, end=None, habit_numbers=None):
+        #Write iter_progress_rows() to a text stream as CSV (with header) or JSONL; returns the row count
+        rows = self.iter_progress_rows(start, end, habit_numbers)
+        count = 0
+        if format == 'csv':
+            writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS, lineterminator='\n')
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        elif format == 'jsonl':
+            for row in rows:
+                stream.write(json.dumps(row) + "\n")
+                count += 1
+        else:
+            raise ValueError(f"Unknown export format: {format}")
+        return count
+
+    def search_habits(self, query="", offset=0, limit=None):
+        #Habits whose name contains `query` (case-insensitive): (number of matches, matches[offset:offset + limit])
+        with self.lock:
+            query = self._normalize_name(query)
+            habits = self.habits
+            if query:
+                habits = [habit for habit in habits if query in self._normalize_name(habit['name'])]
+            end = None if limit is None else offset + limit
+            return len(habits), habits[offset:end]
+
+    def get_day_progress(self, habits, day=None):
+        #One row per habit (e.g. a page from search_habits) with its hours and completion on a day;
+        #lazily loaded habits not yet in memory are served by one batched read from the store
+        with self.lock:
+            day = day or self.clock.today_key()
+            hours_on_day = self._hours_on(habits, day)
+            rows = []
+            for habit in habits:
+                hours = hours_on_day[habit['number']]
+                target = habit['target_hours']
+                rows.append({
+                    'number': habit['number'],
+                    'name': habit['name'],
+                    'hours': hours,
+                    'target_hours': target,
+                    'completed': hours >= target,
+                    'progress': min(hours / target * 100, 100) if target > 0 else 0,
+                    'created_date': habit.get('created_date')
+                })
+            return rows
+
     def habit_exists(self, name):
         #check if a habit with the same name already exists
-        normalized = name.strip().lower()
-        return any(habit['name'].strip().lower()== normalized for habit in self.habits)
+        return self._normalize_name(name) in self._name_counts
 
     def add_habit(self):
         print(":" * 20)
@@ -158,29 +733,150 @@ class SmartHabit:
                 print("Invalid, Please enter a valid numeric value. ")
                 print(":" * 20)
 
+        habit = self.create_habit(name, target)
+        print(f"Habit '{name}' added with number {habit['number']}")
+        self.save_data()
+
+    def create_habit(self, name, target_hours):
         # create habit dictionary with daily tracking
-        habit = {
-            "number": self.next_number,
-            "name": name,
-            "target_hours": target,
-            "today_hours": 0,
-            "completed": False,
-            "daily_progress": {},
-            "created_date": datetime.now().strftime("%Y-%m-%d")
-        }
+        with self.lock:
+            habit = {
+                "number": self.next_number,
+                "name": name,
+                "target_hours": target_hours,
+                "today_hours": 0,
+                "completed": False,
+                "daily_progress": {},
+                "created_date": self.clock.today_key()
+            }
+            if self.compact_records:
+                habit = Habit.from_dict(habit)
         
-        # Initialize today's tracking
-        self.initialize_daily_tracking(habit)
+            # Initialize today's tracking
+            self.initialize_daily_tracking(habit, habit["created_date"])
         
-        self.habits.append(habit)
-        print(f"Habit '{name}' added with number {self.next_number}")
-        self.next_number += 1
-        self.save_data()
+            self._index_habit(habit)
+            self._notify('habit_added', habit)
+            self.next_number += 1
+            self._record({
+                "op": "add",
+                "habit": {key: habit[key] for key in ("number", "name", "target_hours", "created_date")}
+            })
+            return habit
+
+    def log_progress(self, habit_number, hours, date=None):
+        # Set the hours for a habit on a day (today by default)
+        with self.lock:
+            habit = self.find_habit_by_number(habit_number)
+            if habit is None:
+                return None
+            date = date or self.clock.today_key()
+            self._set_hours(habit, date, hours)
+            self._record({"op": "log", "number": habit_number, "date": date, "hours": hours})
+            return habit
+
+    def import_progress(self, rows, strict=False):
+        # Bulk-log progress rows (dicts with habit/date/hours, JSONL lines holding such a dict,
+        # or (habit, date, hours) tuples):
+        # validate every row, apply the valid ones in one batch and save once
+        started = time.perf_counter()
+        with self.lock:
+            by_name = {}
+            for habit in self.habits:
+                by_name.setdefault(self._normalize_name(habit['name']), habit)
+
+            entries, rejected = [], []
+            for row_number, row in enumerate(rows, 1):
+                try:
+                    entries.append(self._import_entry(row, by_name))
+                except (KeyError, TypeError, ValueError) as error:
+                    rejected.append((row_number, error.args[0] if error.args else str(error)))
+            if rejected and strict:
+                row_number, reason = rejected[0]
+                raise ValueError(f"{len(rejected)} invalid rows, nothing imported (row {row_number}: {reason})")
+
+            for habit, day, hours in entries:
+                self._set_hours(habit, day, hours)
+                self._record({"op": "log", "number": habit['number'], "date": day, "hours": hours})
+            if entries:
+                self.save_data()
+        seconds = time.perf_counter() - started
+        return {
+            'imported': len(entries),
+            'rejected': rejected,
+            'seconds': seconds,
+            'rows_per_sec': len(entries) / seconds if seconds > 0 else 0.0
+        }
+
+    def _import_entry(self, row, by_name):
+        # Validate one import row and return (habit, "YYYY-MM-DD", hours)
+        if isinstance(row, str):
+            # An unparsed JSONL line: a bad line only rejects its own row
+            try:
+                row = json.loads(row)
+            except ValueError:
+                raise ValueError("invalid JSON") from None
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+        if isinstance(row, dict):
+            habit_ref = row.get('habit', row.get('number', row.get('name')))
+            day, hours = row['date'], row['hours']
+        else:
+            habit_ref, day, hours = row
+
+        if isinstance(habit_ref, str) and habit_ref.strip().isdigit():
+            habit_ref = int(habit_ref)
+        if isinstance(habit_ref, int) and not isinstance(habit_ref, bool):
+            habit = self.find_habit_by_number(habit_ref)
+        elif isinstance(habit_ref, str):
+            habit = by_name.get(self._normalize_name(habit_ref))
+        elif habit_ref is None:
+            raise ValueError("missing habit")
+        else:
+            raise ValueError(f"invalid habit reference {habit_ref!r} (expected a number or a name)")
+        if habit is None:
+            raise ValueError(f"unknown habit {habit_ref!r}")
+
+        try:
+            day = date.fromisoformat(str(day).strip()).isoformat()
+        except ValueError:
+            raise ValueError(f"invalid date {day!r}") from None
+        try:
+            hours = float(hours)
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid hours {hours!r}") from None
+        if not 0 <= hours <= 24:
+            raise ValueError(f"hours out of range: {hours}")
+        return habit, day, hours
+
+    def remove_habit(self, habit_number):
+        # Remove a habit by number
+        with self.lock:
+            habit = self.find_habit_by_number(habit_number)
+            if habit is None:
+                return None
+            self._unindex_habit(habit)
+            self._notify('habit_removed', habit)
+            self._record({"op": "delete", "number": habit_number})
+            return habit
+
+    def _set_hours(self, habit, date, hours):
+        # Store hours for a day and keep today's derived fields in sync
+        progress = habit.setdefault('daily_progress', {})
+        old_hours = progress.get(date, 0)
+        if self.sparse and hours == 0:
+            if date in progress:
+                del progress[date]
+        else:
+            progress[date] = hours
+        self._notify('progress_changed', habit, date, old_hours, hours)
+        if date == self.clock.today_key():
+            habit["today_hours"] = hours
+            habit["completed"] = hours >= habit["target_hours"]
 
     def find_habit_by_number(self, habit_number):
-        # Lambda function to find habit by number
-        found_habits = list(filter(lambda habit: habit['number'] == habit_number, self.habits))
-        return found_habits[0] if found_habits else None
+        # Look the habit up in the number index
+        return self._by_number.get(habit_number)
 
     def mark_habit_completed(self):
         print(":" * 20)
@@ -222,10 +918,7 @@ class SmartHabit:
                 print("Invalid input. Enter a numeric value.")
 
         # Update today's progress
-        today = datetime.now().strftime("%Y-%m-%d")
-        habit["today_hours"] = hours
-        habit["daily_progress"][today] = hours
-        habit["completed"] = habit["today_hours"] >= habit["target_hours"]
+        self.log_progress(habit["number"], hours)
         
         total_percentage = (habit["today_hours"] / habit["target_hours"]) * 100
         
@@ -255,6 +948,7 @@ class SmartHabit:
             print(":" * 20)
             return
 
+        today = self.clock.today_key()
         for habit in self.habits:
             print(f"\nHabit Number {habit['number']}:")
             print(f"  Name: {habit['name']}")
@@ -262,7 +956,6 @@ class SmartHabit:
             print(f"  Created: {habit.get('created_date', 'Unknown')}")
             
             # Show today's progress
-            today = datetime.now().strftime("%Y-%m-%d")
             today_hours = habit['daily_progress'].get(today, 0)
             print(f"  Today's hours: {today_hours}h")
             
@@ -291,8 +984,8 @@ class SmartHabit:
         print(f"Completion Rate: {daily_score['completion_percentage']}%")
         
         print("\nHabit Details:")
+        today = daily_score['date']
         for habit in self.habits:
-            today = datetime.now().strftime("%Y-%m-%d")
             today_hours = habit['daily_progress'].get(today, 0)
             target = habit['target_hours']
             status = "✅" if today_hours >= target else "⏳"
@@ -366,7 +1059,7 @@ class SmartHabit:
             # Confirmation
             confirm = input(f"Are you sure you want to delete '{habit['name']}'? (yes/no): ")
             if confirm.lower() in ['yes', 'y']:
-                self.habits.remove(habit)
+                self.remove_habit(habit['number'])
                 print(f"Habit '{habit['name']}' deleted.")
                 self.save_data()
             else:
@@ -406,6 +1099,7 @@ class SmartHabit:
             elif choice == "6":
                 self.show_weekly_progress()
             elif choice == "7":
+                self.flush()
                 print("Goodbye! Keep building good habits! 👋")
                 break
             else:
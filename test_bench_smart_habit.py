@@ -0,0 +1,38 @@
+import unittest
+from datetime import date
+
+from bench_smart_habit import find_regressions, generate_data, run_benchmarks
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """
+    The synthetic data generator and the regression check.
+    """
+
+    def test_generate_data_is_reproducible(self):
+        data = generate_data(5, 10, end=date(2025, 11, 21))
+        self.assertEqual(len(data['habits']), 5)
+        self.assertEqual(data['next_number'], 6)
+        self.assertTrue(all(len(h['daily_progress']) <= 10 for h in data['habits']))
+        self.assertIn("2025-11-21", set().union(*(h['daily_progress'] for h in data['habits'])))
+        self.assertEqual(data, generate_data(5, 10, end=date(2025, 11, 21)))
+
+    def test_find_regressions(self):
+        baseline = {'load_data': {'seconds': 0.010}, 'save_data': {'seconds': 0.010}}
+        results = {
+            'load_data': {'seconds': 0.0115},   # within 25%
+            'save_data': {'seconds': 0.020},    # 2x slower
+            'new_operation': {'seconds': 1.0},  # no baseline yet
+        }
+        self.assertEqual(find_regressions(results, baseline), [('save_data', 0.010, 0.020)])
+        # Tiny absolute differences are treated as noise
+        self.assertEqual(find_regressions({'load_data': {'seconds': 0.0002}}, {'load_data': {'seconds': 0.0001}}), [])
+
+    def test_run_benchmarks_reports_every_operation(self):
+        results = run_benchmarks(3, 7, repeat=1)
+        self.assertIn('calculate_daily_score', results)
+        self.assertTrue(all(r['seconds'] >= 0 and r['peak_kb'] >= 0 for r in results.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
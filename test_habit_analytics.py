@@ -0,0 +1,347 @@
+import unittest
+import os
+import random
+import tempfile
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from habit_analytics import DailyScoreAggregate, HabitStatistics, HabitSummary, RollupTables, period_bounds, period_keys
+from habit_clock import FixedClock
+from habit_store import SqliteHabitStore
+from smart_habit import SmartHabit
+
+
+def make_habit(number, target_hours, daily_progress):
+    return {
+        "number": number,
+        "name": f"Habit {number}",
+        "target_hours": target_hours,
+        "daily_progress": dict(daily_progress),
+        "created_date": "2025-11-20"
+    }
+
+
+class TestDailyScoreAggregate(unittest.TestCase):
+    """
+    The running per-date totals behind calculate_daily_score.
+    """
+
+    def test_reset_counts_existing_progress(self):
+        aggregate = DailyScoreAggregate()
+        aggregate.reset([
+            make_habit(1, 1.0, {"2025-11-21": 0.5}),
+            make_habit(2, 2.0, {"2025-11-21": 3.0}),
+        ])
+
+        ratio_sum, completed, total = aggregate.score("2025-11-21")
+        self.assertAlmostEqual(ratio_sum, 1.5)
+        self.assertEqual((completed, total), (1, 2))
+        self.assertEqual(aggregate.score("2025-11-22")[1:], (0, 2))
+
+    def test_progress_change_and_removal(self):
+        reading = make_habit(1, 1.0, {})
+        aggregate = DailyScoreAggregate()
+        aggregate.reset([reading])
+
+        reading['daily_progress']["2025-11-21"] = 1.0
+        aggregate.progress_changed(reading, "2025-11-21", 0, 1.0)
+        self.assertEqual(aggregate.score("2025-11-21"), (1.0, 1, 1))
+
+        aggregate.habit_removed(reading)
+        self.assertEqual(aggregate.score("2025-11-21"), (0.0, 0, 0))
+
+    def test_zero_target_habit_is_always_completed(self):
+        aggregate = DailyScoreAggregate()
+        aggregate.reset([make_habit(1, 0, {})])
+        self.assertEqual(aggregate.score("2025-11-21"), (0.0, 1, 1))
+
+
+class TestIncrementalDailyScore(unittest.TestCase):
+    """
+    SmartHabit(incremental_score=True) matches the full recompute.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tracker = SmartHabit(
+            data_file=os.path.join(self.tmp_dir.name, "habits.json"), incremental_score=True, verify_score=True
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_score_follows_mutations(self):
+        self.tracker.create_habit("Reading", 1.0)
+        self.tracker.create_habit("Exercise", 2.0)
+        self.tracker.create_habit("Walking", 0.5)
+        self.tracker.log_progress(1, 0.5)
+        self.tracker.log_progress(2, 2.0)
+        self.tracker.log_progress(3, 0.25)
+        self.tracker.log_progress(3, 1.0)
+        self.tracker.remove_habit(1)
+
+        score = self.tracker.calculate_daily_score()
+        self.assertEqual(score['daily_score'], 100.0)
+        self.assertEqual((score['completed_habits'], score['total_habits']), (2, 2))
+        self.assertEqual(score['habit_scores'], [100.0, 100.0])
+        self.assertIsNone(self.tracker.calculate_daily_score(include_habit_scores=False)['habit_scores'])
+
+    def test_verification_detects_direct_edits(self):
+        habit = self.tracker.create_habit("Reading", 1.0)
+        habit['daily_progress'][datetime.now().strftime("%Y-%m-%d")] = 1.0
+
+        with self.assertRaises(AssertionError):
+            self.tracker.calculate_daily_score()
+
+        self.tracker.refresh_derived()
+        self.assertEqual(self.tracker.calculate_daily_score()['daily_score'], 100.0)
+
+
+class TestHabitSummary(unittest.TestCase):
+    """
+    Streak runs kept up to date one day at a time.
+    """
+
+    def ordinal(self, day):
+        return date.fromisoformat(day).toordinal()
+
+    def test_runs_merge_and_split(self):
+        summary = HabitSummary()
+        for day in ("2025-11-01", "2025-11-03", "2025-11-02", "2025-11-05"):
+            summary.update(day, 0, 1.0, 1.0)
+        self.assertEqual(summary.longest_streak(), 3)
+        self.assertEqual(summary.completed_days, 4)
+
+        summary.update("2025-11-02", 1.0, 0.5, 1.0)  # no longer completed
+        self.assertEqual(summary.longest_streak(), 1)
+        self.assertEqual(summary.to_dict()['runs'], [
+            ["2025-11-01", "2025-11-01"], ["2025-11-03", "2025-11-03"], ["2025-11-05", "2025-11-05"]
+        ])
+        self.assertEqual(summary.lifetime_hours, 3.5)
+
+    def test_current_streak_counts_up_to_today_or_yesterday(self):
+        summary = HabitSummary()
+        for day in ("2025-11-18", "2025-11-19", "2025-11-20"):
+            summary.update(day, 0, 2.0, 1.0)
+        self.assertEqual(summary.current_streak(self.ordinal("2025-11-20")), 3)
+        self.assertEqual(summary.current_streak(self.ordinal("2025-11-21")), 3)
+        self.assertEqual(summary.current_streak(self.ordinal("2025-11-22")), 0)
+        self.assertEqual(summary.current_streak(self.ordinal("2025-11-19")), 2)
+
+    def test_matches_rebuild_after_random_updates(self):
+        rng = random.Random(7)
+        progress = {}
+        statistics = HabitStatistics()
+        habit = make_habit(1, 1.0, {})
+        statistics.reset([habit])
+        for _ in range(500):
+            day = (date(2025, 1, 1) + timedelta(days=rng.randrange(60))).isoformat()
+            hours = rng.choice([0, 0.5, 1.0, 2.0])
+            statistics.progress_changed(habit, day, progress.get(day, 0), hours)
+            progress[day] = hours
+
+        rebuilt = HabitStatistics()
+        rebuilt.reset([make_habit(1, 1.0, progress)])
+        self.assertEqual(statistics.to_dict(), rebuilt.to_dict())
+        restored = HabitStatistics()
+        self.assertTrue(restored.restore([habit], statistics.to_dict()))
+        self.assertEqual(restored.to_dict(), rebuilt.to_dict())
+        self.assertFalse(restored.restore([habit, make_habit(2, 1.0, {})], statistics.to_dict()))
+
+
+class TestStatisticsPersistence(unittest.TestCase):
+    """
+    SmartHabit(statistics=True): summaries are saved with the data and
+    restored on load instead of being rebuilt from the history.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.clock = FixedClock("2025-11-21")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fill(self, tracker):
+        tracker.create_habit("Reading", 1.0)
+        tracker.create_habit("Exercise", 2.0)
+        for day in range(15, 22):
+            tracker.log_progress(1, 1.5, f"2025-11-{day:02d}")
+        tracker.log_progress(1, 0.5, "2025-11-17")
+        tracker.log_progress(2, 2.0, "2025-11-10")
+        tracker.save_data()
+
+    def check_reload(self, make_tracker):
+        tracker = make_tracker()
+        self.fill(tracker)
+        expected = tracker.get_statistics()
+        self.assertEqual(expected[1]['current_streak'], 4)
+        self.assertEqual(expected[1]['longest_streak'], 4)
+        self.assertEqual(expected[1]['lifetime_hours'], 9.5)
+        self.assertEqual(expected[1]['average_7_days'], 1.36)
+        self.assertEqual(expected[2]['current_streak'], 0)
+        # Back-filled days count from the first completed day, not from created_date (today)
+        self.assertEqual(expected[1]['completion_rate'], 85.7)
+        self.assertEqual(expected[2]['completion_rate'], 8.3)
+
+        with patch.object(HabitStatistics, 'reset', autospec=True, side_effect=HabitStatistics.reset) as reset:
+            reloaded = make_tracker()
+        self.assertFalse(any(call.args[1] for call in reset.call_args_list))  # nothing rebuilt from history
+        self.assertEqual(reloaded.get_statistics(), expected)
+
+        # Without running statistics the same figures are computed on demand
+        plain = make_tracker(statistics=False)
+        self.assertEqual(plain.get_habit_statistics(1), expected[1])
+        return reloaded
+
+    def test_json_snapshot(self):
+        data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        self.check_reload(lambda statistics=True: SmartHabit(data_file, clock=self.clock, statistics=statistics))
+
+    def test_json_journal_replays_on_top_of_saved_statistics(self):
+        data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        make_tracker = lambda statistics=True: SmartHabit(
+            data_file, journal=True, clock=self.clock, statistics=statistics
+        )
+        tracker = make_tracker()
+        tracker.compact()
+        self.fill(tracker)
+        reloaded = make_tracker()
+        self.assertEqual(reloaded.get_statistics(), tracker.get_statistics())
+
+    def test_sqlite(self):
+        db_file = os.path.join(self.tmp_dir.name, "habits.db")
+        self.check_reload(
+            lambda statistics=True: SmartHabit(store=SqliteHabitStore(db_file), clock=self.clock, statistics=statistics)
+        )
+
+    def test_stale_statistics_are_rebuilt(self):
+        data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        tracker = SmartHabit(data_file, clock=self.clock, statistics=True)
+        self.fill(tracker)
+        # Another writer without statistics drops them from the file
+        other = SmartHabit(data_file, clock=self.clock)
+        other.log_progress(2, 2.0, "2025-11-21")
+        other.save_data()
+
+        reloaded = SmartHabit(data_file, clock=self.clock, statistics=True)
+        self.assertEqual(reloaded.get_habit_statistics(2)['current_streak'], 1)
+
+
+class TestRollupTables(unittest.TestCase):
+    """
+    Week / month / year buckets maintained one progress change at a time.
+    """
+
+    def test_period_keys_and_bounds(self):
+        self.assertEqual(period_keys("2025-11-21"), ("2025-W47", "2025-11", "2025"))
+        # ISO weeks can belong to the neighbouring year
+        self.assertEqual(period_keys("2024-12-30")[0], "2025-W01")
+        self.assertEqual(period_bounds('week', "2025-W01"), (date(2024, 12, 30), date(2025, 1, 5)))
+        self.assertEqual(period_bounds('month', "2024-02"), (date(2024, 2, 1), date(2024, 2, 29)))
+        self.assertEqual(period_bounds('year', "2025"), (date(2025, 1, 1), date(2025, 12, 31)))
+
+    def test_matches_rebuild_after_random_updates(self):
+        rng = random.Random(11)
+        progress = {}
+        habit = make_habit(1, 1.5, {})
+        rollups = RollupTables()
+        rollups.reset([habit])
+        for _ in range(500):
+            day = (date(2025, 1, 1) + timedelta(days=rng.randrange(120))).isoformat()
+            hours = rng.choice([0, 0.5, 1.5, 2.0])
+            rollups.progress_changed(habit, day, progress.get(day, 0), hours)
+            progress[day] = hours
+
+        rebuilt = RollupTables()
+        rebuilt.reset([make_habit(1, 1.5, progress)])
+        self.assertEqual(rollups.to_dict(), rebuilt.to_dict())
+        months = rebuilt.buckets('month', 1)
+        self.assertAlmostEqual(sum(bucket[0] for bucket in months.values()), sum(progress.values()))
+        self.assertEqual(sum(bucket[1] for bucket in months.values()), sum(hours >= 1.5 for hours in progress.values()))
+
+
+class TestSmartHabitRollups(unittest.TestCase):
+    """
+    SmartHabit(rollups=True): get_rollups() from saved, incrementally kept tables.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.clock = FixedClock("2025-11-21")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check_rollups(self, make_tracker):
+        tracker = make_tracker()
+        tracker.create_habit("Reading", 2.0)
+        tracker.log_progress(1, 2.0, "2025-10-31")
+        tracker.log_progress(1, 1.0, "2025-11-01")
+        tracker.log_progress(1, 3.0, "2025-11-20")
+        tracker.save_data()
+
+        months = tracker.get_rollups('month')[1]
+        self.assertEqual([row['period'] for row in months], ["2025-10", "2025-11"])
+        self.assertEqual(months[1]['total_hours'], 4.0)
+        self.assertEqual(months[1]['completed_days'], 1)
+        # November so far: 21 days, 1.5 of them completed
+        self.assertEqual(months[1]['average_hours'], round(4.0 / 21, 2))
+        self.assertEqual(months[1]['average_completion'], round(1.5 / 21 * 100, 1))
+        self.assertEqual(tracker.get_rollups('week', start="2025-W45")[1][0]['period'], "2025-W47")
+        self.assertEqual(tracker.get_rollups('year')[1][0]['total_hours'], 6.0)
+
+        with patch.object(RollupTables, 'reset', autospec=True, side_effect=RollupTables.reset) as reset:
+            reloaded = make_tracker()
+        self.assertFalse(any(call.args[1] for call in reset.call_args_list))  # nothing rebuilt from history
+        for period in ('week', 'month', 'year'):
+            self.assertEqual(reloaded.get_rollups(period), tracker.get_rollups(period))
+            self.assertEqual(make_tracker(rollups=False).get_rollups(period), tracker.get_rollups(period))
+        with self.assertRaises(ValueError):
+            tracker.get_rollups('day')
+
+    def test_json_snapshot(self):
+        data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        self.check_rollups(lambda rollups=True: SmartHabit(data_file, clock=self.clock, rollups=rollups))
+
+    def test_sqlite(self):
+        db_file = os.path.join(self.tmp_dir.name, "habits.db")
+        self.check_rollups(
+            lambda rollups=True: SmartHabit(store=SqliteHabitStore(db_file), clock=self.clock, rollups=rollups)
+        )
+
+    def test_saves_write_derived_data_only_when_needed(self):
+        journal = SmartHabit(os.path.join(self.tmp_dir.name, "habits.json"), journal=True, rollups=True, statistics=True)
+        journal.create_habit("Reading", 1.0)
+        with patch.object(RollupTables, 'to_dict', autospec=True, side_effect=RollupTables.to_dict) as to_dict:
+            journal.save_data()
+            to_dict.assert_not_called()
+            journal.compact()
+            to_dict.assert_called_once_with(journal.rollups, None)
+
+        db_file = os.path.join(self.tmp_dir.name, "habits.db")
+        tracker = SmartHabit(store=SqliteHabitStore(db_file), clock=self.clock, rollups=True)
+        for name in ("Reading", "Exercise", "Writing"):
+            tracker.create_habit(name, 1.0)
+        tracker.save_data()
+        with patch.object(RollupTables, 'to_dict', autospec=True, side_effect=RollupTables.to_dict) as to_dict:
+            tracker.log_progress(2, 1.0, "2025-11-20")
+            tracker.save_data()
+        to_dict.assert_called_once_with(tracker.rollups, {2})
+
+        # A writer without rollups drops habit 1's rows: the next tracker rebuilds and rewrites them all
+        plain = SmartHabit(store=SqliteHabitStore(db_file), clock=self.clock)
+        plain.log_progress(1, 2.0, "2025-11-20")
+        plain.save_data()
+        rebuilt = SmartHabit(store=SqliteHabitStore(db_file), clock=self.clock, rollups=True)
+        rebuilt.log_progress(3, 1.0, "2025-11-20")
+        rebuilt.save_data()
+        with patch.object(RollupTables, 'reset', autospec=True, side_effect=RollupTables.reset) as reset:
+            reloaded = SmartHabit(store=SqliteHabitStore(db_file), clock=self.clock, rollups=True)
+        self.assertFalse(any(call.args[1] for call in reset.call_args_list))
+        self.assertEqual(reloaded.get_rollups('month'), rebuilt.get_rollups('month'))
+        self.assertEqual(reloaded.get_rollups('month')[1][0]['total_hours'], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+from unittest.mock import patch
+
+from habit_api import ApiClient, HabitApi, load_test
+from habit_clock import FixedClock
+from smart_habit import SmartHabit
+
+
+class TestHabitApi(unittest.IsolatedAsyncioTestCase):
+    """
+    The API served in-process on a free port against a temporary data file.
+    """
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        self.clock = FixedClock("2025-11-21")
+        self.tracker = SmartHabit(self.data_file, clock=self.clock, sparse=True, incremental_score=True, statistics=True)
+        self.api = HabitApi(self.tracker)
+        self.server = await self.api.start("127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.client = await ApiClient("127.0.0.1", self.port).connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.server.close()
+        await self.server.wait_closed()
+        await self.api.stop()
+        self.tmp_dir.cleanup()
+
+    def saved(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return SmartHabit(self.data_file, clock=self.clock, sparse=True)
+
+    async def test_habit_crud_and_progress(self):
+        status, habit = await self.client.request("POST", "/habits", {'name': " Reading ", 'target_hours': 1})
+        self.assertEqual((status, habit['number'], habit['name']), (201, 1, "Reading"))
+        status, error = await self.client.request("POST", "/habits", {'name': "reading", 'target_hours': 1})
+        self.assertEqual(status, 409)
+
+        status, row = await self.client.request("POST", "/habits/1/progress", {'hours': 1.5})
+        self.assertEqual((status, row['date'], row['hours'], row['completed']), (200, "2025-11-21", 1.5, True))
+        await self.client.request("POST", "/habits/1/progress", {'hours': 0.5, 'date': "2025-11-20"})
+        self.assertEqual(self.saved().find_habit_by_number(1)['daily_progress'], {"2025-11-20": 0.5, "2025-11-21": 1.5})
+
+        status, details = await self.client.request("GET", "/habits/1")
+        self.assertEqual((status, details['statistics']['lifetime_hours']), (200, 2.0))
+        status, listing = await self.client.request("GET", "/habits?q=read&date=2025-11-20")
+        self.assertEqual((listing['total'], listing['habits'][0]['hours']), (1, 0.5))
+        status, weekly = await self.client.request("GET", "/habits/1/weekly")
+        self.assertEqual([day['hours'] for day in weekly['days'][:2]], [1.5, 0.5])
+        status, score = await self.client.request("GET", "/score")
+        self.assertEqual((score['daily_score'], score['completed_habits']), (100.0, 1))
+        status, progress = await self.client.request("GET", "/progress?start=2025-11-20&end=2025-11-21&habit=1")
+        self.assertEqual(progress['habits'][0]['total_hours'], 2.0)
+
+        status, deleted = await self.client.request("DELETE", "/habits/1")
+        self.assertEqual((status, deleted['name']), (200, "Reading"))
+        self.assertEqual(self.saved().habits, [])
+        status, _ = await self.client.request("GET", "/habits/1")
+        self.assertEqual(status, 404)
+
+    async def test_errors(self):
+        cases = [
+            ("GET", "/nowhere", None, 404),
+            ("PUT", "/habits", None, 405),
+            ("POST", "/habits", {'name': "123", 'target_hours': 1}, 400),
+            ("POST", "/habits", {'name': "Reading", 'target_hours': "1"}, 400),
+            ("POST", "/habits/9/progress", {'hours': 1}, 404),
+            ("GET", "/progress?start=2025-11-21", None, 400),
+            ("GET", "/habits?date=yesterday", None, 400),
+        ]
+        for method, path, payload, expected in cases:
+            status, body = await self.client.request(method, path, payload)
+            self.assertEqual(status, expected, path)
+            self.assertIn('error', body)
+
+        self.client.writer.write(b"POST /habits HTTP/1.1\r\nContent-Length: 5\r\n\r\n[1,2]")
+        await self.client.writer.drain()
+        self.assertIn(b"400", await self.client.reader.readline())
+
+    async def test_concurrent_writes_are_batched(self):
+        await self.client.request("POST", "/habits", {'name': "Reading", 'target_hours': 1})
+        batches = self.api.batches
+        clients = [await ApiClient("127.0.0.1", self.port).connect() for _ in range(10)]
+        try:
+            results = await asyncio.gather(*(
+                client.request("POST", "/habits/1/progress", {'hours': 0.1, 'date': f"2025-11-{day:02d}"})
+                for day, client in enumerate(clients, 1)
+            ))
+        finally:
+            for client in clients:
+                await client.close()
+        self.assertTrue(all(status == 200 for status, _ in results))
+        self.assertLess(self.api.batches - batches, 10)
+        self.assertEqual(len(self.saved().find_habit_by_number(1)['daily_progress']), 10)
+
+    async def test_failed_save_is_retried_before_answering(self):
+        self.api.retry_delay = 0.05
+        failures = [OSError("disk full"), RuntimeError("saver is closed")]
+        save_data = self.tracker.save_data
+
+        def flaky_save():
+            if failures:
+                raise failures.pop()
+            save_data()
+        with patch.object(self.tracker, 'save_data', side_effect=flaky_save) as save:
+            status, habit = await self.client.request("POST", "/habits", {'name': "Reading", 'target_hours': 1})
+        self.assertEqual((status, habit['name'], save.call_count), (201, "Reading", 3))
+        self.assertIsNone(self.api.last_save_error)
+        self.assertEqual([h['name'] for h in self.saved().habits], ["Reading"])
+
+    async def test_load_test(self):
+        result = await load_test("127.0.0.1", self.port, requests=200, concurrency=5, write_ratio=0.2, habits=3)
+        self.assertEqual((result['requests'], result['errors']), (200, 0))
+        self.assertGreater(result['requests_per_sec'], 0)
+        self.assertEqual(len(self.tracker.habits), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
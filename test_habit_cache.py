@@ -0,0 +1,139 @@
+import unittest
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import threading
+import weakref
+from unittest.mock import patch
+
+import habit_cache
+from habit_cache import clear_shared_trackers, get_shared_tracker, get_tracker_views, get_user_tracker
+from smart_habit import SmartHabit
+
+
+class TestSharedTracker(unittest.TestCase):
+    """
+    One tracker per data file and options, refreshed when another writer changes the store.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        clear_shared_trackers()
+
+    def tearDown(self):
+        clear_shared_trackers()
+        self.tmp_dir.cleanup()
+
+    def test_same_tracker_is_shared(self):
+        first = get_shared_tracker(self.data_file)
+        self.assertIs(get_shared_tracker(self.data_file), first)
+        self.assertIsNot(get_shared_tracker(self.data_file, incremental_score=True), first)
+
+    def test_own_writes_do_not_trigger_reload(self):
+        tracker = get_shared_tracker(self.data_file)
+        tracker.create_habit("Reading", 1.0)
+        tracker.save_data()
+        self.assertFalse(tracker.refresh())
+
+    def test_snapshot_change_reloads(self):
+        shared = get_shared_tracker(self.data_file)
+        other = SmartHabit(self.data_file)
+        other.create_habit("Reading", 1.0)
+        other.save_data()
+
+        self.assertEqual([h['name'] for h in get_shared_tracker(self.data_file).habits], ["Reading"])
+        self.assertFalse(shared.refresh())
+
+    def test_journal_change_replays_new_records_only(self):
+        shared = get_shared_tracker(self.data_file, journal=True)
+        shared.create_habit("Reading", 1.0)
+        shared.save_data()
+
+        other = SmartHabit(self.data_file, journal=True)
+        other.log_progress(1, 0.5, "2025-11-20")
+        other.create_habit("Exercise", 2.0)
+        other.save_data()
+
+        self.assertEqual(shared.store.detect_change(), 'journal')
+        version = shared.data_version
+        self.assertTrue(shared.refresh())
+        self.assertGreater(shared.data_version, version)
+        self.assertEqual(shared.find_habit_by_number(1)['daily_progress']["2025-11-20"], 0.5)
+        self.assertEqual(shared.find_habit_by_number(2)['name'], "Exercise")
+        self.assertIsNone(shared.store.detect_change())
+
+    def test_user_trackers_load_only_their_shard(self):
+        users_dir = os.path.join(self.tmp_dir.name, "users")
+        alice = get_user_tracker("alice", users_dir)
+        alice.create_habit("Reading", 1.0)
+        alice.save_data()
+        self.assertIs(get_user_tracker("alice", users_dir), alice)
+        self.assertEqual(get_user_tracker("bob", users_dir).habits, [])
+        self.assertRaises(ValueError, get_user_tracker, "../bob", users_dir)
+
+    def test_least_recently_used_tracker_is_closed_and_dropped(self):
+        users_dir = os.path.join(self.tmp_dir.name, "users")
+        with patch.object(habit_cache, 'MAX_TRACKERS', 2):
+            alice = get_user_tracker("alice", users_dir, save_delay=60)
+            alice.create_habit("Reading", 1.0)
+            alice.save_data()
+            get_user_tracker("bob", users_dir, save_delay=60)
+            get_user_tracker("carol", users_dir, save_delay=60)
+            self.assertTrue(alice.saver.closed)
+            self.assertFalse(alice.saver.dirty)
+            reloaded = get_user_tracker("alice", users_dir, save_delay=60)
+        self.assertIsNot(reloaded, alice)
+        self.assertEqual([h['name'] for h in reloaded.habits], ["Reading"])
+
+        # A session still holding the evicted tracker saves synchronously
+        with contextlib.redirect_stdout(io.StringIO()):
+            alice.create_habit("Running", 0.5)
+            alice.save_data()
+        self.assertEqual(len(get_user_tracker("alice", users_dir, save_delay=60).habits), 2)
+
+    def test_evicted_trackers_are_released(self):
+        users_dir = os.path.join(self.tmp_dir.name, "users")
+        threads = threading.active_count()
+        refs = []
+        with patch.object(habit_cache, 'MAX_TRACKERS', 5):
+            for number in range(30):
+                tracker = get_user_tracker(f"user{number}", users_dir, save_delay=60)
+                get_tracker_views(tracker).daily_score()
+                tracker.create_habit("Reading", 1.0)
+                tracker.save_data()
+                refs.append(weakref.ref(tracker))
+            del tracker
+            gc.collect()
+            self.assertEqual(sum(ref() is not None for ref in refs), 5)
+            self.assertLessEqual(threading.active_count(), threads + 5)
+
+    def test_loading_one_tracker_does_not_block_others(self):
+        loading, release = threading.Event(), threading.Event()
+        slow_file = os.path.join(self.tmp_dir.name, "slow.json")
+        get_shared_tracker(self.data_file)
+        original_load = SmartHabit.load_data
+
+        def slow_load(tracker):
+            if tracker.data_file == slow_file:
+                loading.set()
+                release.wait(5)
+            original_load(tracker)
+
+        with patch.object(SmartHabit, 'load_data', slow_load):
+            thread = threading.Thread(target=get_shared_tracker, args=(slow_file,))
+            thread.start()
+            self.assertTrue(loading.wait(5))
+            # The other tracker is served while the slow one is still loading
+            other = threading.Thread(target=get_shared_tracker, args=(self.data_file,))
+            other.start()
+            other.join(1)
+            self.assertFalse(other.is_alive())
+            release.set()
+            thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
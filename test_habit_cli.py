@@ -0,0 +1,156 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from habit_cli import main
+from smart_habit import SmartHabit
+
+
+class TestHabitCli(unittest.TestCase):
+    """
+    The command-line entry point, run in-process against a temporary data file.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker = SmartHabit(self.data_file)
+            tracker.create_habit("Reading", 1.0)
+            tracker.save_data()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_cli(self, *argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["--data-file", self.data_file, *argv])
+        return status, output.getvalue()
+
+    def reload(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return SmartHabit(self.data_file)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_import_csv(self):
+        path = self.write("rows.csv", "habit,date,hours\n1,2025-11-19,0.5\nReading,2025-11-20,1.25\n")
+        status, output = self.run_cli("import", path)
+        self.assertEqual(status, 0)
+        self.assertIn("Imported 2 rows", output)
+        self.assertIn("rows/sec", output)
+        progress = self.reload().habits[0]['daily_progress']
+        self.assertEqual((progress["2025-11-19"], progress["2025-11-20"]), (0.5, 1.25))
+
+    def test_import_jsonl_reports_bad_rows(self):
+        rows = [{"habit": 1, "date": "2025-11-19", "hours": 1}, {"habit": "Nope", "date": "2025-11-19", "hours": 1}]
+        path = self.write("rows.jsonl", "\n".join(json.dumps(row) for row in rows) + "\n")
+        status, output = self.run_cli("import", path)
+        self.assertEqual(status, 1)
+        self.assertIn("Row 2 skipped: unknown habit 'Nope'", output)
+        self.assertIn("Imported 1 rows", output)
+
+    def test_import_jsonl_rejects_malformed_lines_per_row(self):
+        lines = ['{"habit": 1, "date": "2025-11-19", "hours": 1}', '{"habit": 1, "date": ', '[1, 2]',
+                 '{"habit": 1.0, "date": "2025-11-20", "hours": 1}', '{"habit": 1, "date": "2025-11-21", "hours": 2}']
+        status, output = self.run_cli("import", self.write("rows.jsonl", "\n".join(lines) + "\n"))
+        self.assertEqual(status, 1)
+        self.assertIn("Row 2 skipped: invalid JSON", output)
+        self.assertIn("Row 3 skipped: expected a JSON object", output)
+        self.assertIn("Row 4 skipped: invalid habit reference 1.0", output)
+        self.assertIn("Imported 2 rows", output)
+        progress = self.reload().habits[0]['daily_progress']
+        self.assertEqual((progress["2025-11-19"], progress["2025-11-21"]), (1.0, 2.0))
+
+
+    def test_export_jsonl_to_stdout(self):
+        self.run_cli("import", self.write("rows.csv", "habit,date,hours\n1,2025-11-19,0.5\n1,2025-11-20,1\n"))
+        for options in ((), ("--json",)):
+            status, output = self.run_cli(
+                *options, "export", "-", "--format", "jsonl", "--start", "2025-11-20", "--end", "2025-11-30"
+            )
+            self.assertEqual(status, 0)
+            self.assertEqual([json.loads(line)['date'] for line in output.splitlines()], ["2025-11-20"])
+
+
+    def test_commands_with_json_output(self):
+        status, output = self.run_cli("--json", "add", "Exercise", "2")
+        self.assertEqual((status, json.loads(output)['number']), (0, 2))
+        status, output = self.run_cli("--json", "log", "2", "2.5", "--date", "2025-11-20")
+        self.assertEqual(json.loads(output), {'number': 2, 'date': "2025-11-20", 'hours': 2.5, 'completed': True})
+        self.assertEqual(self.reload().find_habit_by_number(2)['daily_progress']["2025-11-20"], 2.5)
+
+        status, output = self.run_cli("--json", "score")
+        self.assertEqual(json.loads(output)['total_habits'], 2)
+        status, output = self.run_cli("--json", "weekly", "1")
+        self.assertEqual(len(json.loads(output)['days']), 7)
+
+        status, output = self.run_cli("delete", "1")
+        self.assertEqual(output.strip(), "Habit 'Reading' deleted")
+        self.assertEqual([habit['name'] for habit in self.reload().habits], ["Exercise"])
+
+    def test_errors(self):
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            status, output = self.run_cli("log", "9", "1")
+        self.assertEqual(status, 1)
+        self.assertIn("no habit number 9", errors.getvalue())
+        status, output = self.run_cli("--json", "add", "reading", "1")
+        self.assertEqual(json.loads(output), {'error': "habit 'reading' already exists"})
+
+    def test_batch_runs_in_one_process_and_saves_once(self):
+        commands = io.StringIO("add Exercise 2\nlog 2 1 --date 2025-11-20\nlog 9 1\nbogus\n\nscore\n")
+        output = io.StringIO()
+        with patch.object(SmartHabit, 'save_data', autospec=True, side_effect=SmartHabit.save_data) as save, \
+                contextlib.redirect_stdout(output):
+            status = main(["--data-file", self.data_file, "--batch", "--json"], stdin=commands)
+        self.assertEqual(status, 1)
+        save.assert_called_once()
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[1]['hours'], 1.0)
+        self.assertIn('error', results[2])
+        self.assertIn('error', results[3])
+        self.assertEqual(results[4]['total_habits'], 2)
+        self.assertEqual(self.reload().find_habit_by_number(2)['daily_progress']["2025-11-20"], 1.0)
+
+
+    def test_compact_strips_zero_days(self):
+        status, output = self.run_cli("--json", "compact")
+        result = json.loads(output)
+        self.assertEqual(result['removed'], 1)  # the today: 0 entry written on creation
+        self.assertLess(result['bytes_after'], result['bytes_before'])
+        with open(self.data_file) as f:
+            self.assertEqual(json.load(f)['habits'][0]['daily_progress'], {})
+
+
+    def test_metrics_report_on_stderr(self):
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            status, output = self.run_cli("--metrics", "score")
+        self.assertEqual(status, 0)
+        self.assertIn("calculate_daily_score", errors.getvalue())
+        self.assertIn("load_data", errors.getvalue())
+
+    def test_user_shards(self):
+        users_dir = os.path.join(self.tmp_dir.name, "users")
+        self.run_cli("--users-dir", users_dir, "--user", "alice", "add", "Running", "0.5")
+        status, output = self.run_cli("--users-dir", users_dir, "--user", "bob", "--json", "score")
+        self.assertEqual(json.loads(output)['total_habits'], 0)
+        status, output = self.run_cli("--users-dir", users_dir, "--user", "alice", "--json", "score")
+        self.assertEqual(json.loads(output)['total_habits'], 1)
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            status, output = self.run_cli("--users-dir", users_dir, "--user", "../alice", "score")
+        self.assertEqual(status, 1)
+        self.assertIn("invalid user id", errors.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
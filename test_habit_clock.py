@@ -0,0 +1,72 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from habit_clock import FixedClock, SystemClock
+from smart_habit import SmartHabit
+
+
+class TestClocks(unittest.TestCase):
+
+    def test_system_clock_memoizes_keys_for_the_day(self):
+        moments = [datetime(2025, 11, 21, 12, 0)]
+        clock = SystemClock(lambda: moments[-1])
+        self.assertEqual(clock.today_key(), "2025-11-21")
+        self.assertEqual(clock.key(6), "2025-11-15")
+        keys = clock._keys
+        moments.append(datetime(2025, 11, 21, 23, 59))
+        self.assertEqual(clock.today_key(), "2025-11-21")
+        self.assertIs(clock._keys, keys)
+
+    def test_system_clock_follows_injected_now(self):
+        moments = [datetime(2025, 11, 21, 23, 59, 59, 999000)]
+        clock = SystemClock(lambda: moments[-1])
+        self.assertEqual(clock.key(1), "2025-11-20")
+
+        moments.append(datetime(2025, 11, 22, 0, 0, 0, 9000))
+        self.assertEqual(clock.today_key(), "2025-11-22")
+        self.assertEqual(clock.key(1), "2025-11-21")
+        moments.append(moments[-1] + timedelta(days=3))
+        self.assertEqual(clock.today_key(), "2025-11-25")
+
+    def test_fixed_clock(self):
+        clock = FixedClock("2025-11-21")
+        self.assertEqual(clock.key(7), "2025-11-14")
+        clock.advance(2)
+        self.assertEqual(clock.today_key(), "2025-11-23")
+        self.assertEqual(clock.key(7), "2025-11-16")
+
+
+class TestTimeTravel(unittest.TestCase):
+    """
+    SmartHabit follows an injected clock, no patching of smart_habit.datetime needed.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_tracker_uses_injected_clock(self):
+        clock = FixedClock("2025-11-21")
+        tracker = SmartHabit(self.data_file, clock=clock)
+        habit = tracker.create_habit("Reading", 1.0)
+        tracker.log_progress(1, 1.0)
+
+        self.assertEqual(habit['created_date'], "2025-11-21")
+        self.assertTrue(habit['completed'])
+        self.assertEqual(tracker.calculate_daily_score()['daily_score'], 100.0)
+
+        clock.advance()
+        self.assertEqual(tracker.calculate_daily_score()['date'], "2025-11-22")
+        self.assertEqual(tracker.calculate_daily_score()['daily_score'], 0)
+        weekly = tracker.get_weekly_progress(1)
+        self.assertEqual([day['date'] for day in weekly[:2]], ["2025-11-22", "2025-11-21"])
+        self.assertEqual(weekly[1]['hours'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
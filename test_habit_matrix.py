@@ -0,0 +1,86 @@
+import unittest
+
+from habit_matrix import ProgressMatrix, np
+
+HABITS = [
+    {
+        "number": 1,
+        "name": "Reading",
+        "target_hours": 1.0,
+        "today_hours": 0,
+        "completed": False,
+        "daily_progress": {"2025-11-15": 0.5, "2025-11-20": 1.0, "2025-11-21": 0},
+        "created_date": "2025-11-15"
+    },
+    {
+        "number": 2,
+        "name": "Exercise",
+        "target_hours": 2.0,
+        "today_hours": 3.0,
+        "completed": True,
+        "daily_progress": {"2025-11-21": 3.0},
+        "created_date": "2025-11-21"
+    },
+    {
+        "number": 3,
+        "name": "Stretching",
+        "target_hours": 0,
+        "today_hours": 0,
+        "completed": True,
+        "daily_progress": {},
+        "created_date": "2025-11-21"
+    }
+]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestProgressMatrix(unittest.TestCase):
+    """
+    Vectorized analytics must agree with the dict-based SmartHabit results.
+    """
+
+    def setUp(self):
+        self.matrix = ProgressMatrix(HABITS)
+
+    def test_layout(self):
+        self.assertEqual(self.matrix.hours.shape, (3, 7))
+        self.assertEqual(self.matrix.hours.dtype, np.float32)
+        self.assertEqual(self.matrix.column("2025-11-15"), 0)
+        self.assertEqual(self.matrix.column("2025-11-21"), 6)
+        self.assertIsNone(self.matrix.column("2025-11-22"))
+
+    def test_daily_score_matches_calculate_daily_score(self):
+        # Reading 0%, Exercise 100%, Stretching 0% (zero target) -> 33.3%; Exercise and Stretching completed
+        score = self.matrix.daily_score("2025-11-21")
+        self.assertEqual(score['daily_score'], 33.3)
+        self.assertEqual(score['completed_habits'], 2)
+        self.assertEqual(score['total_habits'], 3)
+
+        # Days outside the matrix count as zero hours
+        self.assertEqual(self.matrix.daily_score("2025-12-01")['daily_score'], 0)
+
+    def test_habit_summaries(self):
+        summary = self.matrix.habit_summaries("2025-11-15", "2025-11-21")
+        self.assertEqual(summary['total_hours'].tolist(), [1.5, 3.0, 0.0])
+        self.assertEqual(summary['completed_days'].tolist(), [1, 1, 7])
+
+    def test_weekly_summaries(self):
+        weekly = self.matrix.weekly_summaries("2025-11-21", 2)
+        self.assertEqual(weekly['total_hours'].shape, (3, 2))
+        self.assertEqual(weekly['total_hours'][0].tolist(), [0.0, 1.5])
+
+    def test_round_trip(self):
+        self.assertEqual(ProgressMatrix(HABITS).to_habits(today="2025-11-21"), HABITS)
+
+    def test_empty(self):
+        matrix = ProgressMatrix([])
+        self.assertEqual(matrix.daily_score("2025-11-21")['total_habits'], 0)
+        self.assertEqual(matrix.to_habits(), [])
+        self.assertEqual(ProgressMatrix([], today="2025-11-21").start.isoformat(), "2025-11-21")
+
+    def test_today_is_the_matrix_day(self):
+        self.assertEqual(ProgressMatrix(HABITS, today="2025-11-21").to_habits(), HABITS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from habit_metrics import Histogram, Metrics, metrics
+from smart_habit import SmartHabit
+
+
+class TestHistogram(unittest.TestCase):
+    """
+    Fixed-bucket latency histograms.
+    """
+
+    def test_counts_and_percentiles(self):
+        histogram = Histogram()
+        for ms in [0.2] * 90 + [3] * 9 + [20000]:
+            histogram.add(ms / 1000)
+        stats = histogram.to_dict()
+        self.assertEqual(stats['count'], 100)
+        self.assertEqual((stats['min_ms'], stats['max_ms']), (0.2, 20000))
+        self.assertEqual((stats['p50_ms'], stats['p95_ms'], stats['p99_ms']), (0.5, 5, 5))
+        self.assertEqual(stats['buckets']['slower'], 1)
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Enabling installs timing wrappers on SmartHabit; disabling removes them again.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+        self.tmp_dir.cleanup()
+
+    def test_disabled_metrics_leave_smart_habit_untouched(self):
+        original = SmartHabit.find_habit_by_number
+        metrics.enable()
+        self.assertIsNot(SmartHabit.find_habit_by_number, original)
+        metrics.disable()
+        self.assertIs(SmartHabit.find_habit_by_number, original)
+
+        with metrics.timer("page"):
+            pass
+        metrics.record("save_data", 0.1)
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_operations_are_timed(self):
+        metrics.enable()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker = SmartHabit(self.data_file)
+            tracker.create_habit("Reading", 1.0)
+            tracker.save_data()
+        tracker.calculate_daily_score()
+        tracker.get_weekly_progress(1)
+        with metrics.timer("render Dashboard"):
+            tracker.find_habit_by_number(1)
+
+        snapshot = metrics.snapshot()
+        for name in ('load_data', 'save_data', 'calculate_daily_score', 'get_weekly_progress', 'render Dashboard'):
+            self.assertEqual(snapshot[name]['count'], 1, name)
+        self.assertGreaterEqual(snapshot['find_habit_by_number']['count'], 1)
+        self.assertEqual(json.loads(metrics.to_json())['save_data']['count'], 1)
+        self.assertIn("calculate_daily_score", metrics.report())
+
+    def test_background_writes_are_timed(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker = SmartHabit(self.data_file, save_delay=60)
+        metrics.enable()
+        tracker.create_habit("Reading", 1.0)
+        tracker.save_data()
+        self.assertTrue(tracker.flush())
+        tracker.close()
+
+        snapshot = metrics.snapshot()
+        for name in ('save_data', '_write_data', 'flush'):
+            self.assertGreaterEqual(snapshot[name]['count'], 1, name)
+        self.assertEqual(snapshot['_write_data']['count'], 1)
+
+    def test_enable_twice_wraps_once(self):
+        local = Metrics()
+        local.enable()
+        wrapped = SmartHabit.load_data
+        local.enable()
+        self.assertIs(SmartHabit.load_data, wrapped)
+        local.disable()
+
+
+if __name__ == '__main__':
+    unittest.main()
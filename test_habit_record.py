@@ -0,0 +1,130 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+from datetime import date
+
+from habit_clock import FixedClock
+from habit_record import DayProgress, Habit
+from habit_store import SqliteHabitStore
+from smart_habit import SmartHabit
+
+SAMPLE_HABIT = {
+    "number": 1,
+    "name": "Reading",
+    "target_hours": 1.0,
+    "today_hours": 0.5,
+    "completed": False,
+    "daily_progress": {"2025-11-18": 1.25, "2025-11-21": 0.5},
+    "created_date": "2025-11-18"
+}
+
+
+class TestHabitRecord(unittest.TestCase):
+    """
+    Habit and DayProgress against the habits_data.json dict schema.
+    """
+
+    def test_round_trip_with_dict_schema(self):
+        habit = Habit.from_dict(SAMPLE_HABIT)
+        self.assertEqual(habit.to_dict(), SAMPLE_HABIT)
+        self.assertEqual(json.loads(json.dumps(habit, default=dict)), SAMPLE_HABIT)
+        self.assertFalse(hasattr(habit, '__dict__'))
+
+    def test_dict_style_access(self):
+        habit = Habit.from_dict(SAMPLE_HABIT)
+        self.assertEqual(habit['name'], "Reading")
+        self.assertIn('created_date', habit)
+        self.assertIsNone(habit.get('missing'))
+        habit['today_hours'] = 2.0
+        self.assertEqual(habit.today_hours, 2.0)
+        with self.assertRaises(KeyError):
+            habit['color'] = "red"
+
+        legacy = Habit.from_dict({"number": 2, "name": "Old", "target_hours": 1.0})
+        self.assertNotIn('created_date', legacy)
+        self.assertEqual(legacy.setdefault('created_date', "2025-11-01"), "2025-11-01")
+
+    def test_day_progress_mapping(self):
+        progress = DayProgress({"2025-11-20": 1.0}, base=date(2025, 11, 20).toordinal())
+        progress["2025-11-23"] = 0.0
+        progress["2025-11-18"] = 0.1  # before the base day
+        self.assertEqual(dict(progress), {"2025-11-18": 0.1, "2025-11-20": 1.0, "2025-11-23": 0.0})
+        self.assertNotIn("2025-11-19", progress)
+        self.assertEqual(progress.get("2025-11-19", 0), 0)
+        del progress["2025-11-20"]
+        self.assertEqual(len(progress), 2)
+        with self.assertRaises(KeyError):
+            progress["2025-11-20"]
+
+    def test_smaller_than_dict_progress(self):
+        days = {f"2025-{month:02d}-{day:02d}": 1.5 for month in range(1, 13) for day in range(1, 29)}
+        progress = DayProgress(days)
+        dict_size = sys.getsizeof(days) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in days.items())
+        self.assertLess(sys.getsizeof(progress.hours), dict_size / 10)
+
+
+class TestSmartHabitCompactRecords(unittest.TestCase):
+    """
+    SmartHabit(compact_records=True) keeps the same behavior and file format.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        with open(self.data_file, 'w') as f:
+            json.dump({'habits': [SAMPLE_HABIT], 'next_number': 2}, f)
+        self.clock = FixedClock("2025-11-21")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_tracker(self, **options):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return SmartHabit(self.data_file, clock=self.clock, compact_records=True, **options)
+
+    def test_matches_dict_mode(self):
+        tracker = self.make_tracker()
+        self.assertIsInstance(tracker.habits[0], Habit)
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker.create_habit("Exercise", 2.0)
+            tracker.log_progress(2, 2.0)
+            tracker.save_data()
+            plain = SmartHabit(self.data_file, clock=self.clock)
+        self.assertEqual([habit.to_dict() for habit in tracker.habits], plain.habits)
+        self.assertEqual(tracker.calculate_daily_score(), plain.calculate_daily_score())
+        self.assertEqual(tracker.get_weekly_progress(1), plain.get_weekly_progress(1))
+
+    def test_journal_replay(self):
+        tracker = self.make_tracker(journal=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker.create_habit("Exercise", 2.0)
+            tracker.log_progress(2, 1.5, "2025-11-20")
+            tracker.save_data()
+        reloaded = self.make_tracker(journal=True)
+        self.assertEqual(reloaded.find_habit_by_number(2)['daily_progress']["2025-11-20"], 1.5)
+
+    def test_sqlite_store(self):
+        store = SqliteHabitStore(os.path.join(self.tmp_dir.name, "habits.db"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker = SmartHabit(store=store, clock=self.clock, compact_records=True)
+            tracker.create_habit("Reading", 1.0)
+            tracker.log_progress(1, 0.75, "2025-11-19")
+            tracker.save_data()
+            store.close()
+            store = SqliteHabitStore(os.path.join(self.tmp_dir.name, "habits.db"))
+            reloaded = SmartHabit(store=store, clock=self.clock, compact_records=True)
+        store.close()
+        self.assertEqual(reloaded.habits[0]['daily_progress']["2025-11-19"], 0.75)
+
+    def test_lazy_and_compact_are_exclusive(self):
+        with self.assertRaises(ValueError):
+            self.make_tracker(lazy=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import json
+import os
+import tempfile
+import time
+
+from habit_clock import FixedClock
+from habit_saver import BackgroundSaver
+from smart_habit import SmartHabit
+
+
+class TestBackgroundSaver(unittest.TestCase):
+
+    def setUp(self):
+        self.written = []
+        self.saver = BackgroundSaver(lambda: self.written.append(time.monotonic()), delay=0.05)
+
+    def tearDown(self):
+        self.saver.close()
+
+    def wait_for_writes(self, count, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while len(self.written) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_burst_is_written_once(self):
+        for _ in range(20):
+            self.saver.mark_dirty()
+        self.assertEqual(self.written, [])
+        self.wait_for_writes(1)
+        time.sleep(0.1)
+        self.assertEqual(len(self.written), 1)
+        self.assertFalse(self.saver.dirty)
+
+    def test_max_delay_caps_a_long_burst(self):
+        saver = BackgroundSaver(lambda: self.written.append(time.monotonic()), delay=0.05, max_delay=0.1)
+        try:
+            started = time.monotonic()
+            while time.monotonic() - started < 0.3:
+                saver.mark_dirty()
+                time.sleep(0.01)
+            self.assertGreaterEqual(len(self.written), 2)
+        finally:
+            saver.close()
+
+    def test_flush_writes_immediately(self):
+        self.assertFalse(self.saver.flush())
+        self.saver.mark_dirty()
+        self.assertTrue(self.saver.flush())
+        self.assertEqual(len(self.written), 1)
+        time.sleep(0.1)
+        self.assertEqual(len(self.written), 1)
+
+    def test_close_flushes_and_rejects_new_saves(self):
+        self.saver.mark_dirty()
+        self.saver.close()
+        self.assertEqual(len(self.written), 1)
+        self.assertRaises(RuntimeError, self.saver.mark_dirty)
+
+    def test_failed_flush_keeps_changes_pending(self):
+        saver = BackgroundSaver(self.fail, delay=60)
+        saver.mark_dirty()
+        with self.assertRaises(OSError):
+            saver.flush()
+        self.assertTrue(saver.dirty)
+        saver.write = lambda: self.written.append(1)
+        saver.close()
+        self.assertEqual(self.written, [1])
+
+    def fail(self):
+        raise OSError("disk full")
+
+
+class TestDebouncedSmartHabit(unittest.TestCase):
+    """
+    save_data() only schedules the write when save_delay is set.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        self.clock = FixedClock("2025-11-21")
+        self.tracker = SmartHabit(self.data_file, clock=self.clock, sparse=True, save_delay=60)
+
+    def tearDown(self):
+        self.tracker.close()
+        self.tmp_dir.cleanup()
+
+    def saved_habits(self):
+        with open(self.data_file) as f:
+            return json.load(f)['habits']
+
+    def test_saves_are_coalesced_until_flush(self):
+        self.tracker.create_habit("Reading", 1.0)
+        for hours in (0.25, 0.5, 0.75):
+            self.tracker.log_progress(1, hours)
+            self.tracker.save_data()
+        self.assertFalse(os.path.exists(self.data_file))
+
+        self.assertTrue(self.tracker.flush())
+        self.assertEqual(self.saved_habits()[0]['daily_progress'], {"2025-11-21": 0.75})
+        self.assertEqual(self.tracker.saver.writes, 1)
+        self.assertFalse(self.tracker.flush())
+
+    def test_close_flushes(self):
+        self.tracker.create_habit("Reading", 1.0)
+        self.tracker.save_data()
+        self.tracker.close()
+        self.assertEqual([habit['name'] for habit in self.saved_habits()], ["Reading"])
+
+    def test_refresh_keeps_pending_changes(self):
+        self.tracker.create_habit("Reading", 1.0)
+        self.tracker.save_data()
+        other = SmartHabit(self.data_file, clock=self.clock, sparse=True)
+        other.create_habit("Exercise", 2.0)
+        other.save_data()
+
+        self.assertTrue(self.tracker.refresh())
+        self.assertEqual(sorted(habit['name'] for habit in self.tracker.habits), ["Exercise", "Reading"])
+        self.tracker.flush()
+        self.assertEqual(sorted(habit['name'] for habit in self.saved_habits()), ["Exercise", "Reading"])
+
+
+if __name__ == '__main__':
+    unittest.main()
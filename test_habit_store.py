@@ -0,0 +1,271 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+from datetime import date, timedelta
+
+from habit_clock import FixedClock
+from habit_store import JsonHabitStore, LazyProgress, SqliteHabitStore, iter_user_ids, user_data_file
+from smart_habit import SmartHabit
+
+SAMPLE_HABITS = [
+    {
+        "number": 1,
+        "name": "Reading",
+        "target_hours": 1.0,
+        "daily_progress": {"2025-11-20": 0.5},
+        "created_date": "2025-11-20"
+    },
+    {
+        "number": 2,
+        "name": "Exercise",
+        "target_hours": 2.0,
+        "daily_progress": {"2025-11-20": 2.0},
+        "created_date": "2025-11-20"
+    }
+]
+
+
+class TestSqliteHabitStore(unittest.TestCase):
+    """
+    SmartHabit on top of the SQLite backend.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmp_dir.name, "habits.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_tracker(self):
+        return SmartHabit(store=SqliteHabitStore(self.db_file))
+
+    def test_round_trip(self):
+        tracker = self.make_tracker()
+        tracker.create_habit("Reading", 1.0)
+        tracker.create_habit("Exercise", 2.0)
+        tracker.log_progress(1, 0.5, "2025-11-20")
+        tracker.log_progress(1, 0.75, "2025-11-20")
+        tracker.log_progress(2, 2.0, "2025-11-21")
+        tracker.remove_habit(2)
+        tracker.save_data()
+        tracker.store.close()
+
+        reloaded = self.make_tracker()
+        self.assertEqual([h['name'] for h in reloaded.habits], ["Reading"])
+        self.assertEqual(reloaded.habits[0]['daily_progress']["2025-11-20"], 0.75)
+        self.assertEqual(reloaded.next_number, 3)
+        reloaded.store.close()
+
+    def test_range_queries(self):
+        tracker = self.make_tracker()
+        tracker.create_habit("Reading", 1.0)
+        tracker.create_habit("Exercise", 2.0)
+        for day, hours in (("2025-11-18", 1.0), ("2025-11-19", 0.5), ("2025-11-25", 2.0)):
+            tracker.log_progress(1, hours, day)
+        tracker.log_progress(2, 1.5, "2025-11-19")
+        tracker.save_data()
+
+        store = tracker.store
+        self.assertEqual(
+            store.progress_between("2025-11-18", "2025-11-24"),
+            {1: {"2025-11-18": 1.0, "2025-11-19": 0.5}, 2: {"2025-11-19": 1.5}}
+        )
+        self.assertEqual(store.progress_between("2025-11-18", "2025-11-30", [2]), {2: {"2025-11-19": 1.5}})
+        self.assertEqual(store.progress_on("2025-11-19"), {1: 0.5, 2: 1.5})
+        store.close()
+
+    def test_tracker_queries_ranges_and_days_through_the_store(self):
+        tracker = self.make_tracker()
+        tracker.create_habit("Reading", 1.0)
+        tracker.create_habit("Exercise", 2.0)
+        tracker.log_progress(1, 1.0, "2025-11-18")
+        tracker.log_progress(2, 1.5, "2025-11-19")
+        tracker.save_data()
+        tracker.store.close()
+
+        tracker = self.make_tracker()
+        self.assertTrue(tracker.lazy)
+        store = tracker.store
+        with patch.object(store, 'load_progress', wraps=store.load_progress) as load_progress, \
+                patch.object(store, 'progress_between', wraps=store.progress_between) as progress_between, \
+                patch.object(store, 'progress_on', wraps=store.progress_on) as progress_on:
+            progress = tracker.get_progress_range("2025-11-18", "2025-11-19")
+            score = tracker.calculate_daily_score()
+        self.assertEqual((progress[1]['total_hours'], progress[2]['total_hours']), (1.0, 1.5))
+        self.assertEqual(score['total_habits'], 2)
+        progress_between.assert_called_once_with("2025-11-18", "2025-11-19", [1, 2])
+        progress_on.assert_called_once()
+        load_progress.assert_not_called()
+        self.assertFalse(any(habit['daily_progress'].loaded for habit in tracker.habits))
+        self.assertFalse(SmartHabit(store=SqliteHabitStore(self.db_file), lazy=False).lazy)
+        store.close()
+
+    def test_today_comes_from_the_tracker_clock(self):
+        store = SqliteHabitStore(self.db_file)
+        store.snapshot(SAMPLE_HABITS, 3)
+        store.close()
+        for lazy in (False, True):
+            tracker = SmartHabit(store=SqliteHabitStore(self.db_file), clock=FixedClock("2025-11-20"), lazy=lazy)
+            self.assertEqual([(h['today_hours'], h['completed']) for h in tracker.habits], [(0.5, False), (2.0, True)])
+            tracker.store.close()
+
+    def test_snapshot_imports_json_document(self):
+        store = SqliteHabitStore(self.db_file)
+        store.snapshot(SAMPLE_HABITS, 3)
+        data = store.load()
+        store.close()
+
+        self.assertEqual(data['next_number'], 3)
+        self.assertEqual(data['habits'][1]['daily_progress'], {"2025-11-20": 2.0})
+
+
+
+class TestLazyLoading(unittest.TestCase):
+    """
+    SmartHabit(lazy=True): metadata up front, history paged in on demand.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.today = date.today()
+        self.recent_day = (self.today - timedelta(days=2)).isoformat()
+        self.old_day = (self.today - timedelta(days=400)).isoformat()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def seed(self, store):
+        tracker = SmartHabit(store=store)
+        tracker.create_habit("Reading", 1.0)
+        tracker.log_progress(1, 0.5, self.recent_day)
+        tracker.log_progress(1, 2.0, self.old_day)
+        tracker.compact()
+
+    def check_lazy_tracker(self, make_store):
+        self.seed(make_store())
+        store = make_store()
+        tracker = SmartHabit(store=store, lazy=True, resident_days=7)
+        habit = tracker.find_habit_by_number(1)
+        progress = habit['daily_progress']
+
+        self.assertIsInstance(progress, LazyProgress)
+        self.assertEqual(habit['name'], "Reading")
+        # Loading reads no history (there is no today: 0 entry to add)
+        self.assertFalse(progress.loaded)
+        self.assertEqual(progress[self.recent_day], 0.5)
+        self.assertFalse(progress.complete)
+
+        # Older days page in on demand and in-memory writes survive the merge
+        tracker.log_progress(1, 1.0, self.recent_day)
+        self.assertEqual(progress.get(self.old_day), 2.0)
+        self.assertTrue(progress.complete)
+        self.assertEqual(progress[self.recent_day], 1.0)
+
+        weekly = tracker.get_progress_range(self.old_day, self.old_day)
+        self.assertEqual(weekly[1]['total_hours'], 2.0)
+        return tracker
+
+    def test_export_streams_history_without_paging_in(self):
+        make_store = lambda: SqliteHabitStore(os.path.join(self.tmp_dir.name, "habits.db"))
+        self.seed(make_store())
+        tracker = SmartHabit(store=make_store(), lazy=True, resident_days=7)
+        # Unsaved in-memory changes come out alongside the stored history
+        tracker.log_progress(1, 1.5, self.recent_day)
+        rows = list(tracker.iter_progress_rows(end=self.recent_day))
+
+        self.assertEqual([(row['date'], row['hours']) for row in rows], [(self.old_day, 2.0), (self.recent_day, 1.5)])
+        self.assertTrue(rows[0]['completed'])
+        self.assertFalse(tracker.find_habit_by_number(1)['daily_progress'].complete)
+
+    def test_day_progress_is_one_batched_read(self):
+        make_store = lambda: SqliteHabitStore(os.path.join(self.tmp_dir.name, "habits.db"))
+        self.seed(make_store())
+        store = make_store()
+        tracker = SmartHabit(store=store, lazy=True, sparse=True)
+        with patch.object(store, 'load_progress', wraps=store.load_progress) as load_progress, \
+                patch.object(store, 'progress_on', wraps=store.progress_on) as progress_on:
+            rows = tracker.get_day_progress(tracker.habits, self.recent_day)
+        self.assertEqual(rows[0]['hours'], 0.5)
+        progress_on.assert_called_once_with(self.recent_day)
+        load_progress.assert_not_called()
+        self.assertFalse(tracker.habits[0]['daily_progress'].loaded)
+
+    def test_listeners_stream_lazy_history(self):
+        make_store = lambda: SqliteHabitStore(os.path.join(self.tmp_dir.name, "habits.db"))
+        self.seed(make_store())
+        store = make_store()
+        with patch.object(store, 'load_progress', wraps=store.load_progress) as load_progress:
+            tracker = SmartHabit(store=store, incremental_score=True, statistics=True, rollups=True)
+            progress = tracker.find_habit_by_number(1)['daily_progress']
+            self.assertFalse(progress.loaded)
+        # Statistics and rollups were built from the streamed history, nothing was paged in
+        load_progress.assert_not_called()
+        self.assertEqual(tracker.get_habit_statistics(1)['lifetime_hours'], 2.5)
+        self.assertIn(self.old_day[:4], tracker.rollups.buckets('year', 1))
+        store.close()
+
+    def test_sqlite_history_is_paged_in(self):
+        db_file = os.path.join(self.tmp_dir.name, "habits.db")
+        tracker = self.check_lazy_tracker(lambda: SqliteHabitStore(db_file))
+        tracker.save_data()
+        tracker.store.close()
+
+        store = SqliteHabitStore(db_file)
+        self.assertEqual(store.load_progress(1, end=self.recent_day), {self.old_day: 2.0, self.recent_day: 1.0})
+        store.close()
+
+    def test_json_store_loads_eagerly(self):
+        data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        self.seed(JsonHabitStore(data_file))
+        # The whole document is parsed on load anyway, so lazy=True is ignored
+        tracker = SmartHabit(data_file=data_file, lazy=True, resident_days=7)
+        progress = tracker.find_habit_by_number(1)['daily_progress']
+        self.assertFalse(tracker.lazy)
+        self.assertNotIsInstance(progress, LazyProgress)
+        self.assertEqual(progress[self.old_day], 2.0)
+
+
+class TestUserShards(unittest.TestCase):
+    """
+    Each user has a data file of their own, spread over hashed subdirectories.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.users_dir = os.path.join(self.tmp_dir.name, "users")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_user_data_file_layout(self):
+        path = user_data_file(self.users_dir, "alice@example.com")
+        shard = os.path.basename(os.path.dirname(path))
+        self.assertEqual(os.path.basename(path), "alice@example.com.json")
+        self.assertEqual(len(shard), 2)
+        self.assertTrue(os.path.isdir(os.path.dirname(path)))
+        self.assertEqual(user_data_file(self.users_dir, "alice@example.com"), path)
+        self.assertTrue(user_data_file(self.users_dir, "alice", ".db").endswith("alice.db"))
+
+    def test_invalid_user_ids(self):
+        for user_id in ("", "../alice", "a/b", ".hidden", "x" * 65, None):
+            self.assertRaises(ValueError, user_data_file, self.users_dir, user_id)
+
+    def test_users_are_independent(self):
+        alice = SmartHabit(user_id="alice", users_dir=self.users_dir)
+        alice.create_habit("Reading", 1.0)
+        alice.save_data()
+        bob = SmartHabit(user_id="bob", users_dir=self.users_dir)
+        self.assertEqual(bob.habits, [])
+        bob.create_habit("Running", 0.5)
+        bob.save_data()
+
+        self.assertEqual([h['name'] for h in SmartHabit(user_id="alice", users_dir=self.users_dir).habits], ["Reading"])
+        self.assertEqual(sorted(iter_user_ids(self.users_dir)), ["alice", "bob"])
+        self.assertRaises(ValueError, SmartHabit, user_id="alice", store=JsonHabitStore(alice.data_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import gc
+import os
+import tempfile
+import weakref
+from unittest.mock import patch
+
+from habit_cache import clear_shared_trackers, get_shared_tracker, get_tracker_views
+from habit_clock import FixedClock
+from habit_views import HabitViews
+from smart_habit import SmartHabit
+
+
+class TestHabitViews(unittest.TestCase):
+    """
+    Views are recomputed only after a mutation, a reload or a date change.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        self.clock = FixedClock("2025-11-21")
+        self.tracker = SmartHabit(self.data_file, clock=self.clock, incremental_score=True, statistics=True, rollups=True)
+        self.tracker.create_habit("Reading", 1.0)
+        self.tracker.create_habit("Exercise", 2.0)
+        self.tracker.log_progress(1, 1.0)
+        self.views = HabitViews(self.tracker, max_habits=2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_unchanged_reruns_are_served_from_cache(self):
+        with patch.object(self.tracker, 'calculate_daily_score', wraps=self.tracker.calculate_daily_score) as score, \
+                patch.object(self.tracker, 'get_weekly_progress', wraps=self.tracker.get_weekly_progress) as weekly:
+            for _ in range(3):
+                self.assertEqual(self.views.daily_score()['completed_habits'], 1)
+                self.assertEqual(self.views.weekly_progress(1)[0]['hours'], 1.0)
+        score.assert_called_once_with(include_habit_scores=False)
+        weekly.assert_called_once_with(1)
+        self.assertEqual((self.views.hits, self.views.misses), (4, 2))
+
+    def test_mutation_invalidates(self):
+        self.assertEqual(self.views.daily_score()['completed_habits'], 1)
+        self.assertEqual(self.views.habit_statistics(2)['lifetime_hours'], 0)
+        self.tracker.log_progress(2, 2.0)
+        self.assertEqual(self.views.daily_score()['completed_habits'], 2)
+        self.assertEqual(self.views.habit_statistics(2)['lifetime_hours'], 2.0)
+        self.assertEqual(self.views.rollups('month', 2)[0]['total_hours'], 2.0)
+        self.assertEqual(self.views.search("exer"), (1, [self.tracker.find_habit_by_number(2)]))
+
+    def test_date_change_invalidates(self):
+        self.assertEqual(self.views.daily_score()['completed_habits'], 1)
+        self.clock.advance(1)
+        score = self.views.daily_score()
+        self.assertEqual((score['date'], score['completed_habits']), ("2025-11-22", 0))
+
+    def test_least_recently_viewed_habit_is_evicted(self):
+        self.tracker.create_habit("Writing", 0.5)
+        self.views.weekly_progress(1)
+        self.views.weekly_progress(2)
+        self.views.weekly_progress(1)
+        self.views.weekly_progress(3)
+        self.assertEqual(list(self.views._habit_views), [1, 3])
+        self.views.weekly_progress(1)
+        self.assertEqual(self.views.hits, 2)
+
+    def test_search_results_are_bounded(self):
+        views = HabitViews(self.tracker, max_searches=2)
+        for query in ("read", "exer", "read", "ing"):
+            views.search(query)
+        self.assertEqual(list(views._searches), [("read", 0, None), ("ing", 0, None)])
+
+
+class TestSharedViews(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        clear_shared_trackers()
+
+    def tearDown(self):
+        clear_shared_trackers()
+        self.tmp_dir.cleanup()
+
+    def test_one_views_per_shared_tracker(self):
+        tracker = get_shared_tracker(self.data_file)
+        views = get_tracker_views(tracker)
+        self.assertIs(get_tracker_views(get_shared_tracker(self.data_file)), views)
+        self.assertIsNot(get_tracker_views(get_shared_tracker(self.data_file, sparse=True)), views)
+
+    def test_reload_from_other_writer_invalidates(self):
+        tracker = get_shared_tracker(self.data_file)
+        views = get_tracker_views(tracker)
+        self.assertEqual(views.daily_score()['total_habits'], 0)
+        other = SmartHabit(self.data_file)
+        other.create_habit("Reading", 1.0)
+        other.save_data()
+        get_shared_tracker(self.data_file)
+        self.assertEqual(views.daily_score()['total_habits'], 1)
+
+    def test_dropped_trackers_are_released_with_their_views(self):
+        tracker = weakref.ref(get_shared_tracker(self.data_file))
+        get_tracker_views(tracker()).daily_score()
+        clear_shared_trackers()
+        gc.collect()
+        self.assertIsNone(tracker())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,14 @@
 import unittest
 import json
 import io 
+import os
+import tempfile
+import threading
 from unittest.mock import patch, MagicMock
 from datetime import datetime, date, timedelta
 
 # Import the class we are testing
+from habit_store import SqliteHabitStore
 from smart_habit import SmartHabit
 
 # --- Mock Data for Testing ---
@@ -37,6 +41,11 @@ MOCK_INITIAL_DATA = {
 MOCK_TODAY_DATE = date(2025, 11, 21)
 MOCK_TODAY_STR = '2025-11-21'
 
+# In-memory file that also answers fileno(), so snapshot writes can fsync it (os.fsync is mocked)
+class MockDataFile(io.StringIO):
+    def fileno(self):
+        return -1
+
 # --- The Test Suite ---
 class TestSmartHabit(unittest.TestCase):
     """
@@ -64,10 +73,19 @@ class TestSmartHabit(unittest.TestCase):
         self.mock_open = self.mock_open_patch.start()
         
         # Configure the mock open to simulate reading MOCK_INITIAL_DATA
-        self.mock_open.return_value.__enter__.return_value = io.StringIO(
+        self.mock_open.return_value.__enter__.return_value = MockDataFile(
             json.dumps(MOCK_INITIAL_DATA)
         )
         
+        # 3. Snapshots are written to a temp file and renamed into place; with open()
+        # mocked there is no real temp file, so stub the filesystem calls as well
+        self.mock_os_patch = patch.multiple(
+            'habit_store.os', replace=MagicMock(), remove=MagicMock(), link=MagicMock(), fsync=MagicMock()
+        )
+        self.mock_os_patch.start()
+        self.mock_lock_patch = patch('habit_store.FileLock', MagicMock())
+        self.mock_lock_patch.start()
+
         # Initialize the tracker, which calls load_data() and uses the mocks
         self.tracker = SmartHabit()
 
@@ -75,6 +93,8 @@ class TestSmartHabit(unittest.TestCase):
         # Stop all patches after each test to ensure isolation
         self.mock_datetime_patch.stop()
         self.mock_open_patch.stop()
+        self.mock_os_patch.stop()
+        self.mock_lock_patch.stop()
 
     # --- Core Functionality Tests (load_data, initialization) ---
     
@@ -130,6 +150,36 @@ class TestSmartHabit(unittest.TestCase):
         habit_99 = self.tracker.find_habit_by_number(99)
         self.assertIsNone(habit_99)
 
+    def test_habit_exists_uses_normalized_names(self):
+        """Duplicate checks ignore case and surrounding whitespace, and follow deletes."""
+        self.assertTrue(self.tracker.habit_exists("  reading "))
+        self.assertFalse(self.tracker.habit_exists("Running"))
+
+        self.tracker.remove_habit(1)
+        self.assertFalse(self.tracker.habit_exists("Reading"))
+
+    def test_lookup_index_follows_mutations(self):
+        """The number index stays consistent across add, delete and reassignment."""
+        habit = self.tracker.create_habit("Running", 1.5)
+        self.assertIs(self.tracker.find_habit_by_number(3), habit)
+
+        self.tracker.remove_habit(2)
+        self.assertIsNone(self.tracker.find_habit_by_number(2))
+        self.assertEqual([h['number'] for h in self.tracker.habits], [1, 3])
+
+        self.tracker.habits = [habit]
+        self.assertIsNone(self.tracker.find_habit_by_number(1))
+        self.assertIs(self.tracker.find_habit_by_number(3), habit)
+
+    def test_habits_view_is_read_only_and_kept_on_add(self):
+        """Adding a habit appends to the list behind the view instead of rebuilding it."""
+        habits = self.tracker.habits
+        self.assertFalse(hasattr(habits, 'append'))
+        habit = self.tracker.create_habit("Running", 1.5)
+        self.assertIs(self.tracker.habits, habits)
+        self.assertIs(habits[-1], habit)
+        self.assertEqual([h['number'] for h in habits[:2]], [1, 2])
+
     def test_delete_habit(self):
         """Test deleting a habit."""
         # Mock input for the console version: input habit number (1), input confirmation (yes)
@@ -227,5 +277,396 @@ class TestSmartHabit(unittest.TestCase):
         self.assertEqual(day_6_data['hours'], 0.5)
         self.assertEqual(day_6_data['completion_percentage'], 50.0)
 
+    def test_get_progress_range(self):
+        """Batch range summaries for all habits, and for a selection with per-day rows."""
+        self.tracker.habits[0]['daily_progress']["2025-11-19"] = 1.5
+        self.tracker.habits[1]['daily_progress'][MOCK_TODAY_STR] = 1.0
+
+        progress = self.tracker.get_progress_range("2025-11-18", MOCK_TODAY_STR)
+        self.assertEqual(set(progress), {1, 2})
+        reading = progress[1]
+        self.assertEqual(reading['total_hours'], 2.0)   # 1.5 + 0.5
+        self.assertEqual(reading['completed_days'], 1)
+        self.assertEqual(reading['average_hours'], 0.5)
+        self.assertEqual(reading['average_completion'], 37.5)  # (100 + 50) / 4
+        self.assertNotIn('days', reading)
+
+        progress = self.tracker.get_progress_range("2025-11-20", MOCK_TODAY_STR, [2, 99], include_days=True)
+        self.assertEqual(list(progress), [2])
+        self.assertEqual([day['date'] for day in progress[2]['days']], ["2025-11-20", MOCK_TODAY_STR])
+        self.assertEqual(progress[2]['completed_days'], 1)
+
+    def test_get_weekly_progress_unknown_habit(self):
+        self.assertIsNone(self.tracker.get_weekly_progress(99))
+
+    def test_search_habits_pages_matches(self):
+        for name in ("Reading news", "Writing", "Running"):
+            self.tracker.create_habit(name, 1.0)
+        total, page = self.tracker.search_habits(" READ")
+        self.assertEqual((total, [habit['name'] for habit in page]), (2, ["Reading", "Reading news"]))
+        total, page = self.tracker.search_habits("", offset=1, limit=2)
+        self.assertEqual((total, [habit['number'] for habit in page]), (5, [2, 3]))
+        self.assertEqual(self.tracker.search_habits("swimming"), (0, []))
+
+    def test_get_day_progress(self):
+        rows = self.tracker.get_day_progress(self.tracker.habits, "2025-11-20")
+        self.assertEqual(rows[0], {
+            'number': 1, 'name': "Reading", 'hours': 0.5, 'target_hours': 1.0,
+            'completed': False, 'progress': 50.0, 'created_date': "2025-11-20"
+        })
+        self.assertTrue(rows[1]['completed'])
+        self.assertEqual([row['hours'] for row in self.tracker.get_day_progress(self.tracker.habits)], [0, 0])
+
+        # A zero target counts as completed but 0% like in calculate_daily_score
+        self.tracker.habits[0]['target_hours'] = 0
+        row = self.tracker.get_day_progress(self.tracker.habits, "2025-11-20")[0]
+        self.assertEqual((row['completed'], row['progress']), (True, 0))
+
+
+class TestSmartHabitJournal(unittest.TestCase):
+    """
+    Journal mode against a real temporary directory: mutations are appended
+    to the log and replayed on load, compaction folds them into the snapshot.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_tracker(self, **kwargs):
+        return SmartHabit(data_file=self.data_file, journal=True, **kwargs)
+
+    def test_mutations_are_replayed_from_journal(self):
+        tracker = self.make_tracker()
+        tracker.create_habit("Reading", 1.0)
+        tracker.create_habit("Exercise", 2.0)
+        tracker.log_progress(1, 0.5, "2025-11-20")
+        tracker.remove_habit(2)
+        tracker.save_data()
+
+        # No snapshot yet, only the journal
+        self.assertFalse(os.path.exists(self.data_file))
+        with open(tracker.store.journal_file) as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+        reloaded = self.make_tracker()
+        self.assertEqual([h['name'] for h in reloaded.habits], ["Reading"])
+        self.assertEqual(reloaded.habits[0]['daily_progress']["2025-11-20"], 0.5)
+        self.assertEqual(reloaded.next_number, 3)
+
+    def test_save_appends_only_new_records(self):
+        tracker = self.make_tracker()
+        tracker.create_habit("Reading", 1.0)
+        tracker.save_data()
+        tracker.log_progress(1, 1.0, "2025-11-20")
+        tracker.save_data()
+
+        with open(tracker.store.journal_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r['op'] for r in records], ["add", "log"])
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        tracker = self.make_tracker(compact_every=3)
+        tracker.create_habit("Reading", 1.0)
+        tracker.log_progress(1, 0.5, "2025-11-19")
+        tracker.log_progress(1, 1.0, "2025-11-20")
+        tracker.save_data()
+
+        self.assertEqual(os.path.getsize(tracker.store.journal_file), 0)
+        with open(self.data_file) as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot['habits'][0]['daily_progress']["2025-11-20"], 1.0)
+
+        reloaded = self.make_tracker()
+        self.assertEqual(reloaded.habits[0]['daily_progress']["2025-11-19"], 0.5)
+
+    def test_torn_final_record_is_ignored(self):
+        tracker = self.make_tracker()
+        tracker.create_habit("Reading", 1.0)
+        tracker.save_data()
+        with open(tracker.store.journal_file, 'a') as f:
+            f.write('{"op":"log","number":1,"da')
+
+        reloaded = self.make_tracker()
+        self.assertEqual(len(reloaded.habits), 1)
+
+
+class TestSmartHabitSnapshots(unittest.TestCase):
+    """
+    Atomic snapshot writes and recovery from older generations.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def save_generations(self, count):
+        tracker = SmartHabit(data_file=self.data_file, backups=2)
+        for i in range(count):
+            tracker.create_habit(f"Habit {i}", 1.0)
+            tracker.save_data()
+        return tracker
+
+    def test_snapshot_keeps_previous_generations(self):
+        self.save_generations(4)
+
+        self.assertFalse(os.path.exists(self.data_file + ".tmp"))
+        self.assertFalse(os.path.exists(self.data_file + ".3"))
+        counts = []
+        for path in (self.data_file, self.data_file + ".1", self.data_file + ".2"):
+            with open(path) as f:
+                counts.append(len(json.load(f)['habits']))
+        self.assertEqual(counts, [4, 3, 2])
+
+    def test_truncated_snapshot_recovers_newest_backup(self):
+        self.save_generations(3)
+        with open(self.data_file, 'r+') as f:
+            f.truncate(20)
+
+        recovered = SmartHabit(data_file=self.data_file, backups=2)
+        self.assertEqual(len(recovered.habits), 2)
+        self.assertEqual(recovered.next_number, 3)
+
+    def test_all_generations_corrupted_starts_fresh(self):
+        with open(self.data_file, 'w') as f:
+            f.write("{not json")
+
+        tracker = SmartHabit(data_file=self.data_file)
+        self.assertEqual(tracker.habits, [])
+
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """
+    Several trackers and threads writing to the same data file must not lose updates.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check_trackers_merge(self, **options):
+        first = SmartHabit(self.data_file, **options)
+        second = SmartHabit(self.data_file, **options)
+
+        first.create_habit("Reading", 1.0)
+        first.save_data()
+        # second still has the old view: its new habit also got number 1
+        second.create_habit("Exercise", 2.0)
+        second.log_progress(1, 1.5, "2025-11-20")
+        second.save_data()
+        first.log_progress(1, 0.5, "2025-11-19")
+        first.save_data()
+
+        reloaded = SmartHabit(self.data_file, **options)
+        self.assertEqual([(h['number'], h['name']) for h in reloaded.habits], [(1, "Reading"), (2, "Exercise")])
+        self.assertEqual(reloaded.find_habit_by_number(1)['daily_progress']["2025-11-19"], 0.5)
+        self.assertEqual(reloaded.find_habit_by_number(2)['daily_progress']["2025-11-20"], 1.5)
+        self.assertEqual(reloaded.next_number, 3)
+
+    def test_second_writer_merges_instead_of_overwriting(self):
+        self.check_trackers_merge()
+
+    def test_second_writer_merges_in_journal_mode(self):
+        self.check_trackers_merge(journal=True)
+
+    def test_compaction_keeps_other_writers_records(self):
+        first = SmartHabit(self.data_file, journal=True)
+        first.create_habit("Reading", 1.0)
+        first.save_data()
+        second = SmartHabit(self.data_file, journal=True)
+        second.log_progress(1, 1.5, "2025-11-20")
+        second.save_data()
+        first.compact()
+
+        reloaded = SmartHabit(self.data_file, journal=True)
+        self.assertEqual(reloaded.find_habit_by_number(1)['daily_progress']["2025-11-20"], 1.5)
+
+    def test_threads_logging_concurrently(self):
+        tracker = SmartHabit(self.data_file, journal=True)
+        for i in range(4):
+            tracker.create_habit(f"Habit {i}", 1.0)
+        tracker.save_data()
+
+        def worker(number):
+            for day in range(1, 21):
+                tracker.log_progress(number, day / 10, f"2025-11-{day:02d}")
+                tracker.save_data()
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(1, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reloaded = SmartHabit(self.data_file, journal=True)
+        for habit in reloaded.habits:
+            self.assertEqual(habit['daily_progress']["2025-11-20"], 2.0)
+            self.assertEqual(len([day for day in habit['daily_progress'] if day.startswith("2025-11")]), 20)
+
+
+class TestImportProgress(unittest.TestCase):
+    """
+    Bulk import: rows are validated, applied in one batch and saved once.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+        self.tracker = SmartHabit(self.data_file)
+        self.tracker.create_habit("Reading", 1.0)
+        self.tracker.create_habit("Exercise", 2.0)
+        self.tracker.save_data()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rows_by_number_and_name(self):
+        rows = [
+            {"habit": "1", "date": "2025-11-19", "hours": "0.5"},
+            {"habit": "exercise ", "date": "2025-11-19", "hours": 2},
+            (1, "2025-11-20", 1.5),
+        ]
+        with patch.object(self.tracker.store, 'save', wraps=self.tracker.store.save) as save:
+            result = self.tracker.import_progress(rows)
+        save.assert_called_once()
+        self.assertEqual(result['imported'], 3)
+        self.assertEqual(result['rejected'], [])
+        self.assertGreater(result['rows_per_sec'], 0)
+
+        reloaded = SmartHabit(self.data_file)
+        self.assertEqual(reloaded.find_habit_by_number(1)['daily_progress']["2025-11-20"], 1.5)
+        self.assertEqual(reloaded.find_habit_by_number(2)['daily_progress']["2025-11-19"], 2.0)
+
+    def test_invalid_rows_are_reported(self):
+        rows = [
+            (1, "2025-11-19", 0.5),
+            (9, "2025-11-19", 0.5),
+            ("Reading", "19/11/2025", 0.5),
+            ("Reading", "2025-11-19", "lots"),
+            ("Reading", "2025-11-19", 30),
+        ]
+        result = self.tracker.import_progress(rows)
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual([row for row, _ in result['rejected']], [2, 3, 4, 5])
+
+        with self.assertRaises(ValueError):
+            self.tracker.import_progress([(1, "2025-11-18", 1.0), (9, "2025-11-18", 1.0)], strict=True)
+        self.assertNotIn("2025-11-18", self.tracker.find_habit_by_number(1)['daily_progress'])
+
+
+class TestExportProgress(unittest.TestCase):
+    """
+    Streaming export of every recorded day as rows, CSV or JSONL.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tracker = SmartHabit(os.path.join(self.tmp_dir.name, "habits.json"))
+        self.tracker.create_habit("Reading", 1.0)
+        self.tracker.create_habit("Exercise", 2.0)
+        self.tracker.import_progress([
+            (1, "2025-11-20", 1.0), (1, "2025-11-18", 0.5), (2, "2025-11-19", 1.5), (2, "2025-11-21", 2.0)
+        ])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rows_are_filtered_and_in_date_order(self):
+        rows = self.tracker.iter_progress_rows(start="2025-11-18", end="2025-11-20")
+        self.assertEqual(next(rows), {
+            'number': 1, 'name': "Reading", 'date': "2025-11-18", 'hours': 0.5, 'target_hours': 1.0, 'completed': False
+        })
+        self.assertEqual([(row['number'], row['date']) for row in rows], [(1, "2025-11-20"), (2, "2025-11-19")])
+
+        rows = self.tracker.iter_progress_rows(start="2025-11-01", end="2025-11-30", habit_numbers=[2, 7])
+        self.assertEqual([row['hours'] for row in rows], [1.5, 2.0])
+
+    def test_csv_and_jsonl_output(self):
+        output = io.StringIO()
+        count = self.tracker.export_progress(output, start="2025-11-20", end="2025-11-21")
+        self.assertEqual(count, 2)
+        self.assertEqual(output.getvalue().splitlines(), [
+            "number,name,date,hours,target_hours,completed",
+            "1,Reading,2025-11-20,1.0,1.0,True",
+            "2,Exercise,2025-11-21,2.0,2.0,True",
+        ])
+
+        output = io.StringIO()
+        self.tracker.export_progress(output, 'jsonl', start="2025-11-19", end="2025-11-19")
+        self.assertEqual(json.loads(output.getvalue())['name'], "Exercise")
+        with self.assertRaises(ValueError):
+            self.tracker.export_progress(io.StringIO(), 'xml')
+
+
+class TestSparseProgress(unittest.TestCase):
+    """
+    Sparse mode: days without hours are not stored, and stored zeros can be stripped.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "habits.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_no_zero_entries_are_written(self):
+        tracker = SmartHabit(self.data_file, sparse=True)
+        habit = tracker.create_habit("Reading", 1.0)
+        self.assertEqual(dict(habit['daily_progress']), {})
+        tracker.log_progress(1, 1.0, "2025-11-20")
+        tracker.log_progress(1, 0.5, "2025-11-21")
+        tracker.log_progress(1, 0, "2025-11-21")
+        tracker.save_data()
+
+        reloaded = SmartHabit(self.data_file, sparse=True, incremental_score=True, verify_score=True)
+        self.assertEqual(reloaded.habits[0]['daily_progress'], {"2025-11-20": 1.0})
+        self.assertEqual(reloaded.get_progress_range("2025-11-20", "2025-11-21")[1]['total_hours'], 1.0)
+        self.assertEqual(reloaded.calculate_daily_score()['daily_score'], 0)
+
+    def test_zero_log_is_replayed_from_journal(self):
+        tracker = SmartHabit(self.data_file, journal=True, sparse=True)
+        tracker.create_habit("Reading", 1.0)
+        tracker.log_progress(1, 1.0, "2025-11-20")
+        tracker.save_data()
+        tracker.log_progress(1, 0, "2025-11-20")
+        tracker.save_data()
+        self.assertEqual(SmartHabit(self.data_file, journal=True, sparse=True).habits[0]['daily_progress'], {})
+
+    def test_strip_zero_progress_shrinks_the_file(self):
+        days = {f"2025-{month:02d}-{day:02d}": 0 for month in range(1, 13) for day in range(1, 29)}
+        days["2025-11-20"] = 1.5
+        with open(self.data_file, 'w') as f:
+            json.dump({'habits': [{"number": 1, "name": "Reading", "target_hours": 1.0,
+                                   "daily_progress": days, "created_date": "2025-01-01"}], 'next_number': 2}, f)
+        size_before = os.path.getsize(self.data_file)
+
+        tracker = SmartHabit(self.data_file, sparse=True)
+        self.assertEqual(tracker.strip_zero_progress(), len(days) - 1)
+        self.assertLess(os.path.getsize(self.data_file), size_before / 10)
+        self.assertEqual(SmartHabit(self.data_file, sparse=True).habits[0]['daily_progress'], {"2025-11-20": 1.5})
+
+    def test_sqlite_does_not_store_zeros(self):
+        store = SqliteHabitStore(os.path.join(self.tmp_dir.name, "habits.db"))
+        tracker = SmartHabit(store=store, sparse=True)
+        tracker.create_habit("Reading", 1.0)
+        tracker.log_progress(1, 1.0, "2025-11-20")
+        tracker.save_data()
+        tracker.log_progress(1, 0, "2025-11-20")
+        tracker.save_data()
+        self.assertEqual(store.load_progress(1), {})
+        store.close()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file